@@ -0,0 +1 @@
+"""API2MCP 性能基准测试"""
@@ -0,0 +1,94 @@
+"""
+综合分析工具基准测试 - 对比智能体逐个串行调用工具与一次 analyze_outage 调用
+
+统计耗时（不含大模型推理时间）和返回给大模型上下文的数据量。
+
+使用方法:
+    python -m benchmarks.bench_analyze_outage --devices 20000 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from datetime import date
+from typing import Any, Dict, List
+
+from .stub_server import start_stub_server
+from .synthetic import generate_device_payload
+
+OUTAGE_DATA_PATH = "/outage-data/test/agent"
+
+
+def _context_bytes(result: Any) -> int:
+    """工具结果序列化后的字节数，即进入大模型上下文的数据量"""
+    return len(json.dumps(result, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _run_mode(mode: str, env: Dict[str, str], queue: Any) -> None:
+    os.environ.update(env)
+
+    from src.api import main
+
+    outage_number, analysis_type, outage_date = "BENCH-001", 1, date(2025, 6, 1)
+    results: List[Any] = []
+
+    async def call(tool: Any, *args: Any) -> Any:
+        result = await tool.fn(*args)
+        results.append(result)
+        return result
+
+    async def chain() -> None:
+        """智能体逐个调用工具，原始数据经由上下文传回处理工具"""
+        await call(main.get_event_data, outage_number)
+        weather = await call(main.get_weather_data, outage_number, analysis_type)
+        await call(main.weather_data_processing, weather)
+        devices = await call(main.get_device_info_data, outage_number)
+        await call(main.process_device_info, devices)
+        environment = await call(main.get_environment_raw_data, outage_number)
+        await call(main.environment_data_processing, environment, outage_date)
+        message = await call(main.get_message_data, outage_number, analysis_type)
+        wave = await call(main.get_wave_data, outage_number, analysis_type)
+        await call(main.message_data_processing, json.dumps(message, ensure_ascii=False),
+                   json.dumps(wave, ensure_ascii=False))
+
+    async def composite() -> None:
+        await call(main.analyze_outage, outage_number, analysis_type, outage_date)
+
+    start = time.perf_counter()
+    asyncio.run(chain() if mode == "chain" else composite())
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, len(results), sum(_context_bytes(r) for r in results)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="综合分析工具基准测试")
+    parser.add_argument("--devices", type=int, default=20000, help="停电事件的设备数")
+    parser.add_argument("--latency", type=float, default=0.05, help="桩服务每次请求的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency)
+    server.set_response(OUTAGE_DATA_PATH, generate_device_payload(args.devices))
+    print(f"桩服务: {base_url}  设备数: {args.devices}")
+
+    env = {"DATA_SERVICE_BASE_URL": base_url, "LANDFORM_URL": base_url}
+    modes = [("chain", "逐个调用工具"), ("composite", "analyze_outage")]
+
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        for mode, label in modes:
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run_mode, args=(mode, env, queue))
+            process.start()
+            elapsed, calls, context_bytes = queue.get()
+            process.join()
+            print(f"  {label:<16} 工具调用 {calls:>2} 次  耗时 {elapsed * 1000:>8.1f}ms  "
+                  f"返回上下文 {context_bytes / 1024:>9.1f}KB")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+批量设备处理基准测试 - process_device_info_batch 在线程与进程池中执行的耗时对比
+
+每种模式在独立子进程中运行；进程池模式先预热进程池，启动耗时单独列出。
+
+使用方法:
+    python -m benchmarks.bench_batch_processing --outages 16 --devices 20000 --workers 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from typing import Any, Dict
+
+from .stub_server import start_stub_server
+from .synthetic import generate_device_payload
+
+OUTAGE_DATA_PATH = "/outage-data/test/agent"
+
+
+def _run_mode(env: Dict[str, str], outages: int, queue: Any) -> None:
+    os.environ.update(env)
+
+    from src.api.main import process_device_info_batch
+    from src.services import async_run_in_process, close_process_pool
+
+    clock: Dict[str, float] = {}
+
+    class Ctx:
+        """记录首个结果到达时间的最小上下文"""
+
+        async def report_progress(self, progress: float, total: float, message: str) -> None:
+            clock.setdefault("first", time.perf_counter() - clock["start"])
+
+        async def info(self, message: str) -> None:
+            pass
+
+    async def run() -> tuple[float, float, str]:
+        warm_start = time.perf_counter()
+        await async_run_in_process(len, [])
+        warmup = time.perf_counter() - warm_start
+
+        clock["start"] = time.perf_counter()
+        result = await process_device_info_batch.fn(
+            [f"BENCH-{i:03d}" for i in range(outages)], "2025-06-01 00:00:00", Ctx()
+        )
+        return warmup, time.perf_counter() - clock["start"], result["msg"]
+
+    warmup, elapsed, msg = asyncio.run(run())
+    close_process_pool()
+    queue.put((warmup, clock.get("first", 0.0), elapsed, msg))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="批量设备处理基准测试")
+    parser.add_argument("--outages", type=int, default=16, help="停电事件数")
+    parser.add_argument("--devices", type=int, default=20000, help="每个停电事件的设备数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="进程池大小")
+    parser.add_argument("--latency", type=float, default=0.05, help="桩服务每次请求的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency)
+    server.set_response(OUTAGE_DATA_PATH, generate_device_payload(args.devices))
+    print(f"桩服务: {base_url}  停电事件: {args.outages}  设备数: {args.devices}")
+
+    base_env = {"DATA_SERVICE_BASE_URL": base_url, "API2MCP_BATCH_CONCURRENCY": str(max(args.workers, 2))}
+    modes = [
+        ("线程执行", {**base_env, "API2MCP_BATCH_PROCESS_WORKERS": "0"}),
+        (f"进程池 x{args.workers}", {**base_env, "API2MCP_BATCH_PROCESS_WORKERS": str(args.workers)}),
+    ]
+
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        for label, env in modes:
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run_mode, args=(env, args.outages, queue))
+            process.start()
+            warmup, first, elapsed, msg = queue.get()
+            process.join()
+            print(f"  {label:<12} 预热 {warmup * 1000:>7.1f}ms  首个结果 {first * 1000:>8.1f}ms  "
+                  f"总耗时 {elapsed * 1000:>8.1f}ms  {msg}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+电缆段归属索引基准测试 - 对比逐个扫描与预建索引，验证 process_device_info_data 近似线性扩展
+
+使用方法:
+    python -m benchmarks.bench_cable_index --sizes 10000 50000 --max-scan-size 10000
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+from src.services.device_service import (
+    build_cable_segment_index,
+    get_affiliated_psr_id,
+    normalize_psr_type,
+    process_device_info_data,
+)
+
+from .synthetic import generate_device_payload
+
+
+def resolve_affiliations(devices: List[Dict[str, Any]], use_index: bool) -> List[str]:
+    """解析所有设备的所属设备ID"""
+    segment_index = build_cable_segment_index(devices) if use_index else None
+    return [
+        get_affiliated_psr_id(devices, device, normalize_psr_type(device.get("psrType")), segment_index)
+        for device in devices
+    ]
+
+
+def timed(func: Any, *args: Any) -> tuple[float, Any]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="电缆段归属索引基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--max-scan-size", type=int, default=10000, help="超过此规模时跳过逐个扫描（O(n²)）")
+    args = parser.parse_args()
+
+    print(f"{'设备数':>8} {'索引归属':>10} {'扫描归属':>10} {'处理总耗时':>10} {'每千设备':>10}")
+    for size in args.sizes:
+        payload = generate_device_payload(size)
+        devices = payload["data"]
+
+        index_time, indexed = timed(resolve_affiliations, devices, True)
+        scan_text = "跳过"
+        if size <= args.max_scan_size:
+            scan_time, scanned = timed(resolve_affiliations, devices, False)
+            if scanned != indexed:
+                raise AssertionError("索引归属结果与逐个扫描结果不一致")
+            scan_text = f"{scan_time * 1000:.1f}ms"
+
+        total_time, _ = timed(process_device_info_data, payload)
+        print(
+            f"{size:>8} {index_time * 1000:>8.1f}ms {scan_text:>10} "
+            f"{total_time * 1000:>8.1f}ms {total_time * 1e6 / size:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
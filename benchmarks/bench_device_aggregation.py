@@ -0,0 +1,275 @@
+"""
+设备统计聚合基准测试 - 等价性校验与大规模耗时（逐设备累计与列式统计对比）
+
+等价性校验: fixtures/device_info_expected.json 保存了原多遍历实现（reference_process_device_info_data）
+对各组合成数据（固定种子、固定参考时间）的输出，单遍历累加器必须逐字段一致。除常规规模外，
+另有风险设备占比高、投运时间集中在少数几天的用例，覆盖风险计数、风险描述去重、
+超过 10 条时截断和不足 10 条的情况。
+处理逻辑有意变更时同步修改参考实现，再使用 --write-fixture 重新生成。
+
+使用方法:
+    python -m benchmarks.bench_device_aggregation --sizes 10000 50000
+    python -m benchmarks.bench_device_aggregation --check-only
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List
+
+from src.services import device_service
+from src.services.device_service import (
+    build_device_info,
+    calculate_device_risk,
+    get_device_category,
+    normalize_psr_type,
+    process_device_info_data,
+)
+
+from .synthetic import generate_device_payload
+
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "device_info_expected.json")
+
+# 固定参考时间，保证运行年限等结果与运行日期无关
+REFERENCE_TIME = datetime(2025, 6, 1, 12, 0, 0)
+
+
+def with_shared_start_times(payload: Dict[str, Any], count: int, seed: int = 7) -> Dict[str, Any]:
+    """投运时间改为从 count 个固定时间中选取，使不同风险设备生成相同的风险描述"""
+    rng = random.Random(seed)
+    choices = [f"{2000 + k}-03-15 08:00:00" for k in range(count)]
+    for device in payload["data"]:
+        device["start_time"] = device["operate_date"] = rng.choice(choices)
+    return payload
+
+
+def without_history(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """去掉历史记录和家族缺陷，风险描述只剩少数几种"""
+    for device in payload["data"]:
+        device["faultHistoryList"] = device["defectHistoryList"] = device["hazardHistoryList"] = []
+        device["hasFamilyDefect"] = False
+    return payload
+
+
+# 用例名 -> 合成数据；risk_* 用例风险设备占比高，投运时间集中，风险描述大量重复
+CASES: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "1000": lambda: generate_device_payload(1000),
+    "5000": lambda: generate_device_payload(5000),
+    "20000": lambda: generate_device_payload(20000),
+    "risk_shared_dates": lambda: with_shared_start_times(
+        generate_device_payload(2000, seed=7, fault_rate=0.3, defect_rate=0.4, hazard_rate=0.3), 3),
+    "risk_few_descriptions": lambda: without_history(with_shared_start_times(
+        generate_device_payload(500, seed=11, fault_rate=0.5, defect_rate=0.3, hazard_rate=0.0), 2)),
+}
+
+
+def reference_process_device_info_data(device_data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """原多遍历实现：逐个计算风险后按类型、类别、线路信息、风险描述分别遍历设备列表
+
+    只保留成功路径，设备信息与风险计算使用当前的 build_device_info 和 calculate_device_risk。
+    """
+    seen_psr_ids = set()
+    unique_devices = []
+    for device in device_data["data"]:
+        psr_id = device.get("psr_id", "")
+        if psr_id and psr_id not in seen_psr_ids:
+            seen_psr_ids.add(psr_id)
+            unique_devices.append(device)
+
+    device_info_list = []
+    for device in unique_devices:
+        device_type = normalize_psr_type(device.get("psrType"))
+        if device_type == "xndl":
+            continue
+        device_info_list.append(build_device_info(device, device_type, unique_devices))
+
+    risk_devices = set()
+    for device in device_info_list:
+        risk_level, run_time_years, long_years, device_score = calculate_device_risk(device, now)
+        device["risk_level"] = risk_level
+        if risk_level == "是":
+            risk_devices.add(device["psr_id"])
+
+    # 按设备类别分组统计
+    devices_by_category: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for device in device_info_list:
+        devices_by_category[get_device_category(device.get("device_type", ""))].append(device)
+
+    device_type_stats = []
+    for category, devices in devices_by_category.items():
+        risk_count = sum(1 for device in devices if device.get("risk_level") == "是")
+        device_type_stats.append({
+            "设备类型": category,
+            "总数": len(devices),
+            "风险数": risk_count,
+            "风险比例": risk_count / len(devices) if devices else 0,
+        })
+
+    # 线路导线类型
+    line_type = wire_type = "无数据来源"
+    line_name = ""
+    max_span = 0.0
+    for device in device_info_list:
+        device_span = device.get("span", 0.0)
+        if device_span > max_span:
+            max_span = device_span
+        if not line_name and device.get("line_name"):
+            line_name = device["line_name"]
+        if (line_type == "无数据来源" or wire_type == "无数据来源") and \
+                device.get("line_type") and device.get("wire_type"):
+            line_type = device["line_type"]
+            wire_type = device["wire_type"]
+    tower_des = f",且线路上杆塔存在档距过大(最大档距为 {max_span} 米)" if max_span > 100 else ""
+    if wire_type == "其他":
+        line_wire_des = f"{line_name}为{line_type}线路{tower_des}."
+    else:
+        line_wire_des = f"{line_name}为{line_type}线路, 导线类型为{wire_type}{tower_des}."
+
+    # 重过载
+    rated_date = ""
+    for device in device_info_list:
+        if device.get("rated_current_data"):
+            rated_date = device["rated_current_data"]
+            break
+
+    risk_devices_desc = f"根据设备近期及历史同期的隐患、缺陷、故障、巡视记录、设备家族性缺陷推断该线路上目前有{len(risk_devices)}个设备存在风险；"
+
+    # 风险描述：全部风险设备去重后截取前 10 条
+    device_risk_desc = []
+    unique_descriptions = set()
+    for device in device_info_list:
+        if device.get("risk_level") != "是":
+            continue
+        risk_desc = []
+        if device.get("run_time"):
+            risk_desc.append(f"该设备于{device['run_time']}投运。")
+        recent_data = []
+        if device.get("fault_count") > 0:
+            recent_data.append("存在故障未处理")
+        if device.get("defect_count") > 0:
+            recent_data.append("存在缺陷未进行消缺")
+        if device.get("hidden_count") > 0:
+            recent_data.append("存在隐患还未完成治理并验收")
+        if recent_data:
+            risk_desc.append(f"近90天内最近一次的数据显示, 该设备{','.join(recent_data)}。")
+        history_data = []
+        if device.get("fault_history_count") > 0:
+            history_data.append("存在故障的历史记录")
+        if device.get("defect_history_count") > 0:
+            history_data.append("存在缺陷的历史记录")
+        if device.get("hidden_history_count") > 0:
+            history_data.append("存在隐患的历史记录")
+        if history_data:
+            risk_desc.append(f"根据历史同期的数据显示, 该设备{','.join(history_data)}。")
+        if device.get("has_family_defect"):
+            risk_desc.append("存在家族性缺陷")
+        desc_str = "".join(risk_desc)
+        if desc_str not in unique_descriptions:
+            unique_descriptions.add(desc_str)
+            device_risk_desc.append({
+                "设备名称": device["device_name"],
+                "设备类型": device["device_type_name"],
+                "风险描述": desc_str,
+            })
+    device_risk_desc = device_risk_desc[:10]
+
+    overloaded = f"该线路在停电事件发生前处于{rated_date}运行状态" if "过载" in rated_date or "重载" in rated_date else ""
+    judge_basis = {
+        "线路导线类型": line_wire_des,
+        "风险设备数描述": risk_devices_desc,
+        "重过载": overloaded,
+    }
+    return {
+        "code": 10000,
+        "success": True,
+        "data": {
+            "设备类型统计": device_type_stats,
+            "线路导线类型": line_wire_des,
+            "风险设备数描述": risk_devices_desc,
+            "重过载": overloaded,
+            "设备风险描述": device_risk_desc,
+            "判定依据": judge_basis,
+            "存在风险的设备数": len(risk_devices),
+            "outage_number": device_data.get("outageNumber", ""),
+        },
+        "msg": "设备数据处理成功",
+    }
+
+
+def load_expected() -> Dict[str, Any]:
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@contextmanager
+def columnar_mode(enabled: bool) -> Iterator[None]:
+    """临时切换 process_device_info_data 的列式统计开关（阈值为 0，不受设备数限制）"""
+    original = device_service.config
+    device_service.config = original.model_copy(
+        update={"device_columnar_enabled": enabled, "device_columnar_threshold": 0}
+    )
+    try:
+        yield
+    finally:
+        device_service.config = original
+
+
+def check_equivalence() -> None:
+    """逐个用例对比处理结果与基准输出，逐设备累计和列式统计各校验一次"""
+    for name, expected in load_expected().items():
+        for columnar in (False, True):
+            with columnar_mode(columnar):
+                actual = process_device_info_data(CASES[name](), REFERENCE_TIME)
+            if actual != expected:
+                mode = "列式统计" if columnar else "逐设备累计"
+                raise AssertionError(f"用例 {name} 的处理结果（{mode}）与基准输出不一致")
+        data = actual["data"]
+        print(f"  {name:>21}: 输出一致（风险设备 {data['存在风险的设备数']}，风险描述 {len(data['设备风险描述'])}）")
+
+
+def write_fixture() -> None:
+    """用原多遍历参考实现生成基准输出"""
+    expected = {name: reference_process_device_info_data(build(), REFERENCE_TIME) for name, build in CASES.items()}
+    with open(FIXTURE_PATH, "w", encoding="utf-8") as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2)
+    print(f"已写入基准输出: {FIXTURE_PATH}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="设备统计聚合基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--check-only", action="store_true", help="只做等价性校验")
+    parser.add_argument("--write-fixture", action="store_true", help="用多遍历参考实现重新生成基准输出")
+    args = parser.parse_args()
+
+    if args.write_fixture:
+        write_fixture()
+        return
+
+    print("等价性校验:")
+    check_equivalence()
+    if args.check_only:
+        return
+
+    print("\n耗时（取最小值）:")
+    print(f"  {'设备数':>6} {'逐设备累计':>10} {'列式统计':>10}")
+    for size in args.sizes:
+        payload = generate_device_payload(size)
+        best = {False: float("inf"), True: float("inf")}
+        for _ in range(args.repeat):
+            for columnar in (False, True):
+                with columnar_mode(columnar):
+                    start = time.perf_counter()
+                    process_device_info_data(payload, REFERENCE_TIME)
+                    best[columnar] = min(best[columnar], time.perf_counter() - start)
+        print(f"  {size:>9} {best[False] * 1000:>10.1f}ms {best[True] * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
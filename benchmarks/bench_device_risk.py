@@ -0,0 +1,90 @@
+"""
+设备风险批量计算基准测试 - 对比逐个 calculate_device_risk 与批量 calculate_device_risks
+
+两种方式使用同一参考时间和同一批设备信息，校验结果（含 processed_defect_list）完全一致后输出多次运行的最小耗时。
+
+使用方法:
+    python -m benchmarks.bench_device_risk --sizes 1000 10000 100000
+"""
+import argparse
+import copy
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from src.services.device_service import (
+    build_cable_segment_index,
+    build_device_info,
+    calculate_device_risk,
+    calculate_device_risks,
+    normalize_psr_type,
+)
+from src.utils import logger
+
+from .synthetic import generate_device_payload
+
+
+# 混入少量非标准投运时间，覆盖逐个解析的兜底分支
+IRREGULAR_RUN_TIMES = ["", "2020-02-30 00:00:00", "2019-1-5 8:00:00", "未知", "2021-06-01"]
+
+
+def generate_risk_devices(size: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """按 process_device_info_data 的方式（去重、构建电缆段索引、build_device_info）生成设备信息列表
+
+    非标准投运时间写入上游原始数据，由 build_device_info 带入设备信息。
+    """
+    rng = random.Random(seed)
+    seen_psr_ids = set()
+    unique_devices = []
+    for raw in generate_device_payload(size, seed)["data"]:
+        psr_id = raw.get("psr_id", "")
+        if psr_id and psr_id not in seen_psr_ids:
+            seen_psr_ids.add(psr_id)
+            if rng.random() < 0.01:
+                raw["start_time"] = raw["operate_date"] = rng.choice(IRREGULAR_RUN_TIMES)
+            unique_devices.append(raw)
+
+    segment_index = build_cable_segment_index(unique_devices)
+    devices = []
+    for raw in unique_devices:
+        device_type = normalize_psr_type(raw.get("psrType"))
+        if device_type == "xndl":
+            continue
+        devices.append(build_device_info(raw, device_type, unique_devices, segment_index))
+    return devices
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="设备风险批量计算基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # 非标准投运时间会记录错误日志，计时时关闭日志以只比较计算本身
+    logger.disable("src")
+    now = datetime(2025, 6, 1, 12, 0, 0)
+    print(f"{'设备数':>8} {'逐个计算':>10} {'批量计算':>10} {'加速比':>8}")
+    for size in args.sizes:
+        devices = generate_risk_devices(size)
+        scalar_time = batch_time = float("inf")
+        for _ in range(args.repeat):
+            scalar_devices = copy.deepcopy(devices)
+            batch_devices = copy.deepcopy(devices)
+
+            start = time.perf_counter()
+            scalar = [calculate_device_risk(device, now) for device in scalar_devices]
+            scalar_time = min(scalar_time, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            batch = calculate_device_risks(batch_devices, now)
+            batch_time = min(batch_time, time.perf_counter() - start)
+
+            if scalar != batch or scalar_devices != batch_devices:
+                raise AssertionError(f"设备数 {size}: 批量结果与逐个计算结果不一致")
+
+        print(f"{size:>8} {scalar_time * 1000:>8.1f}ms {batch_time * 1000:>8.1f}ms {scalar_time / batch_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+HTTP 连接池基准测试 - 对比逐次 requests.post 与共享 keep-alive Session 的吞吐量
+
+使用方法:
+    python -m benchmarks.bench_http_pool --requests 2000 --threads 8
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import requests
+
+from src.services.http_client import close_http_session, get_http_session, get_pool_stats
+
+from .stub_server import start_stub_server
+
+
+PAYLOAD = {"outageNumber": "BENCH-001"}
+
+
+def run_round(name: str, send: Callable[[], None], total: int, threads: int) -> float:
+    """执行一轮压测，返回每秒请求数"""
+    start = time.perf_counter()
+    if threads <= 1:
+        for _ in range(total):
+            send()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for future in [executor.submit(send) for _ in range(total)]:
+                future.result()
+    elapsed = time.perf_counter() - start
+    rps = total / elapsed
+    print(f"  {name:<28} {total:>6} 次请求  {elapsed:>7.2f}s  {rps:>9.1f} req/s")
+    return rps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP 连接池基准测试")
+    parser.add_argument("--requests", type=int, default=2000, help="每轮请求数")
+    parser.add_argument("--threads", type=int, default=8, help="并发线程数")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    url = f"{base_url}/outage/event/query"
+    print(f"桩服务: {base_url}")
+
+    def per_call() -> None:
+        requests.post(url, json=PAYLOAD, timeout=10).raise_for_status()
+
+    def pooled() -> None:
+        get_http_session().post(url, json=PAYLOAD, timeout=10).raise_for_status()
+
+    try:
+        for threads in sorted({1, args.threads}):
+            print(f"\n并发线程数: {threads}")
+            baseline = run_round("requests.post (逐次连接)", per_call, args.requests, threads)
+            improved = run_round("共享 Session (连接池)", pooled, args.requests, threads)
+            print(f"  提升: {improved / baseline:.2f}x")
+
+        print("\n连接池统计:")
+        for stat in get_pool_stats():
+            print(f"  {stat}")
+    finally:
+        close_http_session()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
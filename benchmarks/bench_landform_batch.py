@@ -0,0 +1,86 @@
+"""
+地貌批量查询基准测试 - 对比逐个查询、并发查询与批量接口的往返次数和耗时
+
+每种模式在独立子进程中运行，以便使用不同配置并保证地貌缓存为空。
+
+使用方法:
+    python -m benchmarks.bench_landform_batch --towers 200 --latency 0.02
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from .stub_server import LANDFORM_BATCH_PATH, start_stub_server
+
+
+def generate_positions(towers: int, seed: int = 7) -> List[str]:
+    """生成沿线杆塔坐标，约三成坐标与其他杆塔重复"""
+    rng = random.Random(seed)
+    lon, lat = 120.1, 30.2
+    positions: List[str] = []
+    for _ in range(towers):
+        if positions and rng.random() < 0.3:
+            positions.append(rng.choice(positions))
+            continue
+        lon += rng.uniform(0.0005, 0.002)
+        lat += rng.uniform(-0.001, 0.001)
+        positions.append(f"{lon:.6f},{lat:.6f}")
+    return positions
+
+
+def _run_mode(mode: str, env: Dict[str, str], positions: List[str], queue: Any) -> None:
+    os.environ.update(env)
+
+    from src.services import get_landform, get_landforms
+
+    start = time.perf_counter()
+    if mode == "serial":
+        results = {position: get_landform(position) for position in positions}
+    else:
+        results = get_landforms(positions)
+    queue.put((time.perf_counter() - start, len(results)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="地貌批量查询基准测试")
+    parser.add_argument("--towers", type=int, default=200, help="杆塔坐标数")
+    parser.add_argument("--latency", type=float, default=0.02, help="桩服务每次请求的模拟延迟（秒）")
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency)
+    positions = generate_positions(args.towers)
+    print(f"桩服务: {base_url}  坐标数: {len(positions)}  去重后: {len(set(positions))}")
+
+    base_env = {"LANDFORM_URL": base_url, "API2MCP_LANDFORM_CACHE_ENABLED": "true"}
+    modes = [
+        ("serial", "逐个查询 get_landform", base_env),
+        ("fanout", "get_landforms 并发", base_env),
+        ("batch", "get_landforms 批量接口", {
+            **base_env,
+            "API2MCP_LANDFORM_BATCH_PATH": LANDFORM_BATCH_PATH,
+            "API2MCP_LANDFORM_BATCH_SIZE": str(args.batch_size),
+        }),
+    ]
+
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        for mode, label, env in modes:
+            server.reset_counts()
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run_mode, args=(mode, env, positions, queue))
+            process.start()
+            elapsed, resolved = queue.get()
+            process.join()
+            round_trips = sum(server.request_counts.values())
+            print(f"  {label:<24} 往返 {round_trips:>4} 次  耗时 {elapsed * 1000:>8.1f}ms  结果 {resolved} 个")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+MCP 端到端压测 - 多个并发 MCP 会话按配置的比例调用工具，统计吞吐、各工具延迟分位数、错误率和服务端内存
+
+默认在本机启动桩数据服务（独立进程，合成数据或回放磁带）和 MCP 服务器子进程；
+传入 --url 时压测已运行的服务器，配合 --server-pid 采样其内存。
+客户端按 URL 选择传输方式：以 /sse 结尾使用 SSE，以 /mcp 结尾使用 Streamable HTTP。
+
+使用方法:
+    python -m benchmarks.bench_mcp_load --sessions 20 --duration 30
+    python -m benchmarks.bench_mcp_load --mix get_event_data=4 analyze_outage=1 --latency 0.05 --error-rate 0.01
+    python -m benchmarks.bench_mcp_load --cassette data/cassette.jsonl --sessions 50
+    python -m benchmarks.bench_mcp_load --transport streamable-http --workers 4
+    python -m benchmarks.bench_mcp_load --url http://127.0.0.1:9090/sse --server-pid 12345
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .stub_server import StubServer
+from .synthetic import generate_device_payload, generate_weather_payload
+
+# 各工具的调用参数，按停电事件编号生成
+TOOL_ARGUMENTS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "get_event_data": lambda n: {"outage_number": n},
+    "get_weather_data": lambda n: {"outage_number": n, "analysis_type": 1},
+    "work_order_query_tool": lambda n: {"outage_number": n, "analysis_type": 1},
+    "get_environment_raw_data": lambda n: {"outage_number": n},
+    "get_message_data": lambda n: {"outage_number": n, "analysis_type": 1},
+    "get_wave_data": lambda n: {"outage_number": n, "analysis_type": 1},
+    "get_device_info_data": lambda n: {"outage_number": n},
+    "analyze_outage": lambda n: {"outage_number": n, "analysis_type": 1},
+    "get_event_data_batch": lambda n: {"outage_numbers": [n]},
+}
+
+DEFAULT_MIX = ["get_event_data=4", "get_weather_data=2", "get_device_info_data=1", "analyze_outage=1"]
+
+
+def parse_mix(items: List[str]) -> Dict[str, float]:
+    """解析 工具=权重 列表"""
+    mix: Dict[str, float] = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in TOOL_ARGUMENTS:
+            raise SystemExit(f"不支持的工具: {name}，可选: {', '.join(TOOL_ARGUMENTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩法计算分位数"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _process_tree(pid: int) -> List[int]:
+    """进程及其全部子进程（多进程模式的 worker、批量处理进程池）"""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", encoding="ascii") as f:
+            for child in f.read().split():
+                pids.extend(_process_tree(int(child)))
+    except (OSError, ValueError):
+        pass
+    return pids
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """从 /proc 读取进程及其子进程的常驻内存之和（MB），不可用时返回 None"""
+    total = 0
+    for process in _process_tree(pid):
+        try:
+            with open(f"/proc/{process}/status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        except (OSError, ValueError):
+            continue
+    return total / 1024 if total else None
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"等待端口 {port} 超时")
+
+
+def _serve_stub(port: int, devices: int, options: Dict[str, Any]) -> None:
+    """在独立进程中运行桩服务，避免与压测客户端争用 GIL"""
+    server = StubServer(("127.0.0.1", port), **options)
+    if not options.get("cassette"):
+        server.set_response("/outage-data/test/agent", generate_device_payload(devices))
+        server.set_response("/api/weather/data/portrait", generate_weather_payload(200))
+    server.serve_forever()
+
+
+def start_stub(args: argparse.Namespace) -> Tuple[multiprocessing.Process, str]:
+    """在独立进程中启动桩服务，返回 (进程, 地址)"""
+    port = _free_port()
+    options = {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate,
+               "cassette": args.cassette, "seed": args.seed}
+    stub = multiprocessing.get_context("spawn").Process(
+        target=_serve_stub, args=(port, args.devices, options), daemon=True
+    )
+    stub.start()
+    _wait_for_port(port, 30)
+    return stub, f"http://127.0.0.1:{port}"
+
+
+def start_server(stub_url: str, transport: str, workers: int, log_path: str) -> Tuple[subprocess.Popen, str]:
+    """以子进程启动 MCP 服务器，上游指向桩服务，返回 (进程, MCP 地址)"""
+    port = _free_port()
+    env = {**os.environ, "MCP_HOST": "127.0.0.1", "MCP_PORT": str(port),
+           "MCP_TRANSPORT": transport, "MCP_WORKERS": str(workers),
+           "DATA_SERVICE_BASE_URL": stub_url, "LANDFORM_URL": stub_url}
+    with open(log_path, "w", encoding="utf-8") as log:
+        server = subprocess.Popen([sys.executable, "-m", "src.api.main"], env=env, stdout=log, stderr=log)
+    _wait_for_port(port, 60)
+    path = "sse" if transport == "sse" else "mcp"
+    return server, f"http://127.0.0.1:{port}/{path}"
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+class LoadStats:
+    """按工具记录调用延迟和错误，按时间段记录完成数"""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.error_samples: Dict[str, str] = {}
+        self.session_errors: List[str] = []
+        self.completed = 0
+
+    def record(self, tool: str, elapsed: float, error: Optional[str]) -> None:
+        self.latencies[tool].append(elapsed)
+        self.completed += 1
+        if error is not None:
+            self.errors[tool] += 1
+            self.error_samples.setdefault(tool, error[:200])
+
+
+async def _ignore_log(message: Any) -> None:
+    """丢弃服务端推送的日志通知（批量工具会逐个推送结果）"""
+
+
+async def run_session(
+        url: str,
+        mix: Dict[str, float],
+        outage_numbers: List[str],
+        deadline: float,
+        stats: LoadStats,
+        seed: int,
+        timeout: float,
+) -> None:
+    """单个 MCP 会话：在截止时间前按权重随机调用工具"""
+    from fastmcp import Client
+
+    rng = random.Random(seed)
+    tools, weights = list(mix), list(mix.values())
+    try:
+        async with Client(url, timeout=timeout, log_handler=_ignore_log) as client:
+            while time.perf_counter() < deadline:
+                tool = rng.choices(tools, weights)[0]
+                arguments = TOOL_ARGUMENTS[tool](rng.choice(outage_numbers))
+                start = time.perf_counter()
+                error = None
+                try:
+                    result = await client.call_tool(tool, arguments, raise_on_error=False)
+                    if result.is_error:
+                        error = str(result.content[0].text if result.content else "工具返回错误")
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                stats.record(tool, time.perf_counter() - start, error)
+    except Exception as e:
+        stats.session_errors.append(f"{type(e).__name__}: {e}")
+
+
+async def sample_rss(pid: Optional[int], interval: float, deadline: float, stats: LoadStats,
+                     samples: List[Tuple[float, int, Optional[float]]]) -> None:
+    """定期采样服务端内存并输出区间吞吐"""
+    start = time.perf_counter()
+    last_elapsed, last_completed = 0.0, 0
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(min(interval, max(0.0, deadline - time.perf_counter())))
+        elapsed = time.perf_counter() - start
+        rss = read_rss_mb(pid) if pid else None
+        completed = stats.completed
+        samples.append((elapsed, completed, rss))
+        rate = (completed - last_completed) / (elapsed - last_elapsed) if elapsed > last_elapsed else 0.0
+        rss_text = f"{rss:.1f}MB" if rss is not None else "-"
+        print(f"  {elapsed:>6.1f}s  完成 {completed:>7}  区间吞吐 {rate:>8.1f}/s  服务端 RSS {rss_text}")
+        last_elapsed, last_completed = elapsed, completed
+
+
+async def run_load(args: argparse.Namespace, url: str, pid: Optional[int]) -> Tuple[LoadStats, float, list]:
+    mix = parse_mix(args.mix)
+    outage_numbers = [f"LOAD-{i:04d}" for i in range(args.outages)]
+    stats = LoadStats()
+    samples: List[Tuple[float, int, Optional[float]]] = []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(
+        sample_rss(pid, args.interval, deadline, stats, samples),
+        *(run_session(url, mix, outage_numbers, deadline, stats, args.seed + i, args.timeout)
+          for i in range(args.sessions)),
+    )
+    return stats, time.perf_counter() - start, samples
+
+
+def report(stats: LoadStats, elapsed: float, samples: list, args: argparse.Namespace) -> Dict[str, Any]:
+    total = sum(len(values) for values in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    summary: Dict[str, Any] = {
+        "sessions": args.sessions,
+        "duration": round(elapsed, 2),
+        "calls": total,
+        "throughput": round(total / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "session_errors": len(stats.session_errors),
+        "tools": {},
+        "rss_mb": [round(rss, 1) for _, _, rss in samples if rss is not None],
+    }
+
+    print(f"\n会话 {args.sessions} 个，耗时 {elapsed:.1f}s，调用 {total} 次，"
+          f"吞吐 {summary['throughput']:.1f} 次/秒，错误率 {summary['error_rate']:.2%}")
+    print(f"{'工具':<24} {'调用':>7} {'错误率':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'最大':>9}")
+    for tool in sorted(stats.latencies):
+        values = sorted(stats.latencies[tool])
+        row = {
+            "calls": len(values),
+            "error_rate": round(stats.errors[tool] / len(values), 4),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1),
+        }
+        summary["tools"][tool] = row
+        print(f"{tool:<24} {row['calls']:>7} {row['error_rate']:>8.2%} {row['p50_ms']:>7.1f}ms "
+              f"{row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms {row['max_ms']:>7.1f}ms")
+
+    if summary["rss_mb"]:
+        rss = summary["rss_mb"]
+        print(f"服务端 RSS: 起始 {rss[0]:.1f}MB  峰值 {max(rss):.1f}MB  结束 {rss[-1]:.1f}MB")
+    for tool, sample in stats.error_samples.items():
+        print(f"错误示例 [{tool}]: {sample}")
+    if stats.session_errors:
+        print(f"会话异常 {len(stats.session_errors)} 个，示例: {stats.session_errors[0][:200]}")
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="MCP 端到端压测")
+    parser.add_argument("--url", help="已运行的 MCP 服务器地址（如 http://127.0.0.1:9090/sse），为空时在本机启动")
+    parser.add_argument("--server-pid", type=int, help="已运行服务器的进程号，用于采样内存")
+    parser.add_argument("--sessions", type=int, default=10, help="并发 MCP 会话数")
+    parser.add_argument("--duration", type=float, default=20.0, help="压测时长（秒）")
+    parser.add_argument("--mix", nargs="+", default=DEFAULT_MIX, help="工具调用比例，格式 工具=权重")
+    parser.add_argument("--outages", type=int, default=20, help="随机使用的停电事件编号数")
+    parser.add_argument("--interval", type=float, default=2.0, help="内存采样和进度输出间隔（秒）")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单次工具调用超时（秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="将汇总结果写入 JSON 文件")
+    # 本机启动时的桩服务参数
+    parser.add_argument("--devices", type=int, default=2000, help="合成设备数据的设备数")
+    parser.add_argument("--latency", type=float, default=0.02, help="桩服务每次请求的模拟延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="桩服务延迟抖动（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="桩服务返回 503 的概率")
+    parser.add_argument("--cassette", help="桩服务回放的磁带文件，指定后不使用合成数据")
+    parser.add_argument("--server-log", default=os.devnull, help="本机启动的 MCP 服务器输出文件")
+    parser.add_argument("--transport", choices=["sse", "streamable-http"], default="sse", help="本机启动的服务器的传输方式")
+    parser.add_argument("--workers", type=int, default=1, help="本机启动的服务器进程数（大于 1 时需 streamable-http）")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+
+    stub: Optional[multiprocessing.Process] = None
+    server: Optional[subprocess.Popen] = None
+    url, pid = args.url, args.server_pid
+    try:
+        if url is None:
+            stub, stub_url = start_stub(args)
+            server, url = start_server(stub_url, args.transport, args.workers, args.server_log)
+            pid = server.pid
+            print(f"桩服务: {stub_url}  MCP 服务器: {url}（pid {pid}）")
+
+        print(f"压测 {url}: 会话 {args.sessions} 个，时长 {args.duration:.0f}s，比例 {' '.join(args.mix)}")
+        stats, elapsed, samples = asyncio.run(run_load(args, url, pid))
+        summary = report(stats, elapsed, samples, args)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+    finally:
+        if server is not None:
+            stop_server(server)
+        if stub is not None:
+            stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
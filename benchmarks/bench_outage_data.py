@@ -0,0 +1,84 @@
+"""
+停电事件原始数据共享拉取基准测试 - 设备信息和环境数据工具共用一次 `/outage-data/test/agent` 请求
+
+桩服务对该接口返回合成设备数据；每个停电事件依次调用 get_device_info_data 和
+get_environment_raw_data，对比不共享（窗口为 0）与共享两种模式的上游请求数、字节数和工具耗时。
+
+使用方法:
+    python -m benchmarks.bench_outage_data --outages 5 --devices 20000 --latency 0.05
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from typing import Any, Dict
+
+from .stub_server import start_stub_server
+from .synthetic import generate_device_payload
+
+OUTAGE_DATA_PATH = "/outage-data/test/agent"
+
+
+def _run_mode(env: Dict[str, str], outages: int, queue: Any) -> None:
+    os.environ.update(env)
+
+    from src.api.main import get_device_info_data, get_environment_raw_data
+    from src.services import get_outage_data_stats, get_upstream_stats
+
+    timings: Dict[str, float] = {"get_device_info_data": 0.0, "get_environment_raw_data": 0.0}
+
+    async def timed(name: str, tool: Any, outage_number: str) -> None:
+        start = time.perf_counter()
+        await tool.fn(outage_number)
+        timings[name] += time.perf_counter() - start
+
+    async def run_agent(outage_number: str) -> None:
+        await timed("get_device_info_data", get_device_info_data, outage_number)
+        await timed("get_environment_raw_data", get_environment_raw_data, outage_number)
+
+    async def run() -> None:
+        await asyncio.gather(*(run_agent(f"BENCH-{i:03d}") for i in range(outages)))
+
+    asyncio.run(run())
+    upstream = get_upstream_stats().get(OUTAGE_DATA_PATH, {"requests": 0, "bytes": 0})
+    queue.put(({name: total / outages for name, total in timings.items()}, upstream, get_outage_data_stats()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="停电事件原始数据共享拉取基准测试")
+    parser.add_argument("--outages", type=int, default=5, help="停电事件数")
+    parser.add_argument("--devices", type=int, default=20000, help="每个停电事件的设备数")
+    parser.add_argument("--latency", type=float, default=0.05, help="桩服务每次请求的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency)
+    server.set_response(OUTAGE_DATA_PATH, generate_device_payload(args.devices))
+    print(f"桩服务: {base_url}  停电事件: {args.outages}  响应大小: {len(server.responses[OUTAGE_DATA_PATH]) / 1024:.0f}KB")
+
+    base_env = {"DATA_SERVICE_BASE_URL": base_url}
+    modes = [
+        ("不共享", {**base_env, "API2MCP_OUTAGE_DATA_WINDOW": "0"}),
+        ("共享拉取", base_env),
+    ]
+
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        for label, env in modes:
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run_mode, args=(env, args.outages, queue))
+            process.start()
+            timings, upstream, stats = queue.get()
+            process.join()
+            print(
+                f"  {label:<8} 上游请求 {upstream['requests']:>3} 次  拉取 {upstream['bytes'] / 1024 / 1024:>6.1f}MB  "
+                f"设备工具 {timings['get_device_info_data'] * 1000:>7.1f}ms  "
+                f"环境工具 {timings['get_environment_raw_data'] * 1000:>7.1f}ms  复用 {stats['shared']} 次"
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+报文日志基准测试 - 对比 process_message_data 原先整段写入 INFO 日志与 log_payload 的每次调用开销
+
+日志处理器与 src/utils/logger.py 一致：标准错误（INFO，这里写入 /dev/null）和排队写入的
+文件（DEBUG，写入临时目录）。计时包含 logger.complete()，即后台线程写完文件的时间。
+
+使用方法:
+    python -m benchmarks.bench_payload_logging
+    python -m benchmarks.bench_payload_logging --sizes 100 1000 5000 --calls 200 --sample-rate 0.1
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Callable
+
+from src.services import process_message_data
+from src.utils import config, log_payload, logger
+
+from .synthetic import generate_message_payload, generate_wave_payload
+
+
+def legacy_log(res: str, wave_data_str: str) -> None:
+    """原先 process_message_data 中的日志写法"""
+    logger.info(f"报文数据: {res}")
+    logger.info(f"录波数据: {wave_data_str}")
+
+
+def payload_log(res: str, wave_data_str: str) -> None:
+    log_payload("process_message_data", "报文数据", res)
+    log_payload("process_message_data", "录波数据", wave_data_str)
+
+
+def configure_sinks(directory: str) -> None:
+    logger.remove()
+    logger.add(open(os.devnull, "w"), level="INFO", colorize=True,
+               format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | {message}")
+    logger.add(os.path.join(directory, "bench.log"), level="DEBUG", enqueue=True,
+               format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}")
+
+
+def per_call_us(func: Callable[[str, str], None], res: str, wave: str, calls: int) -> float:
+    """每次调用的平均耗时（微秒），包含排队日志写完的时间"""
+    func(res, wave)
+    logger.complete()
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(res, wave)
+    logger.complete()
+    return (time.perf_counter() - start) * 1e6 / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="报文日志基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000], help="SOE 条目数")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--sample-rate", type=float, default=config.payload_log_sample_rate,
+                        help="process_message_data 的报文内容采样率")
+    args = parser.parse_args()
+
+    config.payload_log_sample_rates["process_message_data"] = args.sample_rate
+    wave = json.dumps(generate_wave_payload(), ensure_ascii=False)
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure_sinks(directory)
+        print(f"采样率 {args.sample_rate}，每种写法调用 {args.calls} 次\n")
+        print(f"{'SOE条目':>8} {'报文大小':>10} {'整段写入':>10} {'log_payload':>12} {'降低':>7} {'处理函数':>10}")
+        for size in args.sizes:
+            res = json.dumps(generate_message_payload(size), ensure_ascii=False)
+            legacy = per_call_us(legacy_log, res, wave, args.calls)
+            bounded = per_call_us(payload_log, res, wave, args.calls)
+            process = per_call_us(process_message_data, res, wave, args.calls)
+            print(
+                f"{size:>8} {len(res) / 1024:>8.1f}KB {legacy:>8.0f}us {bounded:>10.0f}us "
+                f"{1 - bounded / legacy:>7.0%} {process:>8.0f}us"
+            )
+        logger.remove()
+
+
+if __name__ == "__main__":
+    main()
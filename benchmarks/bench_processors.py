@@ -0,0 +1,226 @@
+"""
+处理函数基准测试 - 按递增规模计时各处理函数，并与基线对比标记性能回退
+
+计时对象: process_device_info_data、calculate_device_risk（逐个设备）、build_tree_structure、
+process_weather_data、process_environment_data、process_message_data。
+输入由 synthetic 中的生成器按固定 seed 生成，规模含义分别为设备数、风险设备数、
+环境信息条目数和 SOE 条目数。
+
+基线保存在 fixtures/processor_baseline.json，同时记录生成时的机器信息和一段固定纯 Python
+负载的校准耗时；对比时按本次与基线的校准耗时之比换算基线，抵消机器快慢的差异。
+有意的性能变化后使用 --write-baseline 重新生成。
+
+使用方法:
+    python -m benchmarks.bench_processors
+    python -m benchmarks.bench_processors --sizes 1000 10000 --only process_weather_data process_message_data
+    python -m benchmarks.bench_processors --write-baseline
+"""
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.services import (
+    build_cable_segment_index,
+    build_tree_structure,
+    calculate_device_risk,
+    normalize_psr_type,
+    process_device_info_data,
+    process_environment_data,
+    process_message_data,
+    process_weather_data,
+)
+from src.services.device_service import build_device_info
+from src.utils import logger
+
+from .bench_device_risk import generate_risk_devices
+from .synthetic import (
+    generate_device_payload,
+    generate_environment_payload,
+    generate_message_payload,
+    generate_wave_payload,
+    generate_weather_payload,
+)
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "processor_baseline.json")
+
+# 固定参考时间，保证运行年限等结果与运行日期无关
+REFERENCE_TIME = datetime(2025, 6, 1, 12, 0, 0)
+OUTAGE_DATE = date(2025, 6, 1)
+
+# 每个用例: 规模 -> (每次计时前准备输入, 被计时的调用)
+Case = Callable[[int], Tuple[Callable[[], Any], Callable[[Any], Any]]]
+
+
+def _device_info_list(size: int) -> List[Dict[str, Any]]:
+    """按 process_device_info_data 的前两步生成 build_tree_structure 的输入"""
+    devices = generate_device_payload(size)["data"]
+    segment_index = build_cable_segment_index(devices)
+    return [
+        build_device_info(device, device_type, devices, segment_index)
+        for device in devices
+        if (device_type := normalize_psr_type(device.get("psrType"))) != "xndl"
+    ]
+
+
+def device_info_case(size: int) -> Tuple[Callable[[], Any], Callable[[Any], Any]]:
+    payload = generate_device_payload(size)
+    return lambda: payload, lambda data: process_device_info_data(data, REFERENCE_TIME)
+
+
+def device_risk_case(size: int) -> Tuple[Callable[[], Any], Callable[[Any], Any]]:
+    # calculate_device_risk 会写入 processed_defect_list，每次计时使用新副本
+    devices = generate_risk_devices(size)
+    return (lambda: copy.deepcopy(devices),
+            lambda data: [calculate_device_risk(device, REFERENCE_TIME) for device in data])
+
+
+def tree_case(size: int) -> Tuple[Callable[[], Any], Callable[[Any], Any]]:
+    # build_tree_structure 会给设备添加 children，每次计时使用新副本
+    devices = _device_info_list(size)
+    return lambda: [dict(device) for device in devices], build_tree_structure
+
+
+def weather_case(size: int) -> Tuple[Callable[[], Any], Callable[[Any], Any]]:
+    payload = generate_weather_payload(size)
+    return lambda: payload, process_weather_data
+
+
+def environment_case(size: int) -> Tuple[Callable[[], Any], Callable[[Any], Any]]:
+    payload = generate_environment_payload(size)
+    return lambda: payload, lambda data: process_environment_data(data, OUTAGE_DATE)
+
+
+def message_case(size: int) -> Tuple[Callable[[], Any], Callable[[Any], Any]]:
+    res = json.dumps(generate_message_payload(size), ensure_ascii=False)
+    wave = json.dumps(generate_wave_payload(), ensure_ascii=False)
+    return lambda: (res, wave), lambda data: process_message_data(*data)
+
+
+CASES: Dict[str, Case] = {
+    "process_device_info_data": device_info_case,
+    "calculate_device_risk": device_risk_case,
+    "build_tree_structure": tree_case,
+    "process_weather_data": weather_case,
+    "process_environment_data": environment_case,
+    "process_message_data": message_case,
+}
+
+
+def measure(case: Case, size: int, repeat: int) -> float:
+    """预热一次后多次运行取最小耗时（毫秒），输入准备不计入耗时
+
+    与 timeit 相同，计时期间关闭垃圾回收，减少回收时机不同带来的抖动。
+    """
+    prepare, run = case(size)
+    run(prepare())
+    best = float("inf")
+    for _ in range(repeat):
+        data = prepare()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(data)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best * 1000
+
+
+def calibrate(repeat: int = 5) -> float:
+    """固定纯 Python 负载的最小耗时（毫秒），用于换算不同机器上的基线"""
+    payload = generate_weather_payload(2000, seed=0)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(5):
+            json.loads(json.dumps(payload, ensure_ascii=False))
+            sorted(str(i) for i in range(20000))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def load_baseline() -> Dict[str, Any]:
+    if not os.path.exists(BASELINE_PATH):
+        return {"machine": {}, "results": {}}
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_baseline(results: Dict[str, Dict[str, float]], calibration: float) -> None:
+    """合并写入基线，未运行的用例和规模保留原值（按校准耗时换算到本机）"""
+    baseline = load_baseline()
+    scale = calibration / baseline["calibration_ms"] if baseline.get("calibration_ms") else 1.0
+    for name, timings in baseline["results"].items():
+        for size in timings:
+            timings[size] = round(timings[size] * scale, 2)
+    for name, timings in results.items():
+        baseline["results"].setdefault(name, {}).update(timings)
+    baseline["calibration_ms"] = round(calibration, 2)
+    baseline["machine"] = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+    with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+    print(f"已写入基线: {BASELINE_PATH}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="处理函数基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=list(CASES), help="只运行指定的处理函数")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="超过基线该比例视为回退（单次计时抖动较大，默认放宽到 50%）")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="与基线的差值小于该值时不视为回退")
+    parser.add_argument("--write-baseline", action="store_true", help="用本次结果更新基线")
+    args = parser.parse_args()
+
+    # process_message_data 会把整段报文写入日志，计时时关闭日志以只比较处理本身
+    logger.disable("src")
+    stored = load_baseline()
+    baseline = stored["results"]
+    calibration = calibrate()
+    scale = calibration / stored["calibration_ms"] if stored.get("calibration_ms") else 1.0
+    print(f"校准耗时 {calibration:.1f}ms，基线按 {scale:.2f} 倍换算\n")
+    results: Dict[str, Dict[str, float]] = {}
+    regressions: List[str] = []
+
+    print(f"{'处理函数':<26} {'规模':>7} {'耗时':>10} {'基线':>10} {'变化':>8}")
+    for name in args.only or CASES:
+        for size in args.sizes:
+            elapsed = measure(CASES[name], size, args.repeat)
+            results.setdefault(name, {})[str(size)] = round(elapsed, 2)
+
+            expected = baseline.get(name, {}).get(str(size))
+            if expected is not None:
+                expected *= scale
+            if expected is None:
+                print(f"{name:<26} {size:>7} {elapsed:>8.1f}ms {'-':>10} {'-':>8}")
+                continue
+            change = elapsed / expected - 1 if expected else 0.0
+            regressed = change > args.tolerance and elapsed - expected > args.min_delta_ms
+            flag = "  回退" if regressed else ""
+            print(f"{name:<26} {size:>7} {elapsed:>8.1f}ms {expected:>8.1f}ms {change:>+7.0%}{flag}")
+            if regressed:
+                regressions.append(f"{name} @ {size}")
+
+    if args.write_baseline:
+        write_baseline(results, calibration)
+        return
+    if regressions:
+        print(f"\n性能回退（超过基线 {args.tolerance:.0%}）: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
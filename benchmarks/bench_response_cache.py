@@ -0,0 +1,90 @@
+"""
+数据服务响应缓存基准测试 - 多个智能体同时分析相同停电事件时的上游请求数和耗时
+
+每个智能体并发调用事件、天气、工单、报文、录波五个接口；
+关闭缓存和开启缓存两种模式分别在独立子进程中运行。
+
+使用方法:
+    python -m benchmarks.bench_response_cache --agents 20 --outages 3 --latency 0.05
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from typing import Any, Dict, List
+
+from .stub_server import start_stub_server
+
+
+def _agent_calls(outage_number: str) -> List[tuple[str, str, Dict[str, Any]]]:
+    """单个智能体分析一个停电事件时发出的请求（与 MCP 工具的请求参数一致）"""
+    payload = {"outageNumber": outage_number, "analysisType": 2}
+    return [
+        ("POST", "/outage/event/query", {"outageNumber": outage_number}),
+        ("POST", "/api/weather/data/portrait", payload),
+        ("POST", "/appeal/appealListByOutageNumber", payload),
+        ("POST", "/outage-data/outage/event/realMeasCenter/event/commonQuery/query", payload),
+        ("GET", "/outage-data/outage/event/luboAnalyse", payload),
+    ]
+
+
+def _run_mode(env: Dict[str, str], agents: int, outages: int, queue: Any) -> None:
+    os.environ.update(env)
+
+    from src.services import async_request_data_service, get_response_cache_stats
+
+    async def run_agent(index: int) -> None:
+        outage_number = f"BENCH-{index % outages:03d}"
+        await asyncio.gather(*(
+            async_request_data_service(method, path, payload=payload if method == "POST" else None,
+                                       params=payload if method == "GET" else None)
+            for method, path, payload in _agent_calls(outage_number)
+        ))
+
+    async def run() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(run_agent(i) for i in range(agents)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    queue.put((elapsed, get_response_cache_stats()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="数据服务响应缓存基准测试")
+    parser.add_argument("--agents", type=int, default=20, help="并发智能体数")
+    parser.add_argument("--outages", type=int, default=3, help="不同停电事件数")
+    parser.add_argument("--latency", type=float, default=0.05, help="桩服务每次请求的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(latency=args.latency)
+    print(f"桩服务: {base_url}  智能体: {args.agents}  停电事件: {args.outages}")
+
+    base_env = {"DATA_SERVICE_BASE_URL": base_url}
+    modes = [
+        ("关闭缓存", {**base_env, "API2MCP_RESPONSE_CACHE_ENABLED": "false"}),
+        ("缓存 + 请求合并", {**base_env, "API2MCP_RESPONSE_CACHE_ENABLED": "true"}),
+    ]
+
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        for label, env in modes:
+            server.reset_counts()
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run_mode, args=(env, args.agents, args.outages, queue))
+            process.start()
+            elapsed, stats = queue.get()
+            process.join()
+            upstream = sum(server.request_counts.values())
+            counters = ""
+            if stats.get("enabled"):
+                counters = f"  命中 {stats['hits']}  未命中 {stats['misses']}  合并 {stats['coalesced']}"
+            print(f"  {label:<16} 上游请求 {upstream:>5} 次  耗时 {elapsed * 1000:>8.1f}ms{counters}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+多进程服务基准测试 - 同一负载分别压测 1 个和 N 个服务进程（streamable-http），对比吞吐和延迟
+
+共用一个桩服务，依次以不同进程数启动 MCP 服务器并运行 bench_mcp_load 的压测。
+默认负载为 analyze_outage，设备处理等 CPU 密集的处理函数占主要耗时，单进程受 GIL 限制，
+多进程的收益取决于可用 CPU 核数。
+
+使用方法:
+    python -m benchmarks.bench_workers --worker-counts 1 4 --sessions 32 --duration 20
+    python -m benchmarks.bench_workers --worker-counts 1 2 4 8 --devices 20000 --mix analyze_outage=1 get_event_data=1
+"""
+import asyncio
+import os
+from typing import Any, Dict, List
+
+from .bench_mcp_load import build_parser, report, run_load, start_server, start_stub, stop_server
+
+
+def main() -> None:
+    parser = build_parser()
+    parser.description = "多进程服务基准测试"
+    parser.set_defaults(transport="streamable-http", mix=["analyze_outage=1"],
+                        devices=5000, sessions=32, duration=20.0, interval=5.0)
+    parser.add_argument("--worker-counts", type=int, nargs="+",
+                        default=[1, os.cpu_count() or 2], help="依次压测的服务进程数")
+    args = parser.parse_args()
+    if args.transport == "sse" and max(args.worker_counts) > 1:
+        raise SystemExit("多进程模式需使用 streamable-http。")
+
+    stub, stub_url = start_stub(args)
+    summaries: List[Dict[str, Any]] = []
+    try:
+        for workers in args.worker_counts:
+            server, url = start_server(stub_url, args.transport, workers, args.server_log)
+            try:
+                print(f"\n===== 服务进程 {workers} 个: {url} =====")
+                stats, elapsed, samples = asyncio.run(run_load(args, url, server.pid))
+                summaries.append({"workers": workers, **report(stats, elapsed, samples, args)})
+            finally:
+                stop_server(server)
+    finally:
+        stub.terminate()
+
+    base = summaries[0]["throughput"] or 1.0
+    print(f"\nCPU 核数 {os.cpu_count()}，会话 {args.sessions} 个，比例 {' '.join(args.mix)}")
+    print(f"{'进程数':>6} {'吞吐':>10} {'加速比':>8} {'错误率':>8} {'峰值RSS':>10}")
+    for summary in summaries:
+        rss = f"{max(summary['rss_mb']):.0f}MB" if summary["rss_mb"] else "-"
+        print(f"{summary['workers']:>6} {summary['throughput']:>8.1f}/s {summary['throughput'] / base:>7.2f}x "
+              f"{summary['error_rate']:>8.2%} {rss:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+本地桩数据服务 - 模拟数据服务与地貌服务，用于离线基准测试和压测
+
+可回放 API2MCP_CASSETTE_PATH 录制的磁带：请求按 方法+路径+参数 精确匹配，
+未匹配时回放同一接口最先录制的响应，仍未匹配时返回默认响应。
+
+使用方法:
+    python -m benchmarks.stub_server --port 18081 --latency 0.005
+    python -m benchmarks.stub_server --cassette data/cassette.jsonl --latency 0.05 --jitter 0.02 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+DEFAULT_RESPONSE: Dict[str, Any] = {
+    "code": 10000,
+    "success": True,
+    "data": [],
+    "msg": "操作成功",
+}
+
+LANDFORM_DATA: Dict[str, Any] = {"stats": {"classes": {"耕地": 0.6, "林地": 0.4}}}
+
+LANDFORM_RESPONSE: Dict[str, Any] = {"data": LANDFORM_DATA}
+
+LANDFORM_BATCH_PATH = "/getDimaoBatch"
+
+
+class StubServer(ThreadingHTTPServer):
+    """桩服务，记录各路径的请求次数并支持模拟网络延迟、抖动和错误
+
+    参数:
+        address: 监听地址
+        latency: 每个请求的模拟延迟（秒）
+        jitter: 延迟的随机抖动幅度（秒），实际延迟在 latency ± jitter 之间
+        error_rate: 返回 503 错误的概率
+        cassette: 回放的磁带文件路径
+        seed: 随机数种子，固定后抖动和错误注入可复现
+    """
+
+    daemon_threads = True
+    # 默认监听队列只有 5，并发压测时会出现连接被拒绝
+    request_queue_size = 1024
+
+    def __init__(
+            self,
+            address: Tuple[str, int],
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            cassette: Optional[str] = None,
+            seed: Optional[int] = None,
+    ):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.request_counts: Counter = Counter()
+        self._count_lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        # 按路径固定返回的响应体（已编码），优先于默认响应
+        self.responses: Dict[str, bytes] = {}
+        # 磁带回放：精确匹配的记录和按 (方法, 路径) 兜底的记录
+        self.recordings: Dict[Tuple[str, str, str], Tuple[int, bytes]] = {}
+        self.fallbacks: Dict[Tuple[str, str], Tuple[int, bytes]] = {}
+        self.replay_counts: Counter = Counter()
+        if cassette:
+            self.load_cassette(cassette)
+
+    def record(self, path: str) -> None:
+        with self._count_lock:
+            self.request_counts[path] += 1
+
+    def load_cassette(self, path: str) -> int:
+        """加载磁带记录，相同请求以最后录制的响应为准，返回记录数"""
+        # 延迟导入：基准测试的子进程先设置环境变量再加载配置，模块级导入会提前加载配置
+        from src.services.cassette import cassette_key, read_cassette
+
+        count = 0
+        for entry in read_cassette(path):
+            key = cassette_key(entry["method"], entry["path"], entry.get("request"))
+            response = (entry.get("status", 200), entry["body"].encode("utf-8"))
+            self.recordings[key] = response
+            self.fallbacks.setdefault(key[:2], response)
+            count += 1
+        return count
+
+    def find_recording(self, method: str, path: str, data: Any) -> Optional[Tuple[int, bytes]]:
+        """查找请求对应的录制响应，并统计精确命中、兜底命中和未命中次数"""
+        from src.services.cassette import cassette_key
+
+        key = cassette_key(method, path, data)
+        if key in self.recordings:
+            outcome, response = "exact", self.recordings[key]
+        elif key[:2] in self.fallbacks:
+            outcome, response = "fallback", self.fallbacks[key[:2]]
+        else:
+            outcome, response = "miss", None
+        with self._count_lock:
+            self.replay_counts[outcome] += 1
+        return response
+
+    def next_delay(self) -> float:
+        """本次请求的模拟延迟"""
+        if self.jitter <= 0:
+            return self.latency
+        with self._random_lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self) -> bool:
+        """按 error_rate 决定本次请求是否返回错误"""
+        if self.error_rate <= 0:
+            return False
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    def set_response(self, path: str, body: Dict[str, Any]) -> None:
+        """设置指定路径返回的响应"""
+        self.responses[path] = json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+    def reset_counts(self) -> None:
+        with self._count_lock:
+            self.request_counts.clear()
+            self.replay_counts.clear()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """桩服务请求处理器，使用 HTTP/1.1 以支持 keep-alive"""
+
+    protocol_version = "HTTP/1.1"
+    # 头部与正文分开写出，关闭 Nagle 以免 keep-alive 连接触发延迟确认
+    disable_nagle_algorithm = True
+    server: StubServer
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _send_json(self, body: Dict[str, Any], status: int = 200) -> None:
+        self._send_content(json.dumps(body, ensure_ascii=False).encode("utf-8"), status)
+
+    def _send_content(self, content: bytes, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _begin(self) -> Optional[str]:
+        """记录请求并模拟延迟，注入错误时直接返回 503 并返回 None"""
+        path = urlsplit(self.path).path
+        self.server.record(path)
+        delay = self.server.next_delay()
+        if delay > 0:
+            time.sleep(delay)
+        if self.server.should_fail():
+            self._send_json({"code": 503, "success": False, "data": None, "msg": "注入错误"}, status=503)
+            return None
+        return path
+
+    def _send_recording(self, method: str, path: str, data: Any) -> bool:
+        if not self.server.recordings:
+            return False
+        recording = self.server.find_recording(method, path, data)
+        if recording is None:
+            return False
+        self._send_content(recording[1], recording[0])
+        return True
+
+    def do_GET(self) -> None:  # noqa: N802
+        path = self._begin()
+        if path is None:
+            return
+        if path in self.server.responses:
+            self._send_content(self.server.responses[path])
+            return
+        if self._send_recording("GET", path, dict(parse_qsl(urlsplit(self.path).query))):
+            return
+        if path == "/getDimao":
+            self._send_json(LANDFORM_RESPONSE)
+            return
+        self._send_json(DEFAULT_RESPONSE)
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = self._read_body()
+        path = self._begin()
+        if path is None:
+            return
+        if path in self.server.responses:
+            self._send_content(self.server.responses[path])
+            return
+        if self._send_recording("POST", path, json.loads(body) if body else None):
+            return
+        if path == LANDFORM_BATCH_PATH:
+            positions = json.loads(body or b"{}").get("positions") or []
+            self._send_json({"data": [LANDFORM_DATA for _ in positions]})
+            return
+        self._send_json(DEFAULT_RESPONSE)
+
+
+def start_stub_server(
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        **options: Any,
+) -> Tuple[StubServer, str]:
+    """在后台线程中启动桩服务，返回服务实例和基础地址，options 同 StubServer 的参数"""
+    server = StubServer((host, port), latency=latency, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, server.base_url
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地桩数据服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18081)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的模拟延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟的随机抖动幅度（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 错误的概率（0-1）")
+    parser.add_argument("--cassette", help="回放的磁带文件（API2MCP_CASSETTE_PATH 录制）")
+    parser.add_argument("--seed", type=int, help="随机数种子")
+    args = parser.parse_args()
+
+    server = StubServer(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        cassette=args.cassette,
+        seed=args.seed,
+    )
+    print(f"桩服务已启动: {server.base_url}  磁带记录: {len(server.recordings)} 条")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"请求数: {sum(server.request_counts.values())}  回放: {dict(server.replay_counts)}")
+        server.server_close()
+
+
+__all__ = ["StubServer", "StubHandler", "start_stub_server", "LANDFORM_BATCH_PATH"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+合成数据生成器 - 按上游接口结构生成可复现的测试载荷
+
+同一 seed 始终生成相同数据，可用于结果对比和回归基线。
+"""
+import random
+from typing import Any, Dict, List, Tuple
+
+from src.repository import PSR_TYPE_TO_DEVICE_TYPE
+
+
+LINE_NAME = "10kV合成测试线"
+
+COMPONENT_TYPES = ["杆塔", "通道", "导线", "绝缘子", "金具", "拉线", "开关", "基础"]
+
+WEATHER_KEYWORDS = ["冰雪", "大风", "高温", "雷电", "阴雨", "晴", "多云"]
+
+LANDFORMS = ["耕地", "林地", "草地", "水域", "不透水表面", "建筑/城市道路", "未知"]
+
+SOE_CONTENTS = ["开关分闸", "开关合闸", "过流I段动作", "零序过流动作", "重合闸动作", "保护启动"]
+
+WAVE_CONDITIONS = ["单相接地", "两相短路", "三相短路", "断线", ""]
+
+
+def _random_datetime(rng: random.Random) -> str:
+    year = rng.randint(1995, 2023)
+    return f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00"
+
+
+def _records(rng: random.Random, probability: float, build: Any) -> List[Dict[str, Any]]:
+    if rng.random() >= probability:
+        return []
+    return [build() for _ in range(rng.randint(1, 3))]
+
+
+def _base_device(
+        rng: random.Random,
+        psr_id: str,
+        psr_type: str,
+        rates: Tuple[float, float, float] = (0.05, 0.12, 0.06),
+) -> Dict[str, Any]:
+    """生成单个设备的公共字段和负面清单，rates 为 (故障, 缺陷, 隐患) 记录的出现概率"""
+    fault_rate, defect_rate, hazard_rate = rates
+    fault_list = _records(rng, fault_rate, lambda: {"faultStatus": rng.choice(["01", "02", "03"])})
+    defect_list = _records(rng, defect_rate, lambda: {
+        "eliminatedState": rng.choice(["0", "1"]),
+        "componentTypeName": rng.choice(COMPONENT_TYPES),
+    })
+    hazard_list = _records(rng, hazard_rate, lambda: {"state": rng.choice(["16", "09", "10"])})
+
+    start_time = "" if rng.random() < 0.03 else _random_datetime(rng)
+    return {
+        "psr_id": psr_id,
+        "psrType": psr_type,
+        "psr_type": psr_type,
+        "name": f"{psr_type}-{psr_id}",
+        "line_and_name": LINE_NAME,
+        "fault": len(fault_list),
+        "defect": str(len(defect_list)),
+        "hazard": len(hazard_list),
+        "patrol": rng.randint(0, 5),
+        "start_time": start_time,
+        "operate_date": start_time,
+        "faultList": fault_list,
+        "defectList": defect_list,
+        "hazardList": hazard_list,
+        "patrolList": [],
+        "faultHistoryList": _records(rng, 0.03, lambda: {"faultStatus": "03"}),
+        "defectHistoryList": _records(rng, 0.05, lambda: {"eliminatedState": "1"}),
+        "hazardHistoryList": _records(rng, 0.03, lambda: {"state": "10"}),
+        "patrolHistoryList": [],
+        "hasFamilyDefect": rng.random() < 0.02,
+        "hasFamilyHazard": False,
+        "hasFamilyFault": False,
+        "familyDefectCount": rng.randint(0, 2),
+        "familyHazardCount": 0,
+        "familyFaultCount": 0,
+        "ratedState": "",
+    }
+
+
+def generate_device_payload(
+        size: int,
+        seed: int = 42,
+        fault_rate: float = 0.05,
+        defect_rate: float = 0.12,
+        hazard_rate: float = 0.06,
+) -> Dict[str, Any]:
+    """生成 `/outage-data/test/agent` 结构的设备数据
+
+    参数:
+        size: 设备条目数（近似值，按杆塔组为单位生成后截断）
+        seed: 随机种子
+        fault_rate: 设备带故障记录的概率
+        defect_rate: 设备带缺陷记录的概率
+        hazard_rate: 设备带隐患记录的概率
+
+    每个杆塔带导线、绝缘子、金具、拉线，部分杆塔带柱上开关和配变；
+    每隔若干杆塔生成一段"终端-电缆段-接头-电缆段-终端"的电缆线路和一个站房。
+    """
+    rng = random.Random(seed)
+    rates = (fault_rate, defect_rate, hazard_rate)
+    devices: List[Dict[str, Any]] = []
+    counter = 0
+
+    def next_id(prefix: str) -> str:
+        nonlocal counter
+        counter += 1
+        return f"{prefix}{counter:07d}"
+
+    def add(psr_type: str, **fields: Any) -> Dict[str, Any]:
+        device = _base_device(rng, next_id(psr_type), psr_type, rates)
+        device.update(fields)
+        devices.append(device)
+        return device
+
+    tower_index = 0
+    while len(devices) < size:
+        tower_index += 1
+        tower = add("0103", span=round(rng.uniform(40.0, 130.0), 1))
+        tower_id = tower["psr_id"]
+        add("0101", start_pole=tower_id, lineType="架空", wireType=rng.choice(["JKLYJ-240", "LGJ-120"]))
+        add("0103001", pole=tower_id)
+        add("0103002", pole=tower_id)
+        add("0103005", astPole=tower_id)
+        if rng.random() < 0.2:
+            add(rng.choice(["0111", "0112", "0113"]), pole=tower_id)
+        if rng.random() < 0.15:
+            add("0110", pole=tower_id, ratedState=rng.choice(["", "正常", "重载", "过载"]))
+
+        if tower_index % 10 == 0:
+            terminal_a = next_id("0202")
+            joint = next_id("0203")
+            terminal_b = next_id("0202")
+            add("0201", start_position=terminal_a, end_position=joint)
+            add("0201", start_position=joint, end_position=terminal_b)
+            for psr_id, psr_type in ((terminal_a, "0202"), (joint, "0203"), (terminal_b, "0202")):
+                device = _base_device(rng, psr_id, psr_type, rates)
+                device["start_position"] = psr_id
+                devices.append(device)
+
+        if tower_index % 25 == 0:
+            station = add("0322")
+            station_id = station["psr_id"]
+            add("0306", station=station_id)
+            add("0305", station=station_id)
+            add("0302", station=station_id)
+            add("xndl")
+
+        # 上游偶尔会返回重复设备
+        if rng.random() < 0.01:
+            devices.append(dict(tower))
+
+    return {
+        "code": 10000,
+        "success": True,
+        "data": devices[:size],
+        "msg": "操作成功",
+        "outageNumber": f"SYN-{seed}-{size}",
+    }
+
+
+def generate_weather_payload(size: int, seed: int = 42, risk_ratio: float = 0.2) -> Dict[str, Any]:
+    """生成 `/api/weather/data/portrait` 结构的天气画像数据
+
+    参数:
+        size: 风险设备数（杆塔和站房设备合计，含嵌套的 riskDeviceList）
+        seed: 随机种子
+        risk_ratio: 风险设备数占沿线设备总数的比例
+    """
+    rng = random.Random(seed)
+    psr_types = list(PSR_TYPE_TO_DEVICE_TYPE)
+
+    def risk_device(index: int) -> Dict[str, Any]:
+        return {
+            "psrId": f"W{index:07d}",
+            "psrType": rng.choice(psr_types),
+            "riskDesc": f"{rng.choice(WEATHER_KEYWORDS)}风险等级{rng.randint(1, 4)}",
+        }
+
+    tower_devices: List[Dict[str, Any]] = []
+    station_devices: List[Dict[str, Any]] = []
+    index = 0
+    while index < size:
+        device = risk_device(index)
+        index += 1
+        nested = min(rng.randint(0, 3), size - index)
+        device["riskDeviceList"] = [risk_device(index + i) for i in range(nested)]
+        index += nested
+        (station_devices if rng.random() < 0.1 else tower_devices).append(device)
+
+    def value_range(low: float, high: float) -> List[float]:
+        a, b = sorted((round(rng.uniform(low, high), 1), round(rng.uniform(low, high), 1)))
+        return [a, b]
+
+    return {
+        "weather": "".join(rng.sample(WEATHER_KEYWORDS, 2)),
+        "deviceNum": max(1, int(size / risk_ratio)) if risk_ratio > 0 else size,
+        "riskDeviceNum": size,
+        "deviceFactRange": {
+            "temperatureRange": value_range(-5.0, 38.0),
+            "rainfallRange": value_range(0.0, 80.0),
+            "humidityRange": value_range(30.0, 100.0),
+            "windSpeedRange": value_range(0.0, 25.0),
+        },
+        "lightningDetectionData": [
+            {"time": _random_datetime(rng), "intensity": round(rng.uniform(5, 120), 1)}
+            for _ in range(rng.randint(0, max(1, size // 50)))
+        ],
+        "towerDeviceList": tower_devices,
+        "stationDeviceList": station_devices,
+    }
+
+
+def generate_environment_payload(size: int, seed: int = 42) -> Dict[str, Any]:
+    """生成 get_environment_raw_data 返回结构的环境数据（已补充地貌和市政地址）
+
+    参数:
+        size: 环境信息条目数
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    infos = []
+    for index in range(size):
+        projects = [
+            {"constructionName": f"施工项目{rng.randint(1, size)}", "address": f"合成路{rng.randint(1, 500)}号"}
+            for _ in range(rng.randint(0, 2))
+        ]
+        infos.append({
+            "psrId": f"E{index:07d}",
+            "geoPosition": f"{rng.uniform(118.0, 122.0):.6f},{rng.uniform(28.0, 32.0):.6f}",
+            "constructionProject": {"threeKmProjects": projects, "twoKmProjects": [], "oneKmProjects": []},
+            "landform": rng.choice(LANDFORMS),
+            "workAddress": ",".join(project["address"] for project in projects),
+        })
+    return {"code": 10000, "success": True, "data": infos, "msg": "操作成功"}
+
+
+def generate_message_payload(size: int, seed: int = 42) -> Dict[str, Any]:
+    """生成报文查询（SOE 序列）结构的数据，部分条目内容为空
+
+    参数:
+        size: SOE 条目数
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    return {
+        "code": 10000,
+        "success": True,
+        "data": [
+            {
+                "startTime": _random_datetime(rng),
+                "content": "" if rng.random() < 0.1 else f"{rng.choice(SOE_CONTENTS)}#{rng.randint(1, 64)}",
+            }
+            for _ in range(size)
+        ],
+        "msg": "操作成功",
+    }
+
+
+def generate_wave_payload(seed: int = 42) -> Dict[str, Any]:
+    """生成 `/outage-data/outage/event/luboAnalyse` 结构的录波数据"""
+    rng = random.Random(seed)
+    return {
+        "code": 10000,
+        "success": True,
+        "data": [{"lineId": LINE_NAME, "condition": rng.choice(WAVE_CONDITIONS)}],
+        "msg": "操作成功",
+    }
+
+
+__all__ = [
+    "generate_device_payload",
+    "generate_weather_payload",
+    "generate_environment_payload",
+    "generate_message_payload",
+    "generate_wave_payload",
+]
@@ -236,6 +236,7 @@ echo "     $IMAGE_NAME"
 echo ""
 echo "🔗 访问 SSE 端点:"
 echo "   http://localhost:9090/sse"
+echo "   健康检查: http://localhost:9090/healthz（就绪检查: /readyz）"
 echo ""
 
 
@@ -0,0 +1,15 @@
+"""ASGI 应用 - 按配置的传输方式创建，供 uvicorn 多进程模式下各进程导入
+
+使用方法:
+    API2MCP_MCP_TRANSPORT=streamable-http uvicorn src.api.asgi:app --host 0.0.0.0 --port 9090 --workers 4
+    MCP_TRANSPORT=streamable-http MCP_WORKERS=4 python -m src.api.main
+"""
+from ..utils import config
+from .main import mcp
+
+if config.mcp_transport == "sse":
+    app = mcp.http_app(transport="sse")
+else:
+    app = mcp.http_app(transport="streamable-http", stateless_http=config.mcp_stateless_http)
+
+__all__ = ["app"]
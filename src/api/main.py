@@ -1,20 +1,80 @@
 """MCP Server - 天气和工单 MCP 服务器"""
-from datetime import date
-from typing import Any, Dict, List
-
-from fastmcp import FastMCP
-
-from ..utils import config, logger
+import asyncio
+import json
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Union
+
+import uvicorn
+from fastmcp import Context, FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+
+from ..utils import config, logger, metrics_registry
+from ..utils.tracing import get_tracing_stats
 from ..services import (
-    post_to_data_service,
-    request_data_service,
+    async_post_to_data_service,
+    async_request_data_service,
     process_weather_data,
     process_device_info_data,
+    parse_run_time,
     process_environment_data,
     process_message_data,
-    get_work_address_info,
-    get_landform,
+    async_get_outage_data,
+    async_get_environment_raw_data,
+    async_analyze_outage,
+    is_handle,
+    resolve_handle,
+    to_handle_response,
+    async_run_batch,
+    async_run_in_process,
+    build_batch_response,
+    get_cassette_stats,
+    get_handle_store_stats,
+    get_landform_cache_stats,
+    get_outage_data_stats,
+    get_response_cache_stats,
+    get_result_store_stats,
+    async_check_readiness,
+    get_readiness_stats,
 )
+from .middleware import MetricsMiddleware, TracingMiddleware
+
+# 获取数据工具的 return_handle 参数说明
+RETURN_HANDLE_HINT = "传入 return_handle=true 时只返回服务端数据句柄，将句柄传给对应的处理工具即可，无需回传原始数据。"
+
+
+def _resolve_json_text(value: str) -> str:
+    """句柄换回原始数据并序列化为 JSON 文本，非句柄原样返回"""
+    if is_handle(value):
+        return json.dumps(resolve_handle(value), ensure_ascii=False)
+    return value
+
+
+def _parse_reference_time(reference_time: Optional[str]) -> Optional[datetime]:
+    """解析 reference_time 参数"""
+    if not reference_time:
+        return None
+    try:
+        return parse_run_time(reference_time)
+    except ValueError as e:
+        raise ValueError("reference_time 格式应为 YYYY-mm-dd HH:MM:SS。") from e
+
+
+def _stream_results(ctx: Optional[Context], total: int) -> Any:
+    """批量工具的逐个结果推送：进度通知 + 携带单个停电事件结果的日志消息"""
+    done = 0
+
+    async def on_result(outage_number: str, result: Dict[str, Any]) -> None:
+        nonlocal done
+        done += 1
+        if ctx is None:
+            return
+        await ctx.report_progress(done, total, f"{outage_number} 已完成")
+        await ctx.info(json.dumps({"outage_number": outage_number, "result": result}, ensure_ascii=False, default=str))
+
+    return on_result
+
 
 # 创建MCP服务器实例
 mcp = FastMCP(
@@ -23,24 +83,56 @@ mcp = FastMCP(
     port=config.mcp_port
 )
 
+if config.tracing_enabled:
+    mcp.add_middleware(TracingMiddleware())
+
+if config.metrics_enabled:
+    mcp.add_middleware(MetricsMiddleware())
+    metrics_registry.register_stats("response_cache", get_response_cache_stats)
+    metrics_registry.register_stats("result_store", get_result_store_stats)
+    metrics_registry.register_stats("outage_data", get_outage_data_stats)
+    metrics_registry.register_stats("handle_store", get_handle_store_stats)
+    metrics_registry.register_stats("landform_cache", get_landform_cache_stats)
+    metrics_registry.register_stats("cassette", get_cassette_stats)
+    metrics_registry.register_stats("tracing", get_tracing_stats)
+    metrics_registry.register_stats("readiness", get_readiness_stats)
+
+    @mcp.custom_route(config.metrics_path, methods=["GET"])
+    async def metrics(request: Request) -> PlainTextResponse:
+        """Prometheus 抓取接口，只读取内存中的指标，不访问上游"""
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def healthz(request: Request) -> PlainTextResponse:
+    """存活检查，不建立 MCP 会话，也不访问上游"""
+    return PlainTextResponse("ok")
+
+
+@mcp.custom_route("/readyz", methods=["GET"])
+async def readyz(request: Request) -> JSONResponse:
+    """就绪检查，上游探测结果缓存 readiness_cache_ttl 秒，未就绪时返回 503"""
+    result = await async_check_readiness()
+    return JSONResponse(result, status_code=200 if result["ready"] else 503)
+
 
 @mcp.tool(
     name="get_event_data",
     description="获取停电事件基本信息。",
 )
-def get_event_data(outage_number: str) -> Dict[str, Any]:
+async def get_event_data(outage_number: str) -> Dict[str, Any]:
     """调用 `/outage/event/query` 接口获取停电事件信息。"""
     payload = {
         "outageNumber": outage_number
     }
-    return post_to_data_service("/outage/event/query", payload)
+    return await async_post_to_data_service("/outage/event/query", payload)
 
 
 @mcp.tool(
     name="get_weather_data",
-    description="获取停电时间沿线天气分析数据，封装对天气数据服务的调用。",
+    description="获取停电时间沿线天气分析数据，封装对天气数据服务的调用。" + RETURN_HANDLE_HINT,
 )
-def get_weather_data(outage_number: str, analysis_type: int) -> Dict[str, Any]:
+async def get_weather_data(outage_number: str, analysis_type: int, return_handle: bool = False) -> Dict[str, Any]:
     """调用 `/api/weather/data/portrait` 接口获取天气信息。"""
     if analysis_type not in (1, 2):
         raise ValueError("analysis_type 仅支持 1（事中分析）或 2（事后分析）。")
@@ -49,14 +141,15 @@ def get_weather_data(outage_number: str, analysis_type: int) -> Dict[str, Any]:
         "outageNumber": outage_number,
         "analysisType": analysis_type,
     }
-    return post_to_data_service("/api/weather/data/portrait", payload)
+    weather_data = await async_post_to_data_service("/api/weather/data/portrait", payload)
+    return to_handle_response(weather_data) if return_handle else weather_data
 
 
 @mcp.tool(
     name="work_order_query_tool",
     description="沿线诉求工单查询工具，获取沿线历史及当前客户工单信息。",
 )
-def work_order_query_tool(outage_number: str, analysis_type: int) -> Dict[str, Any]:
+async def work_order_query_tool(outage_number: str, analysis_type: int) -> Dict[str, Any]:
     """调用 `/appeal/appealListByOutageNumber` 接口获取沿线工单信息。"""
     if analysis_type not in (1, 2):
         raise ValueError("analysis_type 仅支持 1（事中分析）或 2（事后分析）。")
@@ -65,95 +158,60 @@ def work_order_query_tool(outage_number: str, analysis_type: int) -> Dict[str, A
         "outageNumber": outage_number,
         "analysisType": analysis_type,
     }
-    return post_to_data_service("/appeal/appealListByOutageNumber", payload)
+    return await async_post_to_data_service("/appeal/appealListByOutageNumber", payload)
 
 
 @mcp.tool(
     name="weather_data_processing",
-    description="处理并总结天气数据，获取天气数据后调用此工具处理天气数据并生成汇总天气信息",
+    description="处理并总结天气数据，获取天气数据后调用此工具处理天气数据并生成汇总天气信息，weather_data 可以是天气数据或数据句柄",
 )
-def weather_data_processing(weather_data: Dict[str, Any]) -> Dict[str, Any]:
+async def weather_data_processing(weather_data: Union[Dict[str, Any], str]) -> Dict[str, Any]:
     """处理天气数据并生成汇总信息。"""
-    return process_weather_data(weather_data)
+    return await asyncio.to_thread(process_weather_data, resolve_handle(weather_data))
 
 
 @mcp.tool(
     name="environment_data_processing",
-    description="处理总结环境信息",
+    description="处理总结环境信息，environment 可以是原始环境数据或数据句柄",
 )
-def environment_data_processing(environment: Dict[str, Any], outage_date: date) -> Dict[str, Any]:
+async def environment_data_processing(environment: Union[Dict[str, Any], str], outage_date: date) -> Dict[str, Any]:
     """处理环境信息"""
-    return process_environment_data(environment, outage_date)
+    return await asyncio.to_thread(process_environment_data, resolve_handle(environment), outage_date)
 
 
 @mcp.tool(
     name="get_drone_analysis",
     description="获取无人机图片分析结果",
 )
-def get_drone_analysis(outage_number: str, tower_ids: List[str]) -> Dict[str, Any]:
+async def get_drone_analysis(outage_number: str, tower_ids: List[str]) -> Dict[str, Any]:
     """获取无人机图片分析结果"""
     payload = {
         "outageNumber": outage_number,
         "towerIds": tower_ids
     }
-    return post_to_data_service("/api/drone/analysis", payload)
+    return await async_post_to_data_service("/api/drone/analysis", payload)
 
 
 @mcp.tool(
     name="get_environment_raw_data",
-    description="获取原始环境数据",
+    description="获取原始环境数据。" + RETURN_HANDLE_HINT,
 )
-def get_environment_raw_data(outage_number: str) -> Dict[str, Any]:
+async def get_environment_raw_data(outage_number: str, return_handle: bool = False) -> Dict[str, Any]:
     """获取原始环境数据"""
-    payload = {
-        "outageNumber": outage_number
-    }
+    start = time.perf_counter()
 
-    # 调用接口获取原始数据
-    raw_data = post_to_data_service("/outage-data/test/agent", payload)
-
-    # 初始化infos变量
-    infos = []
-
-    # 如果请求成功且有数据
-    if "data" in raw_data:
-        infos = raw_data.get("data", [])
-
-        # 确保infos是列表类型
-        if isinstance(infos, list):
-            for info in infos:
-                if isinstance(info, dict):
-                    # 获取地理位置
-                    geo_position = info.get("geoPosition")
-                    work_address = get_work_address_info(info)
-                    landform = "未知"  # 默认值
-
-                    if geo_position and isinstance(geo_position, str) and geo_position.strip():
-                        # 调用地貌接口
-                        landform = get_landform(geo_position.strip())
-
-                        # 转换"不透水表面"为"建筑/城市道路"
-                        if landform == "不透水表面":
-                            landform = "建筑/城市道路"
-
-                    # 添加地貌信息到数据中
-                    info["landform"] = landform
-                    info["workAddress"] = work_address
-
-    # 返回处理后的数据
-    return {
-        "code": 10000,
-        "success": True,
-        "data": infos,
-        "msg": "操作成功",
-    }
+    environment = await async_get_environment_raw_data(outage_number)
+
+    logger.info(f"get_environment_raw_data 完成: {outage_number}，耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    return to_handle_response(environment) if return_handle else environment
 
 
 @mcp.tool(
     name="get_message_data",
-    description="获取保护报文数据，封装对保护报文数据服务的调用",
+    description="获取保护报文数据，封装对保护报文数据服务的调用。" + RETURN_HANDLE_HINT,
 )
-def get_message_data(outage_number: str, analysis_type: int) -> Dict[str, Any]:
+async def get_message_data(outage_number: str, analysis_type: int, return_handle: bool = False) -> Dict[str, Any]:
     """调用 `/outage-data/outage/event/realMeasCenter/event/commonQuery/query` 接口获取保护报文信息。"""
     if analysis_type not in (1, 2):
         raise ValueError("analysis_type 仅支持 1（事中分析）或 2（事后分析）。")
@@ -162,18 +220,19 @@ def get_message_data(outage_number: str, analysis_type: int) -> Dict[str, Any]:
         "outageNumber": outage_number,
         "analysisType": analysis_type,
     }
-    return request_data_service(
+    message_data = await async_request_data_service(
         'POST',
         "/outage-data/outage/event/realMeasCenter/event/commonQuery/query",
         payload=payload
     )
+    return to_handle_response(message_data) if return_handle else message_data
 
 
 @mcp.tool(
     name="get_wave_data",
-    description="获取录波数据，封装对录播数据服务的调用",
+    description="获取录波数据，封装对录播数据服务的调用。" + RETURN_HANDLE_HINT,
 )
-def get_wave_data(outage_number: str, analysis_type: int) -> Dict[str, Any]:
+async def get_wave_data(outage_number: str, analysis_type: int, return_handle: bool = False) -> Dict[str, Any]:
     """调用 `/outage-data/outage/event/luboAnalyse` 接口获取录波信息。"""
     if analysis_type not in (1, 2):
         raise ValueError("analysis_type 仅支持 1（事中分析）或 2（事后分析）。")
@@ -182,47 +241,159 @@ def get_wave_data(outage_number: str, analysis_type: int) -> Dict[str, Any]:
         "outageNumber": outage_number,
         "analysisType": analysis_type,
     }
-    return request_data_service('GET', "/outage-data/outage/event/luboAnalyse", params=payload)
+    wave_data = await async_request_data_service('GET', "/outage-data/outage/event/luboAnalyse", params=payload)
+    return to_handle_response(wave_data) if return_handle else wave_data
 
 
 @mcp.tool(
     name="message_data_processing",
-    description="处理并总结报文、录波数据，生成报文智能体的输入数据",
+    description="处理并总结报文、录波数据，生成报文智能体的输入数据，res 和 wave_data_str 可以是 JSON 文本或数据句柄",
 )
-def message_data_processing(res: str, wave_data_str: str) -> Dict[str, Any]:
+async def message_data_processing(res: str, wave_data_str: str) -> Dict[str, Any]:
     """处理报文和录波数据"""
-    return process_message_data(res, wave_data_str)
+    return await asyncio.to_thread(process_message_data, _resolve_json_text(res), _resolve_json_text(wave_data_str))
 
 
 @mcp.tool(
     name="get_device_info_data",
-    description="获取设备信息数据，封装对设备数据服务的调用。",
+    description="获取设备信息数据，封装对设备数据服务的调用。" + RETURN_HANDLE_HINT,
 )
-def get_device_info_data(outage_number: str) -> Dict[str, Any]:
+async def get_device_info_data(outage_number: str, return_handle: bool = False) -> Dict[str, Any]:
     """调用 `/outage-data/test/agent` 接口获取设备信息。
 
     参数:
         outage_number: 停电事件编号
+        return_handle: 是否只返回数据句柄
     """
-    payload = {
-        "outageNumber": outage_number,
-    }
-    return post_to_data_service("/outage-data/test/agent", payload)
+    start = time.perf_counter()
+
+    # 与 get_environment_raw_data 共享同一次拉取
+    device_data = await async_get_outage_data(outage_number)
+
+    logger.info(f"get_device_info_data 完成: {outage_number}，耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+    return to_handle_response(device_data) if return_handle else device_data
 
 
 @mcp.tool(
     name="process_device_info_data",
-    description="处理设备信息数据，生成大模型输入参数。",
+    description="处理设备信息数据，生成大模型输入参数，device_data 可以是设备信息数据或数据句柄。",
 )
-def process_device_info(device_data: Dict[str, Any]) -> Dict[str, Any]:
+async def process_device_info(
+        device_data: Union[Dict[str, Any], str],
+        reference_time: Optional[str] = None,
+) -> Dict[str, Any]:
     """处理设备信息数据并生成大模型输入参数。
 
     参数:
-        device_data: 设备信息数据，由 get_device_info_data 工具获取
+        device_data: 设备信息数据或数据句柄，由 get_device_info_data 工具获取
+        reference_time: 计算运行年限的参考时间（YYYY-mm-dd HH:MM:SS），默认为当前时间
     """
-    return process_device_info_data(device_data)
+    reference = _parse_reference_time(reference_time)
+    return await asyncio.to_thread(process_device_info_data, resolve_handle(device_data), reference)
+
+
+@mcp.tool(
+    name="analyze_outage",
+    description=(
+        "停电事件综合分析：一次调用并发获取事件、天气、设备、环境、报文和录波数据，"
+        "并在服务端完成处理，只返回天气、设备、环境、报文的汇总结果和各阶段耗时。"
+        "部分数据源失败时 partial 为 true，failed 列出失败的数据源；全部失败时 success 为 false。"
+    ),
+)
+async def analyze_outage(
+        outage_number: str,
+        analysis_type: int,
+        outage_date: Optional[date] = None,
+) -> Dict[str, Any]:
+    """停电事件综合分析。
+
+    参数:
+        outage_number: 停电事件编号
+        analysis_type: 1（事中分析）或 2（事后分析）
+        outage_date: 停电日期，默认为当天
+    """
+    return await async_analyze_outage(outage_number, analysis_type, outage_date)
+
+
+@mcp.tool(
+    name="get_event_data_batch",
+    description="批量获取多个停电事件的基本信息，并发请求，每个事件完成时通过进度通知和日志消息逐个推送结果。",
+)
+async def get_event_data_batch(outage_numbers: List[str], ctx: Optional[Context] = None) -> Dict[str, Any]:
+    """批量调用 `/outage/event/query` 接口获取停电事件信息。
+
+    参数:
+        outage_numbers: 停电事件编号列表
+    """
+    async def handler(outage_number: str) -> Dict[str, Any]:
+        return await async_post_to_data_service("/outage/event/query", {"outageNumber": outage_number})
+
+    results = await async_run_batch(outage_numbers, handler, _stream_results(ctx, len(set(outage_numbers))))
+    return build_batch_response(results)
+
+
+@mcp.tool(
+    name="process_device_info_batch",
+    description=(
+        "批量获取并处理多个停电事件的设备信息，生成大模型输入参数。"
+        "数据并发获取，处理在进程池中并行执行，每个事件完成时逐个推送结果。"
+    ),
+)
+async def process_device_info_batch(
+        outage_numbers: List[str],
+        reference_time: Optional[str] = None,
+        ctx: Optional[Context] = None,
+) -> Dict[str, Any]:
+    """批量获取并处理设备信息数据。
+
+    参数:
+        outage_numbers: 停电事件编号列表
+        reference_time: 计算运行年限的参考时间（YYYY-mm-dd HH:MM:SS），默认为当前时间
+    """
+    reference = _parse_reference_time(reference_time)
+
+    async def handler(outage_number: str) -> Dict[str, Any]:
+        device_data = await async_get_outage_data(outage_number)
+        return await async_run_in_process(process_device_info_data, device_data, reference)
+
+    results = await async_run_batch(outage_numbers, handler, _stream_results(ctx, len(set(outage_numbers))))
+    return build_batch_response(results)
+
+
+def serve() -> None:
+    """按配置启动服务
+
+    单进程时直接运行；多进程时由 uvicorn 启动 mcp_workers 个进程共用同一端口，
+    每个进程各自导入 src.api.asgi:app。SSE 会话保存在建立连接的进程内，
+    后续消息可能被其他进程接收，因此多进程只支持 streamable-http。
+    """
+    if config.mcp_workers > 1 and config.mcp_transport == "sse":
+        raise SystemExit("SSE 会话保存在进程内，mcp_workers 大于 1 时需设置 mcp_transport=streamable-http。")
+
+    uvicorn_config: Dict[str, Any] = {}
+    if config.mcp_graceful_shutdown_timeout is not None:
+        uvicorn_config["timeout_graceful_shutdown"] = config.mcp_graceful_shutdown_timeout
+    if config.mcp_worker_concurrency:
+        uvicorn_config["limit_concurrency"] = config.mcp_worker_concurrency
+
+    logger.info(
+        f"启动 MCP 服务器: {config.mcp_host}:{config.mcp_port}，传输方式 {config.mcp_transport}，"
+        f"进程数 {config.mcp_workers}"
+    )
+    if config.mcp_workers > 1:
+        uvicorn.run(
+            "src.api.asgi:app",
+            host=config.mcp_host,
+            port=config.mcp_port,
+            workers=config.mcp_workers,
+            lifespan="on",
+            **uvicorn_config,
+        )
+    elif config.mcp_transport == "sse":
+        mcp.run(transport="sse", uvicorn_config=uvicorn_config)
+    else:
+        mcp.run(transport="streamable-http", stateless_http=config.mcp_stateless_http, uvicorn_config=uvicorn_config)
 
 
 if __name__ == "__main__":
-    logger.info(f"启动 MCP 服务器: {config.mcp_host}:{config.mcp_port}")
-    mcp.run(transport="sse")
+    serve()
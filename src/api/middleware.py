@@ -0,0 +1,64 @@
+"""MCP 中间件 - 记录工具调用的指标和链路追踪的根 span"""
+import time
+from typing import Any
+
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from ..utils.metrics import TOOL_CALLS, TOOL_IN_FLIGHT, TOOL_LATENCY, TOOL_RESPONSE_BYTES
+from ..utils.tracing import SPAN_KIND_SERVER, span
+
+
+def _result_status(result: ToolResult) -> str:
+    """工具正常返回但业务结果为 success=false 时记为 failed"""
+    structured = result.structured_content or {}
+    if isinstance(structured.get("result"), dict):
+        structured = structured["result"]
+    return "failed" if structured.get("success") is False else "ok"
+
+
+def _result_size(result: ToolResult) -> int:
+    return sum(len(getattr(block, "text", "").encode("utf-8")) for block in result.content)
+
+
+class MetricsMiddleware(Middleware):
+    """工具调用指标：状态为 ok、failed（业务失败）或 error（抛出异常）"""
+
+    async def on_call_tool(
+            self,
+            context: MiddlewareContext[mt.CallToolRequestParams],
+            call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> Any:
+        tool = context.message.name
+        TOOL_IN_FLIGHT.inc(tool=tool)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            result = await call_next(context)
+            status = _result_status(result)
+            TOOL_RESPONSE_BYTES.observe(_result_size(result), tool=tool)
+            return result
+        finally:
+            TOOL_IN_FLIGHT.dec(tool=tool)
+            TOOL_CALLS.inc(tool=tool, status=status)
+            TOOL_LATENCY.observe(time.perf_counter() - start, tool=tool)
+
+
+class TracingMiddleware(Middleware):
+    """每次工具调用开启一条新链路，工具内的上游请求和处理函数挂在其下"""
+
+    async def on_call_tool(
+            self,
+            context: MiddlewareContext[mt.CallToolRequestParams],
+            call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> Any:
+        tool = context.message.name
+        with span(f"tool {tool}", SPAN_KIND_SERVER, **{"mcp.tool.name": tool}) as current:
+            result = await call_next(context)
+            current.set_attribute("mcp.tool.status", _result_status(result))
+            current.set_attribute("mcp.tool.response.size", _result_size(result))
+            return result
+
+
+__all__ = ["MetricsMiddleware", "TracingMiddleware"]
@@ -0,0 +1,214 @@
+"""离线回放 - 将归档的原始响应重新交给各处理函数，结果写为 JSONL
+
+处理规则调整后，可用归档数据重新处理历史停电事件，无需访问上游服务。
+
+归档格式（JSONL 每行一个停电事件，或目录下每个 .json 文件一个停电事件）:
+    {
+        "outage_number": "OUT-001",        # 缺省时使用文件名
+        "outage_date": "2025-06-01",       # 环境数据处理使用，缺省时取 reference_time 的日期
+        "reference_time": "2025-06-01 12:00:00",  # 设备运行年限的参考时间，缺省时使用 --reference-time
+        "weather": {...},                  # /api/weather/data/portrait 原始响应
+        "device": {...},                   # /outage-data/test/agent 原始响应
+        "environment": {...},              # 环境数据，见下文
+        "message": {...},                  # 报文查询原始响应
+        "wave": {...}                      # /outage-data/outage/event/luboAnalyse 原始响应，只与 message 一起使用
+    }
+缺少的数据源跳过对应的处理；只有 wave 没有 message 时录波数据不被处理。
+
+environment 可以是 get_environment_raw_data 工具的输出（记录已带 landform、workAddress），
+也可以是 /outage-data/test/agent 原始响应。后者由 enrich_environment_offline 离线补充：
+市政施工地址从记录本身计算，地貌只查地貌缓存，不访问地貌服务。需要还原地貌时设置
+API2MCP_LANDFORM_CACHE_PATH 指向服务使用的持久化地貌缓存，未命中的坐标记为"未知"。
+
+使用方法:
+    python -m src.api.replay archive.jsonl --output results.jsonl --workers 8
+    python -m src.api.replay archive_dir/ --reference-time "2025-06-01 00:00:00"
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional, Set, TextIO, Tuple
+
+from ..utils import logger
+from ..services import (
+    enrich_environment_offline,
+    parse_run_time,
+    process_device_info_data,
+    process_environment_data,
+    process_message_data,
+    process_weather_data,
+)
+
+# 待回放的停电事件：(来源, JSONL 的一行)，目录归档的内容为 None，由子进程读取来源指向的文件
+ReplayItem = Tuple[str, Optional[str]]
+
+
+def iter_archive(path: str) -> Iterator[ReplayItem]:
+    """逐个读取归档中的停电事件，只在子进程中解析 JSON"""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".json"):
+                yield os.path.join(path, name), None
+        return
+
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if line.strip():
+                yield f"{path}:{line_number}", line
+
+
+def _load_record(source: str, content: Optional[str]) -> Dict[str, Any]:
+    if content is None:
+        with open(source, encoding="utf-8") as f:
+            record = json.load(f)
+    else:
+        record = json.loads(content)
+    if not isinstance(record, dict):
+        raise ValueError(f"{source} 不是 JSON 对象。")
+    if content is None:
+        record.setdefault("outage_number", os.path.splitext(os.path.basename(source))[0])
+    return record
+
+
+def _as_json_text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def _failure(stage: str, error: Exception) -> Dict[str, Any]:
+    return {
+        "code": 9999,
+        "success": False,
+        "data": None,
+        "msg": f"{stage} 失败: {error}",
+    }
+
+
+def replay_record(source: str, content: Optional[str], default_reference_time: Optional[str] = None) -> Tuple[str, bool]:
+    """处理单个停电事件，返回 (JSONL 结果行, 是否全部成功)
+
+    在子进程中执行，JSON 的解析和序列化也在子进程中完成，主进程只负责读写。
+    """
+    try:
+        record = _load_record(source, content)
+        reference_text = record.get("reference_time") or default_reference_time
+        reference_time = parse_run_time(reference_text) if reference_text else None
+        if record.get("outage_date"):
+            outage_date = date.fromisoformat(record["outage_date"])
+        else:
+            outage_date = (reference_time or datetime.now()).date()
+    except Exception as e:
+        return json.dumps({"source": source, "error": _failure("load", e)}, ensure_ascii=False), False
+
+    stages = {
+        "weather": lambda: process_weather_data(record["weather"]),
+        "device": lambda: process_device_info_data(record["device"], reference_time),
+        "environment": lambda: process_environment_data(enrich_environment_offline(record["environment"]), outage_date),
+        "message": lambda: process_message_data(
+            _as_json_text(record["message"]), _as_json_text(record.get("wave", {}))
+        ),
+    }
+
+    result: Dict[str, Any] = {"outage_number": record.get("outage_number"), "source": source}
+    success = True
+    for stage, process in stages.items():
+        if record.get(stage) is None:
+            continue
+        try:
+            result[stage] = process()
+        except Exception as e:
+            result[stage] = _failure(stage, e)
+            success = False
+    return json.dumps(result, ensure_ascii=False, default=str), success
+
+
+def _init_worker(verbose: bool) -> None:
+    """子进程初始化：默认关闭处理函数的日志，避免整段原始数据写入日志"""
+    if not verbose:
+        logger.disable("src.services")
+
+
+def replay(
+        items: Iterator[ReplayItem],
+        output: TextIO,
+        workers: int,
+        reference_time: Optional[str] = None,
+        verbose: bool = False,
+) -> Tuple[int, int]:
+    """在进程池中回放全部停电事件，返回 (处理数, 失败数)
+
+    同时提交的任务数限制为进程数的两倍，归档再大也不会一次性读入内存。
+    """
+    processed = failed = 0
+
+    def write(line: str, success: bool) -> None:
+        nonlocal processed, failed
+        output.write(line + "\n")
+        processed += 1
+        failed += 0 if success else 1
+
+    if workers == 0:
+        _init_worker(verbose)
+        for source, content in items:
+            write(*replay_record(source, content, reference_time))
+        return processed, failed
+
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(verbose,),
+    ) as pool:
+        pending: Set[Future] = set()
+        for source, content in items:
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(*future.result())
+            pending.add(pool.submit(replay_record, source, content, reference_time))
+        for future in wait(pending).done:
+            write(*future.result())
+    return processed, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="离线回放归档的原始响应")
+    parser.add_argument("archive", help="归档 JSONL 文件，或包含 .json 文件的目录")
+    parser.add_argument("--output", default="-", help="结果 JSONL 文件，默认输出到标准输出")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="处理进程数，0 表示在主进程中处理")
+    parser.add_argument("--reference-time", help="设备运行年限的参考时间（YYYY-MM-DD HH:MM:SS），归档记录未指定时使用")
+    parser.add_argument("--verbose", action="store_true", help="保留处理函数的日志输出")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        sys.exit(f"归档不存在: {args.archive}")
+    if args.reference_time:
+        try:
+            parse_run_time(args.reference_time)
+        except ValueError:
+            sys.exit("--reference-time 格式应为 YYYY-MM-DD HH:MM:SS。")
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        processed, failed = replay(iter_archive(args.archive), output, args.workers,
+                                   args.reference_time, args.verbose)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+
+    logger.info(
+        f"回放完成: 停电事件 {processed} 个，失败 {failed} 个，进程数 {args.workers}，"
+        f"耗时 {elapsed:.1f}s，吞吐 {processed / elapsed if elapsed else 0:.1f} 个/秒"
+    )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
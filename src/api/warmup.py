@@ -0,0 +1,97 @@
+"""事后分析结果预热 - 批量获取已结束停电事件的事后分析数据并写入结果存储
+
+使用方法:
+    API2MCP_RESULT_STORE_PATH=data/results.db python -m src.api.warmup OUT-001 OUT-002
+    API2MCP_RESULT_STORE_PATH=data/results.db python -m src.api.warmup --file outages.txt --concurrency 8
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import List, Tuple
+
+from ..utils import logger
+from ..services import (
+    POST_EVENT_ANALYSIS_TYPE,
+    async_request_data_service,
+    close_async_http_client,
+    get_result_store,
+    get_result_store_stats,
+)
+
+# 事后分析工具对应的接口（与 MCP 工具的请求方式一致）
+POST_EVENT_QUERIES: List[Tuple[str, str]] = [
+    ("POST", "/api/weather/data/portrait"),
+    ("POST", "/appeal/appealListByOutageNumber"),
+    ("POST", "/outage-data/outage/event/realMeasCenter/event/commonQuery/query"),
+    ("GET", "/outage-data/outage/event/luboAnalyse"),
+]
+
+
+async def warm_up(outage_numbers: List[str], concurrency: int) -> int:
+    """获取各停电事件的事后分析数据并写入结果存储，返回失败的请求数"""
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def fetch(outage_number: str, method: str, path: str) -> None:
+        nonlocal failed
+        payload = {"outageNumber": outage_number, "analysisType": POST_EVENT_ANALYSIS_TYPE}
+        async with semaphore:
+            try:
+                if method == "GET":
+                    await async_request_data_service(method, path, params=payload)
+                else:
+                    await async_request_data_service(method, path, payload=payload)
+            except Exception as e:
+                failed += 1
+                logger.error(f"预热失败 {outage_number} {path}: {e}")
+
+    try:
+        await asyncio.gather(*(
+            fetch(outage_number, method, path)
+            for outage_number in outage_numbers
+            for method, path in POST_EVENT_QUERIES
+        ))
+    finally:
+        await close_async_http_client()
+    return failed
+
+
+def read_outage_numbers(args: argparse.Namespace) -> List[str]:
+    outage_numbers = list(args.outage_numbers)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            outage_numbers.extend(line.strip() for line in f if line.strip())
+    return list(dict.fromkeys(outage_numbers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="事后分析结果预热")
+    parser.add_argument("outage_numbers", nargs="*", help="停电事件编号")
+    parser.add_argument("--file", help="停电事件编号文件，每行一个")
+    parser.add_argument("--concurrency", type=int, default=8, help="最大并发请求数")
+    args = parser.parse_args()
+
+    if get_result_store() is None:
+        sys.exit("未配置结果存储，请设置 API2MCP_RESULT_STORE_PATH。")
+
+    outage_numbers = read_outage_numbers(args)
+    if not outage_numbers:
+        sys.exit("未指定停电事件编号。")
+
+    before = get_result_store_stats()
+    start = time.perf_counter()
+    failed = asyncio.run(warm_up(outage_numbers, args.concurrency))
+    after = get_result_store_stats()
+
+    logger.info(
+        f"预热完成: 停电事件 {len(outage_numbers)} 个，"
+        f"新写入 {after['writes'] - before['writes']} 条，已存在 {after['hits'] - before['hits']} 条，"
+        f"失败 {failed} 条，占用 {after['bytes'] / 1024 / 1024:.1f}MB，耗时 {time.perf_counter() - start:.1f}s"
+    )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
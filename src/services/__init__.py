@@ -1,6 +1,51 @@
+from .http_client import (
+    get_http_session,
+    get_pool_stats,
+    close_http_session,
+    get_async_http_client,
+    close_async_http_client,
+)
+from .landform_cache import (
+    quantize_position,
+    LandformCache,
+    get_landform_cache,
+    get_landform_cache_stats,
+)
+from .response_cache import (
+    ResponseCache,
+    get_response_cache,
+    get_response_cache_stats,
+)
+from .result_store import (
+    POST_EVENT_ANALYSIS_TYPE,
+    ResultStore,
+    get_result_store,
+    get_result_store_stats,
+)
+from .cassette import (
+    cassette_key,
+    read_cassette,
+    CassetteRecorder,
+    get_cassette_recorder,
+    record_exchange,
+    get_cassette_stats,
+)
 from .data_service import (
     post_to_data_service,
     request_data_service,
+    async_post_to_data_service,
+    async_request_data_service,
+    get_upstream_stats,
+)
+from .outage_data import (
+    OUTAGE_DATA_PATH,
+    async_get_outage_data,
+    clear_outage_data,
+    get_outage_data_stats,
+)
+from .device_table import (
+    DeviceTable,
+    is_columnar_available,
 )
 from .weather_service import (
     process_weather_device_list,
@@ -10,9 +55,12 @@ from .weather_service import (
     process_weather_data,
 )
 from .device_service import (
+    build_cable_segment_index,
     get_affiliated_psr_id,
     safe_to_int,
     calculate_device_risk,
+    calculate_device_risks,
+    parse_run_time,
     build_tree_structure,
     process_device_list,
     normalize_psr_type,
@@ -23,6 +71,11 @@ from .environment_service import (
     is_in_spring_and_summer_range,
     get_work_address_info,
     get_landform,
+    async_get_landform,
+    get_landforms,
+    async_get_landforms,
+    async_get_environment_raw_data,
+    enrich_environment_offline,
     process_environment_data,
 )
 from .message_service import (
@@ -31,11 +84,74 @@ from .message_service import (
     clean_result,
     process_message_data,
 )
+from .handle_store import (
+    HANDLE_PREFIX,
+    is_handle,
+    put_handle,
+    resolve_handle,
+    to_handle_response,
+    get_handle_store_stats,
+)
+from .batch_service import (
+    get_process_pool,
+    close_process_pool,
+    async_run_in_process,
+    async_run_batch,
+    build_batch_response,
+)
+from .analysis_service import (
+    StageTimer,
+    async_analyze_outage,
+)
+from .health_service import (
+    ReadinessProbe,
+    get_readiness_probe,
+    async_check_readiness,
+    get_readiness_stats,
+)
 
 __all__ = [
+    # http_client
+    "get_http_session",
+    "get_pool_stats",
+    "close_http_session",
+    "get_async_http_client",
+    "close_async_http_client",
+    # landform_cache
+    "quantize_position",
+    "LandformCache",
+    "get_landform_cache",
+    "get_landform_cache_stats",
+    # response_cache
+    "ResponseCache",
+    "get_response_cache",
+    "get_response_cache_stats",
+    # result_store
+    "POST_EVENT_ANALYSIS_TYPE",
+    "ResultStore",
+    "get_result_store",
+    "get_result_store_stats",
+    # cassette
+    "cassette_key",
+    "read_cassette",
+    "CassetteRecorder",
+    "get_cassette_recorder",
+    "record_exchange",
+    "get_cassette_stats",
     # data_service
     "post_to_data_service",
     "request_data_service",
+    "async_post_to_data_service",
+    "async_request_data_service",
+    "get_upstream_stats",
+    # outage_data
+    "OUTAGE_DATA_PATH",
+    "async_get_outage_data",
+    "clear_outage_data",
+    "get_outage_data_stats",
+    # device_table
+    "DeviceTable",
+    "is_columnar_available",
     # weather_service
     "process_weather_device_list",
     "generate_risk_statements",
@@ -43,9 +159,12 @@ __all__ = [
     "match_weather_fault_risks",
     "process_weather_data",
     # device_service
+    "build_cable_segment_index",
     "get_affiliated_psr_id",
     "safe_to_int",
     "calculate_device_risk",
+    "calculate_device_risks",
+    "parse_run_time",
     "build_tree_structure",
     "process_device_list",
     "normalize_psr_type",
@@ -55,13 +174,36 @@ __all__ = [
     "is_in_spring_and_summer_range",
     "get_work_address_info",
     "get_landform",
+    "async_get_landform",
+    "get_landforms",
+    "async_get_landforms",
+    "async_get_environment_raw_data",
+    "enrich_environment_offline",
     "process_environment_data",
     # message_service
     "get_condition",
     "get_wave_fault_type",
     "clean_result",
     "process_message_data",
+    # handle_store
+    "HANDLE_PREFIX",
+    "is_handle",
+    "put_handle",
+    "resolve_handle",
+    "to_handle_response",
+    "get_handle_store_stats",
+    # batch_service
+    "get_process_pool",
+    "close_process_pool",
+    "async_run_in_process",
+    "async_run_batch",
+    "build_batch_response",
+    # analysis_service
+    "StageTimer",
+    "async_analyze_outage",
+    # health_service
+    "ReadinessProbe",
+    "get_readiness_probe",
+    "async_check_readiness",
+    "get_readiness_stats",
 ]
-
-
-
@@ -0,0 +1,150 @@
+"""停电事件综合分析服务 - 并发获取各数据源并在服务端完成处理，只返回汇总结果"""
+import asyncio
+import json
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..utils import logger, span
+from .data_service import async_post_to_data_service, async_request_data_service
+from .device_service import process_device_info_data
+from .environment_service import async_get_environment_raw_data, process_environment_data
+from .message_service import process_message_data
+from .outage_data import async_get_outage_data
+from .weather_service import process_weather_data
+
+
+class StageTimer:
+    """记录各阶段耗时（毫秒）"""
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = {}
+
+    async def run(self, stage: str, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            with span(f"stage {stage}"):
+                return await func(*args)
+        finally:
+            self.timings[stage] = round((time.perf_counter() - start) * 1000, 1)
+
+    async def run_in_thread(self, stage: str, func: Callable[..., Any], *args: Any) -> Any:
+        """在线程中执行同步处理函数，不阻塞事件循环"""
+        return await self.run(stage, asyncio.to_thread, func, *args)
+
+
+def _failure(stage: str, error: Exception) -> Dict[str, Any]:
+    logger.error(f"综合分析阶段 {stage} 失败: {error}")
+    return {
+        "code": 9999,
+        "success": False,
+        "data": None,
+        "msg": f"{stage} 失败: {error}",
+    }
+
+
+async def async_analyze_outage(
+        outage_number: str,
+        analysis_type: int,
+        outage_date: Optional[date] = None,
+) -> Dict[str, Any]:
+    """停电事件综合分析
+
+    并发获取事件、天气、设备、环境、报文和录波数据，并在服务端完成天气、设备、环境和报文处理。
+    各分支相互独立，单个分支失败时只在对应结果中返回错误信息；顶层 failed 列出失败的分支，
+    部分分支失败时 partial 为 true，全部分支失败时 success 为 false。
+
+    参数:
+        outage_number: 停电事件编号
+        analysis_type: 1（事中分析）或 2（事后分析）
+        outage_date: 停电日期，用于判断农业收割季和春夏季，默认为当天
+    """
+    if analysis_type not in (1, 2):
+        raise ValueError("analysis_type 仅支持 1（事中分析）或 2（事后分析）。")
+
+    outage_date = outage_date or date.today()
+    payload = {"outageNumber": outage_number, "analysisType": analysis_type}
+    timer = StageTimer()
+
+    async def event() -> Dict[str, Any]:
+        try:
+            return await timer.run("fetch_event", async_post_to_data_service,
+                                   "/outage/event/query", {"outageNumber": outage_number})
+        except Exception as e:
+            return _failure("fetch_event", e)
+
+    async def weather() -> Dict[str, Any]:
+        try:
+            weather_data = await timer.run("fetch_weather", async_post_to_data_service,
+                                           "/api/weather/data/portrait", payload)
+            return await timer.run_in_thread("process_weather", process_weather_data, weather_data)
+        except Exception as e:
+            return _failure("weather", e)
+
+    async def device() -> Dict[str, Any]:
+        try:
+            device_data = await timer.run("fetch_device", async_get_outage_data, outage_number)
+            return await timer.run_in_thread("process_device", process_device_info_data, device_data)
+        except Exception as e:
+            return _failure("device", e)
+
+    async def environment() -> Dict[str, Any]:
+        try:
+            environment_data = await timer.run("fetch_environment", async_get_environment_raw_data, outage_number)
+            return await timer.run_in_thread("process_environment", process_environment_data,
+                                             environment_data, outage_date)
+        except Exception as e:
+            return _failure("environment", e)
+
+    async def message() -> Dict[str, Any]:
+        try:
+            message_data, wave_data = await asyncio.gather(
+                timer.run("fetch_message", async_request_data_service, "POST",
+                          "/outage-data/outage/event/realMeasCenter/event/commonQuery/query", payload),
+                timer.run("fetch_wave", async_request_data_service, "GET",
+                          "/outage-data/outage/event/luboAnalyse", None, payload),
+            )
+            return await timer.run_in_thread("process_message", process_message_data,
+                                             json.dumps(message_data, ensure_ascii=False),
+                                             json.dumps(wave_data, ensure_ascii=False))
+        except Exception as e:
+            return _failure("message", e)
+
+    start = time.perf_counter()
+    event_result, weather_result, device_result, environment_result, message_result = await asyncio.gather(
+        event(), weather(), device(), environment(), message()
+    )
+    timer.timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+
+    branches = {
+        "event": event_result,
+        "weather": weather_result,
+        "device": device_result,
+        "environment": environment_result,
+        "message": message_result,
+    }
+    failed = [name for name, result in branches.items() if not isinstance(result, dict) or result.get("success") is False]
+    all_failed = len(failed) == len(branches)
+    if all_failed:
+        msg = "全部数据源处理失败"
+    elif failed:
+        msg = f"部分数据源处理失败: {', '.join(failed)}"
+    else:
+        msg = "操作成功"
+    logger.info(f"综合分析完成: {outage_number}，{msg}，耗时 {timer.timings['total']:.1f}ms")
+
+    return {
+        "code": 9999 if all_failed else 10000,
+        "success": not all_failed,
+        "partial": bool(failed) and not all_failed,
+        "failed": failed,
+        "data": {"outage_number": outage_number, **branches},
+        "timings": timer.timings,
+        "msg": msg,
+    }
+
+
+__all__ = [
+    "StageTimer",
+    "async_analyze_outage",
+]
@@ -0,0 +1,151 @@
+"""批量停电事件处理服务 - 限制并发获取数据，CPU 密集的处理函数在进程池中执行"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..utils import config, logger
+
+# 单个停电事件的处理结果回调，用于逐个推送结果
+ResultCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """获取共享进程池，batch_process_workers 为 0 时返回 None（改用线程执行）"""
+    global _process_pool
+    if config.batch_process_workers == 0:
+        return None
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                # 使用 spawn 启动子进程，避免 fork 时复制事件循环和连接池状态
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=config.batch_process_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(f"批量处理进程池已创建，进程数: {config.batch_process_workers or os.cpu_count()}")
+    return _process_pool
+
+
+def close_process_pool() -> None:
+    """关闭共享进程池"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=True, cancel_futures=True)
+            _process_pool = None
+
+
+def _discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """丢弃已损坏的进程池，下次重新创建；不等待子进程退出，可在事件循环中调用"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def async_run_in_process(func: Callable[..., Any], *args: Any) -> Any:
+    """在进程池中执行处理函数（函数和参数需可 pickle），未启用进程池时在线程中执行
+
+    进程池损坏时抛出 BrokenProcessPool，排队中被连带取消的调用同样抛出 BrokenProcessPool。
+    """
+    pool = get_process_pool()
+    if pool is None:
+        return await asyncio.to_thread(func, *args)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        # 子进程异常退出后进程池不可再用，丢弃后下次重新创建
+        _discard_process_pool(pool)
+        raise
+    except asyncio.CancelledError:
+        # 当前任务未被取消，说明是进程池损坏时取消了排队中的调用
+        task = asyncio.current_task()
+        if task is not None and task.cancelling() == 0:
+            raise BrokenProcessPool("进程池已损坏，排队中的处理被取消") from None
+        raise
+
+
+def _failure(outage_number: str, error: BaseException) -> Dict[str, Any]:
+    message = str(error) or type(error).__name__
+    logger.error(f"批量处理停电事件 {outage_number} 失败: {message}")
+    return {
+        "code": 9999,
+        "success": False,
+        "data": None,
+        "msg": f"处理失败: {message}",
+    }
+
+
+async def async_run_batch(
+        outage_numbers: List[str],
+        handler: Callable[[str], Awaitable[Dict[str, Any]]],
+        on_result: Optional[ResultCallback] = None,
+        concurrency: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """对多个停电事件并发执行 handler，按完成顺序回调并返回全部结果
+
+    参数:
+        outage_numbers: 停电事件编号列表（重复编号只处理一次）
+        handler: 单个停电事件的处理协程
+        on_result: 每个停电事件完成时的回调
+        concurrency: 最大并发数，默认使用 config.batch_concurrency
+    """
+    outage_numbers = list(dict.fromkeys(outage_numbers))
+    if len(outage_numbers) > config.batch_max_outages:
+        raise ValueError(f"单次最多处理 {config.batch_max_outages} 个停电事件。")
+
+    semaphore = asyncio.Semaphore(concurrency or config.batch_concurrency)
+
+    async def run_one(outage_number: str) -> tuple[str, Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return outage_number, await handler(outage_number)
+            except asyncio.CancelledError as e:
+                # 批量任务本身被取消时继续向上抛出，否则只记为该停电事件失败
+                task = asyncio.current_task()
+                if task is not None and task.cancelling():
+                    raise
+                return outage_number, _failure(outage_number, e)
+            except Exception as e:
+                return outage_number, _failure(outage_number, e)
+
+    start = time.perf_counter()
+    results: Dict[str, Dict[str, Any]] = {}
+    for next_done in asyncio.as_completed([run_one(outage_number) for outage_number in outage_numbers]):
+        outage_number, result = await next_done
+        results[outage_number] = result
+        if on_result is not None:
+            await on_result(outage_number, result)
+
+    failed = sum(1 for result in results.values() if isinstance(result, dict) and result.get("success") is False)
+    logger.info(f"批量处理完成: 停电事件 {len(results)} 个，失败 {failed} 个，耗时 {time.perf_counter() - start:.2f}s")
+    return results
+
+
+def build_batch_response(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """汇总批量处理结果"""
+    failed = sum(1 for result in results.values() if isinstance(result, dict) and result.get("success") is False)
+    return {
+        "code": 10000,
+        "success": True,
+        "data": results,
+        "msg": f"共处理 {len(results)} 个停电事件，失败 {failed} 个",
+    }
+
+
+__all__ = [
+    "get_process_pool",
+    "close_process_pool",
+    "async_run_in_process",
+    "async_run_batch",
+    "build_batch_response",
+]
@@ -0,0 +1,157 @@
+"""上游请求录制模块 - 将发往数据服务和地貌服务的请求及响应追加写入 JSONL 磁带文件
+
+录制的磁带可由 benchmarks/stub_server.py 回放，在没有生产数据服务和地貌服务的环境中
+进行基准测试、回归测试和压测。每行一条记录:
+    {"method": "POST", "path": "/outage/event/query", "request": {...}, "status": 200, "body": "..."}
+GET 请求的 request 为查询参数，POST 请求为 JSON 请求体；body 为 UTF-8 响应文本。
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from ..utils import config, logger
+
+# 磁带记录的匹配键：(方法, 路径, 规范化的请求参数)
+CassetteKey = Tuple[str, str, str]
+
+
+def cassette_key(method: str, path: str, data: Any) -> CassetteKey:
+    """生成磁带记录的匹配键
+
+    GET 请求的参数值统一转为字符串，与回放时从查询字符串解析出的参数一致。
+    """
+    method = method.upper()
+    if method == "GET":
+        data = {str(key): str(value) for key, value in (data or {}).items()}
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return method, "/" + path.lstrip("/"), canonical
+
+
+def read_cassette(path: str) -> Iterator[Dict[str, Any]]:
+    """逐条读取磁带记录"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class CassetteRecorder:
+    """追加写入磁带文件，多线程安全
+
+    record 只把记录放入队列，序列化和写文件由后台线程完成，异步请求路径不会阻塞事件循环。
+    后台线程在队列取空时才刷新文件；进程退出时写完队列中剩余的记录。
+
+    参数:
+        path: 磁带文件路径（JSONL），已存在时在末尾追加
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Any, bytes, int]]]" = queue.Queue()
+        self._closed = False
+        self.recorded = 0
+        self.failed = 0
+        self._writer = threading.Thread(target=self._run, name="cassette-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def record(self, method: str, path: str, data: Any, content: bytes, status: int = 200) -> None:
+        """追加一条请求/响应记录，写入失败只记录日志，不影响正常请求"""
+        if not self._closed:
+            self._queue.put((method, path, data, content, status))
+
+    def _write(self, method: str, path: str, data: Any, content: bytes, status: int) -> None:
+        try:
+            line = json.dumps({
+                "method": method.upper(),
+                "path": "/" + path.lstrip("/"),
+                "request": data,
+                "status": status,
+                "body": content.decode("utf-8", errors="replace"),
+            }, ensure_ascii=False, default=str)
+            self._file.write(line + "\n")
+            self.recorded += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"写入磁带失败 {path}: {e}")
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            try:
+                if entry is None:
+                    return
+                self._write(*entry)
+                if self._queue.empty():
+                    self._file.flush()
+            except Exception as e:
+                logger.error(f"刷新磁带文件失败 {self.path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """等待队列中的记录全部写入文件"""
+        if not self._closed:
+            self._queue.join()
+
+    def close(self) -> None:
+        """写完队列中剩余的记录后关闭文件"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+        atexit.unregister(self.close)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "recorded": self.recorded, "failed": self.failed, "pending": self._queue.qsize()}
+
+
+_recorder: Optional[CassetteRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_cassette_recorder() -> Optional[CassetteRecorder]:
+    """获取全局磁带录制器，未配置 cassette_path 时返回 None"""
+    global _recorder
+    if not config.cassette_path:
+        return None
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = CassetteRecorder(config.cassette_path)
+                logger.info(f"上游请求录制已开启: {config.cassette_path}")
+    return _recorder
+
+
+def record_exchange(method: str, path: str, data: Any, content: bytes) -> None:
+    """开启录制时记录一次上游请求及其响应"""
+    recorder = get_cassette_recorder()
+    if recorder is not None:
+        recorder.record(method, path, data, content)
+
+
+def get_cassette_stats() -> Dict[str, Any]:
+    """获取磁带录制统计信息"""
+    recorder = get_cassette_recorder()
+    if recorder is None:
+        return {"enabled": False}
+    return {"enabled": True, **recorder.stats()}
+
+
+__all__ = [
+    "cassette_key",
+    "read_cassette",
+    "CassetteRecorder",
+    "get_cassette_recorder",
+    "record_exchange",
+    "get_cassette_stats",
+]
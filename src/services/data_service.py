@@ -1,33 +1,112 @@
 """数据服务调用模块"""
-from typing import Any, Dict, Optional
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
+import httpx
 import requests
 
-from ..utils import config, logger
+from ..utils import config, logger, track_upstream
+from .cassette import record_exchange
+from .http_client import get_async_http_client, get_http_session
+from .response_cache import decode_response, get_response_cache
+from .result_store import ResultStore, get_result_store
+
+# 按接口路径统计实际发往上游的请求数和响应字节数
+_upstream_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"requests": 0, "bytes": 0})
+_upstream_stats_lock = threading.Lock()
+
+
+def _record_upstream(method: str, path: str, data: Any, content: bytes) -> None:
+    with _upstream_stats_lock:
+        stats = _upstream_stats["/" + path.lstrip("/")]
+        stats["requests"] += 1
+        stats["bytes"] += len(content)
+    record_exchange(method, path, data, content)
+
+
+def get_upstream_stats() -> Dict[str, Dict[str, int]]:
+    """获取各接口实际发往上游的请求数和响应字节数"""
+    with _upstream_stats_lock:
+        return {path: dict(stats) for path, stats in _upstream_stats.items()}
+
+
+def _load_stored_result(method: str, path: str, data: Any) -> Tuple[Optional[ResultStore], Optional[bytes]]:
+    """查询事后分析结果存储，返回 (可写入的存储, 已保存的响应体)"""
+    store = get_result_store()
+    if store is None or not store.accepts(path, data):
+        return None, None
+    return store, store.get(method, path, data)
+
+
+async def _async_load_stored_result(
+        method: str, path: str, data: Any,
+) -> Tuple[Optional[ResultStore], Optional[bytes]]:
+    """查询事后分析结果存储，SQLite 读取在线程中执行，不阻塞事件循环"""
+    store = get_result_store()
+    if store is None or not store.accepts(path, data):
+        return None, None
+    return store, await asyncio.to_thread(store.get, method, path, data)
+
+
+def _persisting(store: ResultStore, method: str, path: str, data: Any, fetch: Callable[[], bytes]) -> Callable[[], bytes]:
+    def fetch_and_store() -> bytes:
+        content = fetch()
+        store.put(method, path, data, content)
+        return content
+    return fetch_and_store
+
+
+def _async_persisting(
+        store: ResultStore,
+        method: str,
+        path: str,
+        data: Any,
+        fetch: Callable[[], Awaitable[bytes]],
+) -> Callable[[], Awaitable[bytes]]:
+    async def fetch_and_store() -> bytes:
+        content = await fetch()
+        await asyncio.to_thread(store.put, method, path, data, content)
+        return content
+    return fetch_and_store
 
 
 def post_to_data_service(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     """向数据服务发送POST请求"""
     url = f"{config.normalized_base_url}/{path.lstrip('/')}"
-    try:
-        response = requests.post(
-            url,
-            json=payload,
-            headers=config.build_headers(),
-            timeout=config.timeout,
-        )
-        response.raise_for_status()
-    except requests.Timeout as exc:
-        logger.error(f"请求数据服务超时（{config.timeout}s）: {url}")
-        raise RuntimeError(f"请求数据服务超时（{config.timeout}s）: {url}") from exc
-    except requests.RequestException as exc:
-        logger.error(f"请求数据服务失败: {url}")
-        raise RuntimeError(f"请求数据服务失败: {url}") from exc
-
-    try:
-        return response.json()
-    except ValueError as exc:
-        raise RuntimeError("数据服务返回的不是有效的 JSON。") from exc
+
+    def fetch() -> bytes:
+        try:
+            with track_upstream("data_service", path) as call:
+                response = get_http_session().post(
+                    url,
+                    json=payload,
+                    headers=config.build_headers(),
+                    timeout=config.timeout,
+                )
+                call.status, call.size = response.status_code, len(response.content)
+                response.raise_for_status()
+        except requests.Timeout as exc:
+            logger.error(f"请求数据服务超时（{config.timeout}s）: {url}")
+            raise RuntimeError(f"请求数据服务超时（{config.timeout}s）: {url}") from exc
+        except requests.RequestException as exc:
+            logger.error(f"请求数据服务失败: {url}")
+            raise RuntimeError(f"请求数据服务失败: {url}") from exc
+        _record_upstream("POST", path, payload, response.content)
+        return response.content
+
+    # 事后分析结果已保存时直接返回，否则获取后写入存储
+    store, stored = _load_stored_result("POST", path, payload)
+    if stored is not None:
+        return decode_response(stored)
+    if store is not None:
+        fetch = _persisting(store, "POST", path, payload, fetch)
+
+    cache = get_response_cache()
+    if cache is None:
+        return decode_response(fetch())
+    return cache.fetch("POST", path, payload, fetch)
 
 
 def request_data_service(
@@ -49,29 +128,103 @@ def request_data_service(
         request_args['json'] = payload
     elif method.upper() == 'GET' and params is not None:
         request_args['params'] = params
+    request_data = params if method.upper() == 'GET' else payload
 
-    try:
-        if method.upper() == 'POST':
-            response = requests.post(**request_args)
-        elif method.upper() == 'GET':
-            response = requests.get(**request_args)
-        else:
+    def fetch() -> bytes:
+        session = get_http_session()
+        if method.upper() not in ('GET', 'POST'):
             raise ValueError(f"不支持的HTTP方法: {method}")
+        try:
+            with track_upstream("data_service", path) as call:
+                if method.upper() == 'POST':
+                    response = session.post(**request_args)
+                else:
+                    response = session.get(**request_args)
+                call.status, call.size = response.status_code, len(response.content)
+                response.raise_for_status()
+
+        except requests.Timeout as exc:
+            logger.error(f"{method}请求数据服务超时（{config.timeout}s）: {url}")
+            raise RuntimeError(f"{method}请求数据服务超时（{config.timeout}s）: {url}") from exc
+        except requests.RequestException as exc:
+            logger.error(f"{method}请求数据服务失败: {url}")
+            raise RuntimeError(f"{method}请求数据服务失败: {url}") from exc
+        _record_upstream(method, path, request_data, response.content)
+        return response.content
+
+    store, stored = _load_stored_result(method, path, request_data)
+    if stored is not None:
+        return decode_response(stored)
+    if store is not None:
+        fetch = _persisting(store, method, path, request_data, fetch)
+
+    cache = get_response_cache()
+    if cache is None:
+        return decode_response(fetch())
+    return cache.fetch(method, path, request_data, fetch)
+
+
+async def async_post_to_data_service(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """向数据服务发送异步POST请求"""
+    return await async_request_data_service("POST", path, payload=payload)
+
+
+async def async_request_data_service(
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """向数据服务发送异步HTTP请求（支持GET和POST），不阻塞事件循环"""
+    url = f"{config.normalized_base_url}/{path.lstrip('/')}"
+    method = method.upper()
+    if method not in ('GET', 'POST'):
+        raise ValueError(f"不支持的HTTP方法: {method}")
 
-        response.raise_for_status()
-
-    except requests.Timeout as exc:
-        logger.error(f"{method}请求数据服务超时（{config.timeout}s）: {url}")
-        raise RuntimeError(f"{method}请求数据服务超时（{config.timeout}s）: {url}") from exc
-    except requests.RequestException as exc:
-        logger.error(f"{method}请求数据服务失败: {url}")
-        raise RuntimeError(f"{method}请求数据服务失败: {url}") from exc
-
-    try:
-        return response.json()
-    except ValueError as exc:
-        raise RuntimeError("数据服务返回的不是有效的 JSON。") from exc
-
-
-__all__ = ["post_to_data_service", "request_data_service"]
+    request_args: Dict[str, Any] = {
+        'headers': config.build_headers(),
+        'timeout': config.timeout,
+    }
+    if method == 'POST' and payload is not None:
+        request_args['json'] = payload
+    elif method == 'GET' and params is not None:
+        request_args['params'] = params
+    request_data = params if method == 'GET' else payload
+
+    async def fetch() -> bytes:
+        try:
+            with track_upstream("data_service", path) as call:
+                response = await get_async_http_client().request(method, url, **request_args)
+                call.status, call.size = response.status_code, len(response.content)
+                response.raise_for_status()
+        except httpx.TimeoutException as exc:
+            logger.error(f"{method}请求数据服务超时（{config.timeout}s）: {url}")
+            raise RuntimeError(f"{method}请求数据服务超时（{config.timeout}s）: {url}") from exc
+        except httpx.HTTPError as exc:
+            logger.error(f"{method}请求数据服务失败: {url}")
+            raise RuntimeError(f"{method}请求数据服务失败: {url}") from exc
+        _record_upstream(method, path, request_data, response.content)
+        return response.content
+
+    # 事后分析结果已保存时直接返回，否则获取后写入存储
+    store, stored = await _async_load_stored_result(method, path, request_data)
+    if stored is not None:
+        return decode_response(stored)
+    if store is not None:
+        fetch = _async_persisting(store, method, path, request_data, fetch)
+
+    # 相同请求命中缓存或合并到正在进行的上游调用
+    cache = get_response_cache()
+    if cache is None:
+        return decode_response(await fetch())
+    return await cache.async_fetch(method, path, request_data, fetch)
+
+
+__all__ = [
+    "post_to_data_service",
+    "request_data_service",
+    "async_post_to_data_service",
+    "async_request_data_service",
+    "get_upstream_stats",
+]
 
@@ -1,7 +1,8 @@
 """设备数据处理服务"""
-from collections import defaultdict
+import re
 from datetime import datetime
-from typing import Any, Dict, List, Set
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set
 
 from ..repository import (
     PSR_TYPE_TO_DEVICE_TYPE,
@@ -19,7 +20,8 @@ from ..repository import (
     BILEIQI_CODE,
     STATION_CODE,
 )
-from ..utils import logger
+from ..utils import config, logger, traced
+from .device_table import DeviceTable, is_columnar_available, np
 
 
 def safe_to_int(value: Any, default: int = 0) -> int:
@@ -43,7 +45,34 @@ def normalize_psr_type(value: Any) -> str:
     return str(value).strip().lower()
 
 
-def get_affiliated_psr_id(data: List[Dict[str, Any]], item: Dict[str, Any], device_psr_type: str) -> str:
+def build_cable_segment_index(data: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    构建 电缆终端/接头ID -> 所属电缆段ID 的索引
+
+    按设备列表顺序登记每个电缆段的起点和终点，同一位置只保留第一个电缆段，
+    与逐个扫描电缆段列表的匹配结果一致。
+
+    Args:
+        data: 所有设备数据列表
+
+    Returns:
+        位置ID到电缆段ID的映射
+    """
+    index: Dict[str, str] = {}
+    for segment in data:
+        if segment.get("psr_type") == "0201":
+            segment_id = segment.get("psr_id", "")
+            index.setdefault(segment.get("start_position", ""), segment_id)
+            index.setdefault(segment.get("end_position", ""), segment_id)
+    return index
+
+
+def get_affiliated_psr_id(
+        data: List[Dict[str, Any]],
+        item: Dict[str, Any],
+        device_psr_type: str,
+        segment_index: Optional[Dict[str, str]] = None,
+) -> str:
     """
     获取所属设备ID
     
@@ -51,6 +80,8 @@ def get_affiliated_psr_id(data: List[Dict[str, Any]], item: Dict[str, Any], devi
         data: 所有设备数据列表
         item: 当前设备数据
         device_psr_type: 设备PSR类型
+        segment_index: 由 build_cable_segment_index 预先构建的电缆段索引，
+            批量处理时传入可避免对每个终端/接头重复扫描 data
         
     Returns:
         所属设备ID
@@ -60,6 +91,8 @@ def get_affiliated_psr_id(data: List[Dict[str, Any]], item: Dict[str, Any], devi
     # 电缆终端和电缆接头需要找到起点位置为终端或接头的电缆段id作为所属设备id
     if psr_type in ["0202", "0203"]:
         psr_id = item.get("psr_id", "")
+        if segment_index is not None:
+            return segment_index.get(psr_id, "")
         for segment in data:
             if segment.get("psr_type") == "0201":
                 start_position = segment.get("start_position", "")
@@ -76,184 +109,348 @@ def get_affiliated_psr_id(data: List[Dict[str, Any]], item: Dict[str, Any], devi
     return ""
 
 
-def calculate_device_risk(device: Dict[str, Any]) -> tuple[str, float, str, int]:
-    """计算设备风险等级"""
-    if not isinstance(device, dict):
-        return "未知风险", 0.0, "未知", 0
+# 风险计算用到的设备类型常量
+TOWER_TYPE = "0103"  # 杆塔
+INSULATOR_TYPE = "0103001"  # 绝缘子
+HARDWARE_TYPE = "0103002"  # 金具
+GUY_WIRE_TYPE = "0103005"  # 拉线
 
-    try:
-        # 设备类型常量
-        TOWER_TYPE = "0103"  # 杆塔
-        INSULATOR_TYPE = "0103001"  # 绝缘子
-        HARDWARE_TYPE = "0103002"  # 金具
-        GUY_WIRE_TYPE = "0103005"  # 拉线
+# 使用 operate_date 作为投运时间的设备类型
+OPERATE_DATE_TYPES = ("0103002", "0103001", "0306")
 
-        # 获取设备类型
-        device_type = device.get("device_type", "")
-        affiliated_psr_type = device.get("affiliated_psr_type", "")
+RUN_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-        # 获取启动运行时间
-        start_run_time = device.get("start_time", "")
-        if device_type in ["0103002", "0103001", "0306"]:
-            start_run_time = device.get("operate_date", "")
+# 严格的 YYYY-mm-dd HH:MM:SS 格式（年份不为 0000），此类字符串走快速解析和向量化解析
+STRICT_RUN_TIME_PATTERN = re.compile(r"(?!0000)[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}")
 
-        # 如果没有启动运行时间，设置为未知风险
-        if not start_run_time:
-            return "未知风险", 0.0, "未知", 0
+# 投运时间解析缓存大小（同一线路的设备投运时间大量重复）
+RUN_TIME_CACHE_SIZE = 4096
 
-        sdf = datetime.strptime(start_run_time, "%Y-%m-%d %H:%M:%S")
-        current_date = datetime.now()
+UNKNOWN_RISK: tuple[str, float, str, int] = ("未知风险", 0.0, "未知", 0)
 
-        # 计算运行时间（年）
-        run_time_days = (current_date - sdf).days
-        run_time_years = run_time_days / 365.0
-        formatted_run_time_years = round(run_time_years, 1)
 
-        # 处理缺陷列表（根据设备类型过滤）
-        defect_list = device.get("defect_list", [])
-        fault_list = device.get("fault_list", [])
-        hidden_list = device.get("hidden_list", [])
-        parent_defect_list = device.get("parent_defect_list", [])
+@lru_cache(maxsize=RUN_TIME_CACHE_SIZE)
+def parse_run_time(value: str) -> datetime:
+    """解析投运时间，结果与 datetime.strptime(value, RUN_TIME_FORMAT) 一致
 
-        processed_defect_list = []
-
-        if device_type == TOWER_TYPE:
-            # 杆塔：只保留与杆塔或通道相关的缺陷
-            for defect in parent_defect_list + defect_list:
-                if isinstance(defect, dict):
-                    eliminated_state = defect.get("eliminatedState", "")
-                    component_type = defect.get("componentTypeName", "")
-                    if eliminated_state == "0" and ("杆塔" in component_type or "通道" in component_type):
+    严格格式的字符串按固定位置切片直接构造 datetime，其余格式退回 strptime；
+    解析结果按字符串缓存，解析失败时抛出 ValueError（异常不会被缓存）。
+    """
+    if type(value) is str and STRICT_RUN_TIME_PATTERN.fullmatch(value):
+        return datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19]),
+        )
+    return datetime.strptime(value, RUN_TIME_FORMAT)
+
+
+def _get_start_run_time(device: Dict[str, Any]) -> Any:
+    """获取设备投运时间字段"""
+    if device.get("device_type", "") in OPERATE_DATE_TYPES:
+        return device.get("operate_date", "")
+    return device.get("start_time", "")
+
+
+def _process_defect_list(device: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """根据设备类型过滤缺陷列表"""
+    device_type = device.get("device_type", "")
+    affiliated_psr_type = device.get("affiliated_psr_type", "")
+    defect_list = device.get("defect_list", [])
+    parent_defect_list = device.get("parent_defect_list", [])
+
+    processed_defect_list = []
+
+    if device_type == TOWER_TYPE:
+        # 杆塔：只保留与杆塔或通道相关的缺陷
+        for defect in parent_defect_list + defect_list:
+            if isinstance(defect, dict):
+                eliminated_state = defect.get("eliminatedState", "")
+                component_type = defect.get("componentTypeName", "")
+                if eliminated_state == "0" and ("杆塔" in component_type or "通道" in component_type):
+                    processed_defect_list.append(defect)
+
+    elif device_type in CONDUCTOR_CODES:
+        # 导线：添加与导线相关的缺陷（来自父节点）
+        for defect in parent_defect_list:
+            if isinstance(defect, dict):
+                eliminated_state = defect.get("eliminatedState", "")
+                component_type = defect.get("componentTypeName", "")
+                if eliminated_state == "0" and "导线" in component_type:
+                    processed_defect_list.append(defect)
+
+        # 添加设备自身的缺陷
+        processed_defect_list.extend([d for d in defect_list if isinstance(d, dict)])
+
+    elif device_type in HARDWARE_CODES:
+        # 金具：根据子类型处理
+        for defect in parent_defect_list:
+            if isinstance(defect, dict):
+                eliminated_state = defect.get("eliminatedState", "")
+                component_type = defect.get("componentTypeName", "")
+
+                if eliminated_state == "0":
+                    if device_type == INSULATOR_TYPE and "绝缘子" in component_type:
                         processed_defect_list.append(defect)
-
-        elif device_type in CONDUCTOR_CODES:
-            # 导线：添加与导线相关的缺陷（来自父节点）
-            for defect in parent_defect_list:
-                if isinstance(defect, dict):
-                    eliminated_state = defect.get("eliminatedState", "")
-                    component_type = defect.get("componentTypeName", "")
-                    if eliminated_state == "0" and "导线" in component_type:
+                    elif device_type == HARDWARE_TYPE and "金具" in component_type:
+                        processed_defect_list.append(defect)
+                    elif device_type == GUY_WIRE_TYPE and "拉线" in component_type:
                         processed_defect_list.append(defect)
 
-            # 添加设备自身的缺陷
-            processed_defect_list.extend([d for d in defect_list if isinstance(d, dict)])
+        # 添加设备自身的缺陷
+        processed_defect_list.extend([d for d in defect_list if isinstance(d, dict)])
 
-        elif device_type in HARDWARE_CODES:
-            # 金具：根据子类型处理
-            for defect in parent_defect_list:
-                if isinstance(defect, dict):
-                    eliminated_state = defect.get("eliminatedState", "")
-                    component_type = defect.get("componentTypeName", "")
+    elif device_type in SWITCH_CODES and affiliated_psr_type == TOWER_TYPE:
+        # 杆塔上的开关：添加与开关相关的缺陷（来自父节点）
+        for defect in parent_defect_list:
+            if isinstance(defect, dict):
+                eliminated_state = defect.get("eliminatedState", "")
+                component_type = defect.get("componentTypeName", "")
+                if eliminated_state == "0" and "开关" in component_type:
+                    processed_defect_list.append(defect)
+
+        # 添加设备自身的缺陷
+        processed_defect_list.extend([d for d in defect_list if isinstance(d, dict)])
 
-                    if eliminated_state == "0":
-                        if device_type == INSULATOR_TYPE and "绝缘子" in component_type:
-                            processed_defect_list.append(defect)
-                        elif device_type == HARDWARE_TYPE and "金具" in component_type:
-                            processed_defect_list.append(defect)
-                        elif device_type == GUY_WIRE_TYPE and "拉线" in component_type:
-                            processed_defect_list.append(defect)
-
-            # 添加设备自身的缺陷
-            processed_defect_list.extend([d for d in defect_list if isinstance(d, dict)])
-
-        elif device_type in SWITCH_CODES and affiliated_psr_type == TOWER_TYPE:
-            # 杆塔上的开关：添加与开关相关的缺陷（来自父节点）
-            for defect in parent_defect_list:
-                if isinstance(defect, dict):
-                    eliminated_state = defect.get("eliminatedState", "")
+    else:
+        # 其他设备：使用自身的缺陷列表
+        processed_defect_list = [d for d in defect_list if isinstance(d, dict)]
+
+    return processed_defect_list
+
+
+def _has_fault_risk(device: Dict[str, Any]) -> bool:
+    """检查故障列表：01 未处理, 02 处理中"""
+    fault_list = device.get("fault_list", [])
+    if isinstance(fault_list, list):
+        for fault in fault_list:
+            if isinstance(fault, dict) and fault.get("faultStatus", "") in ["01", "02"]:
+                return True
+    return False
+
+
+def _has_defect_risk(device: Dict[str, Any], processed_defect_list: List[Dict[str, Any]]) -> bool:
+    """检查处理后的缺陷列表：0 未消除；杆塔只认杆塔类缺陷"""
+    device_type = device.get("device_type", "")
+    for defect in processed_defect_list:
+        if isinstance(defect, dict):
+            eliminated_state = defect.get("eliminatedState", "")
+            if eliminated_state == "0":  # 0: 未消除
+                if device_type == TOWER_TYPE:
                     component_type = defect.get("componentTypeName", "")
-                    if eliminated_state == "0" and "开关" in component_type:
-                        processed_defect_list.append(defect)
+                    if "杆塔" in component_type:
+                        return True
+                    continue
+                return True
+    return False
 
-            # 添加设备自身的缺陷
-            processed_defect_list.extend([d for d in defect_list if isinstance(d, dict)])
 
-        else:
-            # 其他设备：使用自身的缺陷列表
-            processed_defect_list = [d for d in defect_list if isinstance(d, dict)]
+def _has_hidden_risk(device: Dict[str, Any]) -> bool:
+    """检查隐患列表：16 未整改, 09 整改中"""
+    hidden_list = device.get("hidden_list", [])
+    if isinstance(hidden_list, list):
+        for hidden in hidden_list:
+            if isinstance(hidden, dict) and hidden.get("state", "") in ["16", "09"]:
+                return True
+    return False
+
+
+def _has_history_risk(device: Dict[str, Any]) -> bool:
+    """检查任何类型的历史记录"""
+    history_lists = [
+        device.get("defect_history_list", []),
+        device.get("hidden_history_list", []),
+        device.get("fault_history_list", [])
+    ]
+    return any(isinstance(history_list, list) and len(history_list) > 0 for history_list in history_lists)
+
+
+def _calculate_device_score(device: Dict[str, Any]) -> int:
+    """计算设备得分"""
+    fault_score = 35
+    defect_score = 30
+    hazard_score = 25
+    patrol_score = 10
+
+    fault_score = max(fault_score - safe_to_int(device.get("fault", 0)) * 5, 0)
+    defect_score = max(defect_score - safe_to_int(device.get("defect", 0)) * 3, 0)
+    hazard_score = max(hazard_score - safe_to_int(device.get("hazard", 0)) * 2, 0)
 
-        # 更新设备的缺陷列表为处理后的列表
+    return fault_score + defect_score + hazard_score + patrol_score
+
+
+def calculate_device_risk(device: Dict[str, Any], now: Optional[datetime] = None) -> tuple[str, float, str, int]:
+    """计算设备风险等级
+
+    参数:
+        device: 设备信息
+        now: 计算运行年限的参考时间，默认为当前时间
+    """
+    if not isinstance(device, dict):
+        return UNKNOWN_RISK
+
+    try:
+        # 获取启动运行时间
+        start_run_time = _get_start_run_time(device)
+
+        # 如果没有启动运行时间，设置为未知风险
+        if not start_run_time:
+            return UNKNOWN_RISK
+
+        sdf = parse_run_time(start_run_time)
+        current_date = now or datetime.now()
+
+        # 计算运行时间（年）
+        run_time_days = (current_date - sdf).days
+        run_time_years = run_time_days / 365.0
+        formatted_run_time_years = round(run_time_years, 1)
+
+        # 处理缺陷列表（根据设备类型过滤），更新设备的缺陷列表为处理后的列表
+        processed_defect_list = _process_defect_list(device)
         device["processed_defect_list"] = processed_defect_list
 
-        # 检查是否存在风险
-        has_risk = False
-
-        # 检查故障列表
-        if not has_risk and isinstance(fault_list, list):
-            for fault in fault_list:
-                if isinstance(fault, dict):
-                    fault_status = fault.get("faultStatus", "")
-                    if fault_status in ["01", "02"]:  # 01: 未处理, 02: 处理中
-                        has_risk = True
-                        break
-
-        # 检查缺陷列表（使用处理后的缺陷列表）
-        if not has_risk:
-            for defect in processed_defect_list:
-                if isinstance(defect, dict):
-                    eliminated_state = defect.get("eliminatedState", "")
-                    if eliminated_state == "0":  # 0: 未消除
-                        if device_type == TOWER_TYPE:
-                            component_type = defect.get("componentTypeName", "")
-                            if "杆塔" in component_type:
-                                has_risk = True
-                                break
-                            continue
-                        has_risk = True
-                        break
-
-        # 检查隐患列表
-        if not has_risk and isinstance(hidden_list, list):
-            for hidden in hidden_list:
-                if isinstance(hidden, dict):
-                    state = hidden.get("state", "")
-                    if state in ["16", "09"]:  # 16: 未整改, 09: 整改中
-                        has_risk = True
-                        break
-
-        # 检查历史记录
-        if not has_risk:
-            # 检查任何类型的历史记录
-            history_lists = [
-                device.get("defect_history_list", []),
-                device.get("hidden_history_list", []),
-                device.get("fault_history_list", [])
-            ]
-
-            for history_list in history_lists:
-                if isinstance(history_list, list) and len(history_list) > 0:
-                    has_risk = True
-                    break
-
-        # 检查家族缺陷
-        if not has_risk:
-            has_family_defect = device.get("has_family_defect", False)
-            if has_family_defect:
-                has_risk = True
-
-        # 计算设备得分
-        fault_score = 35
-        defect_score = 30
-        hazard_score = 25
-        patrol_score = 10
-
-        fault_score = max(fault_score - safe_to_int(device.get("fault", 0)) * 5, 0)
-        defect_score = max(defect_score - safe_to_int(device.get("defect", 0)) * 3, 0)
-        hazard_score = max(hazard_score - safe_to_int(device.get("hazard", 0)) * 2, 0)
+        # 依次检查故障、缺陷、隐患、历史记录和家族缺陷
+        has_risk = (
+            _has_fault_risk(device)
+            or _has_defect_risk(device, processed_defect_list)
+            or _has_hidden_risk(device)
+            or _has_history_risk(device)
+            or bool(device.get("has_family_defect", False))
+        )
 
         long_years = "否"
-        total_score = fault_score + defect_score + hazard_score + patrol_score
+        total_score = _calculate_device_score(device)
 
         return ("是" if has_risk else "否"), formatted_run_time_years, long_years, total_score
 
     except ValueError as e:
         logger.error(f"解析设备运行时间失败: {e}")
-        return "未知风险", 0.0, "未知", 0
+        return UNKNOWN_RISK
     except Exception as e:
         logger.error(f"计算设备风险失败: {e}")
-        return "未知风险", 0.0, "未知", 0
+        return UNKNOWN_RISK
+
+
+def _is_strict_run_time(value: Any) -> bool:
+    return type(value) is str and STRICT_RUN_TIME_PATTERN.fullmatch(value) is not None
 
 
+def _find_invalid_datetimes(values: List[str], offset: int = 0) -> Set[int]:
+    """二分定位无法解析为 datetime64 的位置（如 2 月 30 日）"""
+    try:
+        np.array(values, dtype="datetime64[s]")
+        return set()
+    except ValueError:
+        if len(values) == 1:
+            return {offset}
+        middle = len(values) // 2
+        return (_find_invalid_datetimes(values[:middle], offset)
+                | _find_invalid_datetimes(values[middle:], offset + middle))
+
+
+def _batch_run_time_days(start_run_times: List[Any], now: datetime) -> List[Any]:
+    """批量计算运行天数
+
+    设备数超过投运时间解析缓存大小且安装了 numpy 时，严格格式的时间字符串一次性解析为
+    datetime64 并向量化求差；其余情况逐个使用 parse_run_time 解析（缓存命中时更快）。
+    解析失败的位置返回对应的异常对象。
+    """
+    results: List[Any] = [None] * len(start_run_times)
+    pending = list(range(len(start_run_times)))
+
+    if np is not None and len(start_run_times) > RUN_TIME_CACHE_SIZE:
+        strict_positions = [i for i, value in enumerate(start_run_times) if _is_strict_run_time(value)]
+        if strict_positions:
+            values = [start_run_times[i] for i in strict_positions]
+            try:
+                parsed = np.array(values, dtype="datetime64[s]")
+                invalid: Set[int] = set()
+            except ValueError:
+                invalid = _find_invalid_datetimes(values)
+                parsed = np.array(
+                    ["1970-01-01 00:00:00" if k in invalid else v for k, v in enumerate(values)],
+                    dtype="datetime64[s]",
+                )
+            days = ((np.datetime64(now, "us") - parsed.astype("datetime64[us]")) // np.timedelta64(1, "D")).tolist()
+
+            strict_set = set(strict_positions)
+            pending = [i for i in pending if i not in strict_set]
+            for k, i in enumerate(strict_positions):
+                if k in invalid:
+                    pending.append(i)
+                else:
+                    results[i] = days[k]
+
+    for i in pending:
+        try:
+            results[i] = (now - parse_run_time(start_run_times[i])).days
+        except Exception as e:
+            results[i] = e
+    return results
+
+
+@traced
+def calculate_device_risks(
+        devices: List[Dict[str, Any]],
+        now: Optional[datetime] = None,
+) -> List[tuple[str, float, str, int]]:
+    """批量计算设备风险等级，结果与逐个调用 calculate_device_risk 一致
+
+    所有设备共用一个参考时间，投运时间一次性批量解析；
+    风险规则与逐个计算相同，按设备依次检查，命中即停止。
+
+    参数:
+        devices: 设备信息列表
+        now: 计算运行年限的参考时间，默认为当前时间
+    """
+    now = now or datetime.now()
+    results: List[tuple[str, float, str, int]] = [UNKNOWN_RISK] * len(devices)
+
+    # 1. 收集有投运时间的设备
+    positions: List[int] = []
+    start_run_times: List[Any] = []
+    for i, device in enumerate(devices):
+        if not isinstance(device, dict):
+            continue
+        start_run_time = _get_start_run_time(device)
+        if start_run_time:
+            positions.append(i)
+            start_run_times.append(start_run_time)
+
+    # 2. 批量解析投运时间
+    valid: List[int] = []
+    run_time_years: Dict[int, float] = {}
+    for i, day_count in zip(positions, _batch_run_time_days(start_run_times, now)):
+        if isinstance(day_count, ValueError):
+            logger.error(f"解析设备运行时间失败: {day_count}")
+        elif isinstance(day_count, Exception):
+            logger.error(f"计算设备风险失败: {day_count}")
+        else:
+            valid.append(i)
+            run_time_years[i] = round(day_count / 365.0, 1)
+
+    # 3. 逐个设备处理缺陷列表，依次检查各条风险规则（命中即停止）
+    for i in valid:
+        device = devices[i]
+        try:
+            processed_defect_list = _process_defect_list(device)
+            device["processed_defect_list"] = processed_defect_list
+            has_risk = (
+                _has_fault_risk(device)
+                or _has_defect_risk(device, processed_defect_list)
+                or _has_hidden_risk(device)
+                or _has_history_risk(device)
+                or bool(device.get("has_family_defect", False))
+            )
+            results[i] = ("是" if has_risk else "否"), run_time_years[i], "否", _calculate_device_score(device)
+        except ValueError as e:
+            logger.error(f"解析设备运行时间失败: {e}")
+        except Exception as e:
+            logger.error(f"计算设备风险失败: {e}")
+
+    return results
+
+
+@traced
 def build_tree_structure(device_info_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """构建设备树形结构"""
     # 创建设备映射
@@ -323,8 +520,237 @@ def get_device_category(device_type_code: str) -> str:
         return "其他"
 
 
-def process_device_info_data(device_data: Dict[str, Any]) -> Dict[str, Any]:
-    """处理设备信息数据并生成大模型输入参数"""
+def build_device_info(
+        device: Dict[str, Any],
+        device_type: str,
+        unique_devices: List[Dict[str, Any]],
+        segment_index: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """将上游设备数据转换为设备基本信息"""
+    return {
+        "device_name": device.get("name", "未知设备"),
+        "psr_id": device.get("psr_id", ""),
+        "device_type": device_type,
+        "device_type_name": PSR_TYPE_TO_DEVICE_TYPE.get(device_type, "其他"),
+        "line_name": device.get("line_and_name", ""),
+        "fault_count": safe_to_int(device.get("fault")),
+        "defect_count": safe_to_int(device.get("defect")),
+        "hidden_count": safe_to_int(device.get("hazard")),
+        "inspection_count": safe_to_int(device.get("patrol")),
+        "run_year": device.get("equipRunYear", ""),
+        "geo_position": device.get("geo_positon", ""),
+        "affiliated_psr_id": get_affiliated_psr_id(unique_devices, device, device_type, segment_index),
+        "affiliated_psr_type": DEVICE_AFFILIATED_MAP.get(device_type),
+        # 负面清单列表
+        "fault_list": device.get("faultList", []),
+        "defect_list": device.get("defectList", []),
+        "hidden_list": device.get("hazardList", []),
+        "inspection_list": device.get("patrolList", []),
+        "defect_history_list": device.get("defectHistoryList", []),
+        "inspection_history_list": device.get("patrolHistoryList", []),
+        "fault_history_list": device.get("faultHistoryList", []),
+        "hidden_history_list": device.get("hazardHistoryList", []),
+        # 历史记录数量
+        "fault_history_count": len(device.get("faultHistoryList", [])),
+        "defect_history_count": len(device.get("defectHistoryList", [])),
+        "hidden_history_count": len(device.get("hazardHistoryList", [])),
+        "inspection_history_count": len(device.get("patrolHistoryList", [])),
+        "rated_current_data": device.get("ratedState", ""),
+        # 家族缺陷相关字段
+        "has_family_defect": any([
+            device.get("hasFamilyHazard", False),
+            device.get("hasFamilyDefect", False),
+            device.get("hasFamilyFault", False)
+        ]),
+        "family_hazard_count": safe_to_int(device.get("familyHazardCount")),
+        "family_fault_count": safe_to_int(device.get("familyFaultCount")),
+        "family_defect_count": safe_to_int(device.get("familyDefectCount")),
+        # 其他字段
+        "line_type": device.get("lineType", ""),
+        "wire_type": device.get("wireType", ""),
+        "span": device.get("span", 0.0),
+        # 设备投运时间（风险计算按设备类型读取 start_time 或 operate_date）
+        "start_time": device.get("start_time", ""),
+        "operate_date": device.get("operate_date", ""),
+        "run_time": device.get("start_time", "") if device_type not in ["0103002", "0103001", "0306"] else device.get("operate_date", "")
+    }
+
+
+# 风险描述最多保留的条数
+MAX_RISK_DESCRIPTIONS = 10
+
+def build_risk_description(device: Dict[str, Any]) -> str:
+    """构建单个风险设备的风险描述"""
+    risk_desc = []
+    if device.get("run_time"):
+        risk_desc.append(f"该设备于{device['run_time']}投运。")
+
+    # 近90天数据
+    recent_data = []
+    if device.get("fault_count") > 0:
+        recent_data.append("存在故障未处理")
+    if device.get("defect_count") > 0:
+        recent_data.append("存在缺陷未进行消缺")
+    if device.get("hidden_count") > 0:
+        recent_data.append("存在隐患还未完成治理并验收")
+
+    if recent_data:
+        risk_desc.append(f"近90天内最近一次的数据显示, 该设备{','.join(recent_data)}。")
+
+    # 历史数据
+    history_data = []
+    if device.get("fault_history_count") > 0:
+        history_data.append("存在故障的历史记录")
+    if device.get("defect_history_count") > 0:
+        history_data.append("存在缺陷的历史记录")
+    if device.get("hidden_history_count") > 0:
+        history_data.append("存在隐患的历史记录")
+
+    if history_data:
+        risk_desc.append(f"根据历史同期的数据显示, 该设备{','.join(history_data)}。")
+
+    if device.get("has_family_defect"):
+        risk_desc.append("存在家族性缺陷")
+
+    return "".join(risk_desc)
+
+
+class DeviceStatsAccumulator:
+    """设备统计累加器
+
+    逐个接收已计算风险的设备信息，一次遍历同时累计设备类别统计、风险设备、
+    最大档距、线路/导线类型、重过载状态和风险描述，最后组装大模型输入参数。
+
+    columnar 为 True 时跳过类别统计和档距的逐设备累计，
+    改由 apply_table 从列式设备表一次性向量化计算。
+    """
+
+    def __init__(self, columnar: bool = False) -> None:
+        self.columnar = columnar
+        # 设备类别 -> 统计，按类别首次出现的顺序输出
+        self.category_stats: Dict[str, Dict[str, Any]] = {}
+        self.risk_devices: Set[str] = set()
+        self.line_type = "无数据来源"
+        self.wire_type = "无数据来源"
+        self.line_name = ""
+        self.max_span = 0.0
+        self.rated_date = ""
+        self.device_risk_desc: List[Dict[str, str]] = []
+        self._unique_descriptions: Set[str] = set()
+
+    def add(self, device: Dict[str, Any]) -> None:
+        """累计单个设备"""
+        is_risk = device.get("risk_level") == "是"
+        if is_risk:
+            self.risk_devices.add(device["psr_id"])
+
+        if not self.columnar:
+            # 设备类别统计
+            category = get_device_category(device.get("device_type", ""))
+            type_stat = self.category_stats.get(category)
+            if type_stat is None:
+                type_stat = {"总数": 0, "风险数": 0}
+                self.category_stats[category] = type_stat
+            type_stat["总数"] += 1
+            if is_risk:
+                type_stat["风险数"] += 1
+
+            # 获取最大档距
+            device_span = device.get("span", 0.0)
+            if device_span > self.max_span:
+                self.max_span = device_span
+
+        # 获取线路名称
+        if not self.line_name and device.get("line_name"):
+            self.line_name = device["line_name"]
+
+        # 获取线路类型和导线类型
+        if (self.line_type == "无数据来源" or self.wire_type == "无数据来源") and \
+                device.get("line_type") and device.get("wire_type"):
+            self.line_type = device["line_type"]
+            self.wire_type = device["wire_type"]
+
+        # 重过载状态取第一个有数据的设备
+        if not self.rated_date and device.get("rated_current_data"):
+            self.rated_date = device["rated_current_data"]
+
+        # 设备风险描述（去重，限制数量）
+        if is_risk and len(self.device_risk_desc) < MAX_RISK_DESCRIPTIONS:
+            desc_str = build_risk_description(device)
+            if desc_str not in self._unique_descriptions:
+                self._unique_descriptions.add(desc_str)
+                self.device_risk_desc.append({
+                    "设备名称": device["device_name"],
+                    "设备类型": device["device_type_name"],
+                    "风险描述": desc_str
+                })
+
+    def apply_table(self, table: DeviceTable) -> None:
+        """使用列式设备表的向量化结果填充类别统计和最大档距"""
+        self.category_stats = table.category_stats()
+        self.max_span = table.max_span()
+
+    def device_type_stats(self) -> List[Dict[str, Any]]:
+        """设备类型统计"""
+        return [
+            {
+                "设备类型": category,
+                "总数": stat["总数"],
+                "风险数": stat["风险数"],
+                "风险比例": stat["风险数"] / stat["总数"] if stat["总数"] > 0 else 0,
+            }
+            for category, stat in self.category_stats.items()
+        ]
+
+    def line_wire_description(self) -> str:
+        """构建线路导线描述"""
+        tower_des = ""
+        if self.max_span > 100:
+            tower_des = f",且线路上杆塔存在档距过大(最大档距为 {self.max_span} 米)"
+
+        if self.wire_type == "其他":
+            return f"{self.line_name}为{self.line_type}线路{tower_des}."
+        return f"{self.line_name}为{self.line_type}线路, 导线类型为{self.wire_type}{tower_des}."
+
+    def build_model_input(self, outage_number: str) -> Dict[str, Any]:
+        """组装大模型输入参数"""
+        line_wire_des = self.line_wire_description()
+        rated_date = self.rated_date
+
+        # 风险设备数描述
+        risk_devices_desc = f"根据设备近期及历史同期的隐患、缺陷、故障、巡视记录、设备家族性缺陷推断该线路上目前有{len(self.risk_devices)}个设备存在风险；"
+
+        # 构建判定依据
+        judge_basis = {
+            "线路导线类型": line_wire_des,
+            "风险设备数描述": risk_devices_desc,
+            "重过载": f"该线路在停电事件发生前处于{rated_date}运行状态" if "过载" in rated_date or "重载" in rated_date else ""
+        }
+
+        return {
+            "设备类型统计": self.device_type_stats(),
+            "线路导线类型": line_wire_des,
+            "风险设备数描述": risk_devices_desc,
+            "重过载": judge_basis["重过载"],
+            "设备风险描述": list(self.device_risk_desc),
+            "判定依据": judge_basis,
+            "存在风险的设备数": len(self.risk_devices),
+            "outage_number": outage_number,
+        }
+
+
+@traced
+def process_device_info_data(
+        device_data: Dict[str, Any],
+        reference_time: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """处理设备信息数据并生成大模型输入参数
+
+    参数:
+        device_data: 设备信息数据
+        reference_time: 计算设备运行年限（run_time_years）的参考时间，默认为当前时间；
+            投运时间缺失或无法解析的设备记为未知风险
+    """
     if not isinstance(device_data, dict):
         raise ValueError("device_data 必须是字典。")
 
@@ -368,6 +794,7 @@ def process_device_info_data(device_data: Dict[str, Any]) -> Dict[str, Any]:
         }
 
     # 2. 构建设备基本信息
+    segment_index = build_cable_segment_index(unique_devices)
     device_info_list = []
     for device in unique_devices:
         device_type = normalize_psr_type(device.get("psrType"))
@@ -376,273 +803,30 @@ def process_device_info_data(device_data: Dict[str, Any]) -> Dict[str, Any]:
         if device_type == "xndl":
             continue
 
-        device_info = {
-            "device_name": device.get("name", "未知设备"),
-            "psr_id": device.get("psr_id", ""),
-            "device_type": device_type,
-            "device_type_name": PSR_TYPE_TO_DEVICE_TYPE.get(device_type, "其他"),
-            "line_name": device.get("line_and_name", ""),
-            "fault_count": safe_to_int(device.get("fault")),
-            "defect_count": safe_to_int(device.get("defect")),
-            "hidden_count": safe_to_int(device.get("hazard")),
-            "inspection_count": safe_to_int(device.get("patrol")),
-            "run_year": device.get("equipRunYear", ""),
-            "geo_position": device.get("geo_positon", ""),
-            "affiliated_psr_id": get_affiliated_psr_id(unique_devices, device, device_type),
-            "affiliated_psr_type": DEVICE_AFFILIATED_MAP.get(device_type),
-            # 负面清单列表
-            "fault_list": device.get("faultList", []),
-            "defect_list": device.get("defectList", []),
-            "hidden_list": device.get("hazardList", []),
-            "inspection_list": device.get("patrolList", []),
-            "defect_history_list": device.get("defectHistoryList", []),
-            "inspection_history_list": device.get("patrolHistoryList", []),
-            "fault_history_list": device.get("faultHistoryList", []),
-            "hidden_history_list": device.get("hazardHistoryList", []),
-            # 历史记录数量
-            "fault_history_count": len(device.get("faultHistoryList", [])),
-            "defect_history_count": len(device.get("defectHistoryList", [])),
-            "hidden_history_count": len(device.get("hazardHistoryList", [])),
-            "inspection_history_count": len(device.get("patrolHistoryList", [])),
-            "rated_current_data": device.get("ratedState", ""),
-            # 家族缺陷相关字段
-            "has_family_defect": any([
-                device.get("hasFamilyHazard", False),
-                device.get("hasFamilyDefect", False),
-                device.get("hasFamilyFault", False)
-            ]),
-            "family_hazard_count": safe_to_int(device.get("familyHazardCount")),
-            "family_fault_count": safe_to_int(device.get("familyFaultCount")),
-            "family_defect_count": safe_to_int(device.get("familyDefectCount")),
-            # 其他字段
-            "line_type": device.get("lineType", ""),
-            "wire_type": device.get("wireType", ""),
-            "span": device.get("span", 0.0),
-            # 设备投运时间
-            "run_time": device.get("start_time", "") if device_type not in ["0103002", "0103001", "0306"] else device.get("operate_date", "")
-        }
-        device_info_list.append(device_info)
+        device_info_list.append(build_device_info(device, device_type, unique_devices, segment_index))
 
-    # 3. 计算设备风险
-    risk_devices = set()
-    for device in device_info_list:
-        risk_level, run_time_years, long_years, device_score = calculate_device_risk(device)
+    # 开启 device_columnar_enabled、设备数量较大且安装了 numpy 时，类别统计和档距改用列式向量化计算
+    columnar = (
+        config.device_columnar_enabled
+        and len(device_info_list) >= config.device_columnar_threshold
+        and is_columnar_available()
+    )
+
+    # 3. 批量计算设备风险，并单次遍历累计输出所需的全部统计
+    stats = DeviceStatsAccumulator(columnar=columnar)
+    for device, risk in zip(device_info_list, calculate_device_risks(device_info_list, reference_time)):
+        risk_level, run_time_years, long_years, device_score = risk
         device["risk_level"] = risk_level
         device["run_time_years"] = run_time_years
         device["long_years"] = long_years
         device["device_score"] = device_score
-        if risk_level == "是":
-            risk_devices.add(device["psr_id"])
+        stats.add(device)
 
-    # 4. 构建树形结构
-    tree_structure = build_tree_structure(device_info_list)
-
-    # 5. 统计设备类型
-    device_type_stats = defaultdict(lambda: {"total": 0, "risk": 0})
-    for device in device_info_list:
-        type_name = device["device_type_name"]
-        device_type_stats[type_name]["total"] += 1
-        if device["psr_id"] in risk_devices:
-            device_type_stats[type_name]["risk"] += 1
-
-    # 转换为列表格式
-    type_stats_list = []
-    for type_name, stats in device_type_stats.items():
-        type_stats_list.append({
-            "device_type": type_name,
-            "total_count": stats["total"],
-            "risk_count": stats["risk"],
-            "risk_ratio": stats["risk"] / stats["total"] if stats["total"] > 0 else 0,
-        })
-
-    # 6. 获取设备类型分布
-    device_type_distribution = defaultdict(int)
-    for device in device_info_list:
-        device_type_distribution[device["device_type_name"]] += 1
-
-    # 按设备类别分组
-    devices_by_category = defaultdict(list)
-    for device in device_info_list:
-        category = get_device_category(device.get("device_type", ""))
-        devices_by_category[category].append(device)
-
-    # 设备类型统计数组
-    device_type_stats_array = []
-    unique_contents = set()
-
-    for category, devices in devices_by_category.items():
-        type_stat = {
-            "设备类型": category,
-            "总数": len(devices),
-            "风险数": 0,
-            "近90天内故障数量": 0,
-            "近90天内缺陷数量": 0,
-            "近90天内隐患数量": 0,
-            "历史故障数量": 0,
-            "历史缺陷数量": 0,
-            "历史隐患数量": 0,
-            "家族性缺陷数量": 0,
-            "家族性隐患数量": 0,
-            "家族性故障数量": 0,
-        }
-
-        # 统计各类数量
-        for device in devices:
-            # 风险数量
-            if device.get("risk_level") == "是":
-                type_stat["风险数"] += 1
-
-            # 近90天统计
-            type_stat["近90天内故障数量"] += device.get("fault_count", 0)
-            type_stat["近90天内缺陷数量"] += device.get("defect_count", 0)
-            type_stat["近90天内隐患数量"] += device.get("hidden_count", 0)
-
-            # 历史统计
-            type_stat["历史故障数量"] += device.get("fault_history_count", 0)
-            type_stat["历史缺陷数量"] += device.get("defect_history_count", 0)
-            type_stat["历史隐患数量"] += device.get("hidden_history_count", 0)
-
-            # 家族性统计
-            type_stat["家族性缺陷数量"] += device.get("family_defect_count", 0)
-            type_stat["家族性隐患数量"] += device.get("family_hazard_count", 0)
-            type_stat["家族性故障数量"] += device.get("family_fault_count", 0)
-
-        # 计算风险比例
-        type_stat["风险比例"] = type_stat["风险数"] / type_stat["总数"] if type_stat["总数"] > 0 else 0
-
-        # 故障、缺陷、隐患总结
-        type_stat["故障总结"] = "该类型设备可能存在故障"
-        type_stat["缺陷总结"] = "该类型设备可能存在缺陷"
-        type_stat["隐患总结"] = "该类型设备可能存在隐患"
-
-        device_type_stats_array.append(type_stat)
-
-    # 设备类型统计
-    device_type_stats_new = []
-    for stat in device_type_stats_array:
-        device_type_stats_new.append({
-            "设备类型": stat["设备类型"],
-            "总数": stat["总数"],
-            "风险数": stat["风险数"],
-            "风险比例": stat["风险比例"],
-        })
-
-    # 线路导线类型统计
-    line_type = "无数据来源"
-    wire_type = "无数据来源"
-    line_name = ""
-    max_span = 0.0
-    tower_des = ""
-
-    # 一次性遍历获取所有需要的信息
-    for device in device_info_list:
-        # 获取最大档距
-        device_span = device.get("span", 0.0)
-        if device_span > max_span:
-            max_span = device_span
-
-        # 获取线路名称
-        if not line_name and device.get("line_name"):
-            line_name = device["line_name"]
-
-        # 获取线路类型和导线类型
-        if (line_type == "无数据来源" or wire_type == "无数据来源") and \
-                device.get("line_type") and device.get("wire_type"):
-            line_type = device["line_type"]
-            wire_type = device["wire_type"]
-
-    if max_span > 100:
-        tower_des = f",且线路上杆塔存在档距过大(最大档距为 {max_span} 米)"
-
-    # 构建线路导线描述
-    line_wire_des = ""
-    if wire_type == "其他":
-        line_wire_des = f"{line_name}为{line_type}线路{tower_des}."
-    else:
-        line_wire_des = f"{line_name}为{line_type}线路, 导线类型为{wire_type}{tower_des}."
-
-    # 重过载统计
-    rated_date = ""
-    for device in device_info_list:
-        if device.get("rated_current_data"):
-            rated_date = device["rated_current_data"]
-            break
-
-    overloaded = rated_date in {"重载", "过载"}
-
-    # 风险设备数描述
-    risk_devices_desc = f"根据设备近期及历史同期的隐患、缺陷、故障、巡视记录、设备家族性缺陷推断该线路上目前有{len(risk_devices)}个设备存在风险；"
-
-    # 设备风险描述
-    device_risk_desc = []
-    unique_descriptions = set()
-
-    for device in device_info_list:
-        if device.get("risk_level") != "是":
-            continue
-
-        # 构建设备风险描述
-        risk_desc = []
-        if device.get("run_time"):
-            risk_desc.append(f"该设备于{device['run_time']}投运。")
-
-        # 近90天数据
-        recent_data = []
-        if device.get("fault_count") > 0:
-            recent_data.append("存在故障未处理")
-        if device.get("defect_count") > 0:
-            recent_data.append("存在缺陷未进行消缺")
-        if device.get("hidden_count") > 0:
-            recent_data.append("存在隐患还未完成治理并验收")
-
-        if recent_data:
-            risk_desc.append(f"近90天内最近一次的数据显示, 该设备{','.join(recent_data)}。")
-
-        # 历史数据
-        history_data = []
-        if device.get("fault_history_count") > 0:
-            history_data.append("存在故障的历史记录")
-        if device.get("defect_history_count") > 0:
-            history_data.append("存在缺陷的历史记录")
-        if device.get("hidden_history_count") > 0:
-            history_data.append("存在隐患的历史记录")
-
-        if history_data:
-            risk_desc.append(f"根据历史同期的数据显示, 该设备{','.join(history_data)}。")
-
-        if device.get("has_family_defect"):
-            risk_desc.append("存在家族性缺陷")
-
-        desc_str = "".join(risk_desc)
-        if desc_str not in unique_descriptions:
-            unique_descriptions.add(desc_str)
-            device_risk_desc.append({
-                "设备名称": device["device_name"],
-                "设备类型": device["device_type_name"],
-                "风险描述": desc_str
-            })
-
-    # 限制风险描述数量
-    device_risk_desc = device_risk_desc[:10]
-
-    # 构建判定依据
-    judge_basis = {
-        "线路导线类型": line_wire_des,
-        "风险设备数描述": risk_devices_desc,
-        "重过载": f"该线路在停电事件发生前处于{rated_date}运行状态" if "过载" in rated_date or "重载" in rated_date else ""
-    }
+    if columnar:
+        stats.apply_table(DeviceTable.from_device_info_list(device_info_list, get_device_category))
 
     # 组装大模型输入参数
-    model_input_params: Dict[str, Any] = {
-        "设备类型统计": device_type_stats_new,
-        "线路导线类型": line_wire_des,
-        "风险设备数描述": risk_devices_desc,
-        "重过载": judge_basis["重过载"],
-        "设备风险描述": device_risk_desc,
-        "判定依据": judge_basis,
-        "存在风险的设备数": len(risk_devices),
-        "outage_number": device_data.get("outageNumber", ""),
-    }
+    model_input_params = stats.build_model_input(device_data.get("outageNumber", ""))
 
     return {
         "code": 10000,
@@ -653,13 +837,19 @@ def process_device_info_data(device_data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 __all__ = [
+    "build_cable_segment_index",
     "get_affiliated_psr_id",
     "safe_to_int",
+    "parse_run_time",
     "calculate_device_risk",
+    "calculate_device_risks",
     "build_tree_structure",
     "process_device_list",
     "normalize_psr_type",
     "get_device_category",
+    "build_device_info",
+    "build_risk_description",
+    "DeviceStatsAccumulator",
     "process_device_info_data",
 ]
 
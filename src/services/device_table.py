@@ -0,0 +1,122 @@
+"""列式设备表 - 基于 NumPy 的设备统计向量化计算（numpy 为可选依赖）"""
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 未安装 numpy 时退回逐设备累计
+    np = None
+
+
+def is_columnar_available() -> bool:
+    """是否安装了 numpy"""
+    return np is not None
+
+
+class DeviceTable:
+    """列式设备表
+
+    数值字段保存为数组，device_type 和设备类别保存为分类编码（编码顺序即首次出现顺序），
+    按类别汇总、风险比例和最大档距均通过向量运算得到。
+    """
+
+    def __init__(
+            self,
+            device_types: List[str],
+            device_type_codes: Any,
+            categories: List[str],
+            category_codes: Any,
+            risk: Any,
+            span_values: List[Any],
+            spans: Optional[Any],
+    ):
+        self.device_types = device_types
+        self.device_type_codes = device_type_codes
+        self.categories = categories
+        self.category_codes = category_codes
+        self.risk = risk
+        self._span_values = span_values
+        self.spans = spans
+
+    def __len__(self) -> int:
+        return len(self.device_type_codes)
+
+    @classmethod
+    def from_device_info_list(
+            cls,
+            devices: List[Dict[str, Any]],
+            category_of: Callable[[str], str],
+    ) -> "DeviceTable":
+        """由已计算风险的设备信息列表构建列式表
+
+        参数:
+            devices: 设备信息列表（需已包含 risk_level）
+            category_of: 设备类型代码 -> 设备类别 的映射函数
+        """
+        if np is None:
+            raise RuntimeError("未安装 numpy，无法使用列式设备表。")
+
+        n = len(devices)
+        type_index: Dict[str, int] = {}
+        device_type_codes = np.fromiter(
+            (type_index.setdefault(d.get("device_type", ""), len(type_index)) for d in devices),
+            dtype=np.int32,
+            count=n,
+        )
+        device_types = list(type_index)
+
+        # 类别只需对去重后的设备类型计算一次；按类型首次出现顺序编码即为类别首次出现顺序
+        category_index: Dict[str, int] = {}
+        type_to_category = np.array(
+            [category_index.setdefault(category_of(t), len(category_index)) for t in device_types],
+            dtype=np.int32,
+        )
+        category_codes = type_to_category[device_type_codes] if n else np.zeros(0, dtype=np.int32)
+
+        risk = np.fromiter((d.get("risk_level") == "是" for d in devices), dtype=bool, count=n)
+
+        # 档距只有全部为有效数值时才向量化，否则按原值逐个比较以保持结果一致
+        span_values = [d.get("span", 0.0) for d in devices]
+        spans = None
+        if all(type(v) in (int, float) and not (type(v) is float and math.isnan(v)) for v in span_values):
+            spans = np.array(span_values, dtype=np.float64)
+
+        return cls(device_types, device_type_codes, list(category_index), category_codes,
+                   risk, span_values, spans)
+
+    def category_stats(self) -> Dict[str, Dict[str, Any]]:
+        """按设备类别汇总总数和风险数"""
+        size = len(self.categories)
+        totals = np.bincount(self.category_codes, minlength=size)
+        risks = np.bincount(self.category_codes[self.risk], minlength=size)
+        return {
+            category: {"总数": int(totals[code]), "风险数": int(risks[code])}
+            for code, category in enumerate(self.categories)
+        }
+
+    def risk_ratios(self) -> Dict[str, float]:
+        """各设备类别的风险比例"""
+        return {
+            category: stat["风险数"] / stat["总数"] if stat["总数"] > 0 else 0
+            for category, stat in self.category_stats().items()
+        }
+
+    def max_span(self) -> Any:
+        """最大档距，返回原始值；没有大于 0 的档距时返回 0.0"""
+        if self.spans is None:
+            max_span = 0.0
+            for value in self._span_values:
+                if value > max_span:
+                    max_span = value
+            return max_span
+
+        if not len(self.spans):
+            return 0.0
+        index = int(np.argmax(self.spans))
+        return self._span_values[index] if self.spans[index] > 0.0 else 0.0
+
+
+__all__ = [
+    "DeviceTable",
+    "is_columnar_available",
+]
@@ -1,10 +1,15 @@
 """环境数据处理服务"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
-from typing import Any, Dict, Set
+from typing import Any, Awaitable, Dict, List, Optional, Set, Tuple
 
-import requests
-
-from ..utils import config, logger
+from ..utils import bind_context, config, logger, span, traced, track_upstream
+from .cassette import record_exchange
+from .http_client import get_async_http_client, get_http_session
+from .landform_cache import LandformCache, get_landform_cache
+from .outage_data import async_get_outage_data
 
 
 def is_in_harvest_season(target_date: date) -> bool:
@@ -69,37 +74,379 @@ def get_work_address_info(item: dict) -> str:
     return ",".join(construction_builder)
 
 
+# 地貌单点查询接口路径
+LANDFORM_PATH = "/getDimao"
+
+
+def _landform_params(geo_position: str) -> Optional[Dict[str, str]]:
+    """解析经纬度为地貌查询参数，格式错误时返回 None"""
+    split_pos = geo_position.split(",")
+    if len(split_pos) < 2:
+        return None
+    return {"lon": split_pos[0].strip(), "lat": split_pos[1].strip()}
+
+
+def _build_landform_url(geo_position: str) -> Optional[str]:
+    """根据经纬度构建地貌查询地址，格式错误时返回 None"""
+    params = _landform_params(geo_position)
+    if params is None:
+        return None
+    return f"{config.landform_url}{LANDFORM_PATH}?lon={params['lon']}&lat={params['lat']}"
+
+
+def _parse_landform_response(data: Dict[str, Any]) -> str:
+    """解析地貌接口返回数据"""
+    result_data = data.get("data", {}).get("stats", {}).get("classes")
+    if not result_data:
+        return "查询结果为空"
+
+    if isinstance(result_data, dict):
+        # 过滤掉None或空字符串的键
+        valid_keys = [str(key) for key in result_data.keys() if key]
+        if valid_keys:
+            return ",".join(valid_keys)
+        else:
+            return "无有效水域类型"
+    else:
+        return "数据格式错误"
+
+
 def get_landform(geo_position: str) -> str:
     """根据经纬度获取地貌信息"""
     try:
-        # 分割经纬度
-        split_pos = geo_position.split(",")
-        if len(split_pos) < 2:
+        url = _build_landform_url(geo_position)
+        if url is None:
             return "经纬度格式错误"
 
-        lon, lat = split_pos[0].strip(), split_pos[1].strip()
-        url = f"{config.landform_url}/getDimao?lon={lon}&lat={lat}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        result_data = data.get("data", {}).get("stats", {}).get("classes")
-        if not result_data:
-            return "查询结果为空"
-
-        if isinstance(result_data, dict):
-            # 过滤掉None或空字符串的键
-            valid_keys = [str(key) for key in result_data.keys() if key]
-            if valid_keys:
-                return ",".join(valid_keys)
-            else:
-                return "无有效水域类型"
-        else:
-            return "数据格式错误"
+        cache = get_landform_cache()
+        if cache is not None:
+            cached = cache.get(geo_position)
+            if cached is not None:
+                return cached
+
+        with track_upstream("landform", LANDFORM_PATH) as call:
+            response = get_http_session().get(url, timeout=10)
+            call.status, call.size = response.status_code, len(response.content)
+            response.raise_for_status()
+        record_exchange("GET", LANDFORM_PATH, _landform_params(geo_position), response.content)
+        landform = _parse_landform_response(response.json())
+        if cache is not None:
+            cache.set(geo_position, landform)
+        return landform
+    except Exception as e:
+        logger.error(f"调用地貌接口失败: {e}")
+        return "未知"
+
+
+async def async_get_landform(geo_position: str) -> str:
+    """根据经纬度异步获取地貌信息"""
+    try:
+        url = _build_landform_url(geo_position)
+        if url is None:
+            return "经纬度格式错误"
+
+        cache = get_landform_cache()
+        if cache is not None:
+            cached = await cache.async_get(geo_position)
+            if cached is not None:
+                return cached
+
+        with track_upstream("landform", LANDFORM_PATH) as call:
+            response = await get_async_http_client().get(url, timeout=10)
+            call.status, call.size = response.status_code, len(response.content)
+            response.raise_for_status()
+        record_exchange("GET", LANDFORM_PATH, _landform_params(geo_position), response.content)
+        landform = _parse_landform_response(response.json())
+        if cache is not None:
+            await cache.async_set(geo_position, landform)
+        return landform
     except Exception as e:
         logger.error(f"调用地貌接口失败: {e}")
         return "未知"
 
 
+def _dedupe_positions(geo_positions: List[str]) -> List[str]:
+    """去除空坐标并按原顺序去重"""
+    unique: List[str] = []
+    seen: Set[str] = set()
+    for position in geo_positions:
+        if not isinstance(position, str):
+            continue
+        position = position.strip()
+        if position and position not in seen:
+            seen.add(position)
+            unique.append(position)
+    return unique
+
+
+def _group_by_grid(positions: List[str], cache: Optional[LandformCache]) -> Dict[str, List[str]]:
+    """按地貌缓存的网格键分组，返回 代表坐标 -> 同一网格内的全部坐标
+
+    同一网格内的坐标只查询代表坐标一次；未启用缓存或坐标格式错误时每个坐标单独成组。
+    """
+    groups: Dict[str, List[str]] = {}
+    representatives: Dict[str, str] = {}
+    for position in positions:
+        key = cache.key_for(position) if cache is not None else None
+        if key is None:
+            groups[position] = [position]
+        elif key in representatives:
+            groups[representatives[key]].append(position)
+        else:
+            representatives[key] = position
+            groups[position] = [position]
+    return groups
+
+
+def _expand_groups(groups: Dict[str, List[str]], results: Dict[str, str]) -> Dict[str, str]:
+    """将代表坐标的地貌复制给同一网格内的全部坐标"""
+    return {
+        position: results[representative]
+        for representative, positions in groups.items() if representative in results
+        for position in positions
+    }
+
+
+def _split_cached_positions(positions: List[str], cached: Dict[str, str]) -> Tuple[Dict[str, str], List[str]]:
+    """拆分出无需请求的坐标（缓存命中或格式错误）与待查询的坐标"""
+    results: Dict[str, str] = {}
+    pending: List[str] = []
+    for position in positions:
+        if _build_landform_url(position) is None:
+            results[position] = "经纬度格式错误"
+        elif position in cached:
+            results[position] = cached[position]
+        else:
+            pending.append(position)
+    return results, pending
+
+
+def _chunk_positions(positions: List[str]) -> List[List[str]]:
+    size = max(1, config.landform_batch_size)
+    return [positions[i:i + size] for i in range(0, len(positions), size)]
+
+
+def _build_landform_batch_url() -> str:
+    return f"{config.landform_url.rstrip('/')}/{config.landform_batch_path.lstrip('/')}"
+
+
+def _parse_landform_batch_response(chunk: List[str], data: Dict[str, Any]) -> Dict[str, str]:
+    """解析地貌批量接口返回数据
+
+    批量接口请求体为 {"positions": ["lon,lat", ...]}，
+    返回的 data 为与请求顺序一致的列表，每一项结构同单点接口的 data。
+    """
+    items = data.get("data")
+    if not isinstance(items, list) or len(items) != len(chunk):
+        raise ValueError("地貌批量接口返回数量与请求数量不一致")
+
+    return {
+        position: _parse_landform_response({"data": item if isinstance(item, dict) else {}})
+        for position, item in zip(chunk, items)
+    }
+
+
+def _fetch_landform_chunk(chunk: List[str]) -> Dict[str, str]:
+    """通过批量接口查询一组坐标"""
+    try:
+        with track_upstream("landform", config.landform_batch_path) as call:
+            response = get_http_session().post(_build_landform_batch_url(), json={"positions": chunk}, timeout=10)
+            call.status, call.size = response.status_code, len(response.content)
+            response.raise_for_status()
+        record_exchange("POST", config.landform_batch_path, {"positions": chunk}, response.content)
+        results = _parse_landform_batch_response(chunk, response.json())
+        cache = get_landform_cache()
+        if cache is not None:
+            cache.set_many(results)
+        return results
+    except Exception as e:
+        logger.error(f"调用地貌批量接口失败: {e}")
+        return {position: "未知" for position in chunk}
+
+
+async def _async_fetch_landform_chunk(chunk: List[str]) -> Dict[str, str]:
+    """通过批量接口异步查询一组坐标"""
+    try:
+        with track_upstream("landform", config.landform_batch_path) as call:
+            response = await get_async_http_client().post(
+                _build_landform_batch_url(), json={"positions": chunk}, timeout=10
+            )
+            call.status, call.size = response.status_code, len(response.content)
+            response.raise_for_status()
+        record_exchange("POST", config.landform_batch_path, {"positions": chunk}, response.content)
+        results = _parse_landform_batch_response(chunk, response.json())
+        cache = get_landform_cache()
+        if cache is not None:
+            await cache.async_set_many(results)
+        return results
+    except Exception as e:
+        logger.error(f"调用地貌批量接口失败: {e}")
+        return {position: "未知" for position in chunk}
+
+
+def _log_landform_batch(total: int, unique: int, grids: int, requested: int, round_trips: int, start: float) -> None:
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(
+        f"地貌批量查询完成: 坐标 {total} 个, 去重后 {unique} 个, 网格 {grids} 个, 需查询 {requested} 个, "
+        f"请求 {round_trips} 次, 耗时 {elapsed_ms:.1f}ms"
+    )
+
+
+@traced
+def get_landforms(geo_positions: List[str], concurrency: Optional[int] = None) -> Dict[str, str]:
+    """批量获取地貌信息，返回 坐标 -> 地貌 的映射
+
+    坐标去重后按缓存网格分组，每个网格只查询一个代表坐标并跳过缓存命中项；
+    配置了 landform_batch_path 时按 landform_batch_size
+    分组调用批量接口，否则以有限并发逐个调用单点接口。
+
+    参数:
+        geo_positions: 经纬度列表，格式为 "lon,lat"
+        concurrency: 最大并发数，默认取 config.landform_concurrency
+    """
+    start = time.perf_counter()
+    unique = _dedupe_positions(geo_positions)
+    cache = get_landform_cache()
+    groups = _group_by_grid(unique, cache)
+    representatives = list(groups)
+    results, pending = _split_cached_positions(representatives, cache.get_many(representatives) if cache is not None else {})
+    if not pending:
+        _log_landform_batch(len(geo_positions), len(unique), len(groups), 0, 0, start)
+        return _expand_groups(groups, results)
+
+    limit = max(1, concurrency or config.landform_concurrency)
+    if config.landform_batch_path:
+        chunks = _chunk_positions(pending)
+        with ThreadPoolExecutor(max_workers=min(limit, len(chunks))) as executor:
+            for chunk_result in executor.map(bind_context(_fetch_landform_chunk), chunks):
+                results.update(chunk_result)
+        round_trips = len(chunks)
+    else:
+        with ThreadPoolExecutor(max_workers=min(limit, len(pending))) as executor:
+            results.update(zip(pending, executor.map(bind_context(get_landform), pending)))
+        round_trips = len(pending)
+
+    _log_landform_batch(len(geo_positions), len(unique), len(groups), len(pending), round_trips, start)
+    return _expand_groups(groups, results)
+
+
+@traced
+async def async_get_landforms(geo_positions: List[str], concurrency: Optional[int] = None) -> Dict[str, str]:
+    """批量异步获取地貌信息，返回 坐标 -> 地貌 的映射，策略同 get_landforms"""
+    start = time.perf_counter()
+    unique = _dedupe_positions(geo_positions)
+    cache = get_landform_cache()
+    groups = _group_by_grid(unique, cache)
+    representatives = list(groups)
+    results, pending = _split_cached_positions(representatives, await cache.async_get_many(representatives) if cache is not None else {})
+    if not pending:
+        _log_landform_batch(len(geo_positions), len(unique), len(groups), 0, 0, start)
+        return _expand_groups(groups, results)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency or config.landform_concurrency))
+
+    async def _bounded(coro: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await coro
+
+    if config.landform_batch_path:
+        chunks = _chunk_positions(pending)
+        for chunk_result in await asyncio.gather(*(_bounded(_async_fetch_landform_chunk(c)) for c in chunks)):
+            results.update(chunk_result)
+        round_trips = len(chunks)
+    else:
+        landforms = await asyncio.gather(*(_bounded(async_get_landform(p)) for p in pending))
+        results.update(zip(pending, landforms))
+        round_trips = len(pending)
+
+    _log_landform_batch(len(geo_positions), len(unique), len(groups), len(pending), round_trips, start)
+    return _expand_groups(groups, results)
+
+
+def _display_landform(landform: str) -> str:
+    """地貌服务返回的"不透水表面"显示为"建筑/城市道路"，其余原样返回"""
+    return "建筑/城市道路" if landform == "不透水表面" else landform
+
+
+@traced
+async def async_get_environment_raw_data(outage_number: str) -> Dict[str, Any]:
+    """获取原始环境数据：为每条记录补充地貌和市政施工地址
+
+    参数:
+        outage_number: 停电事件编号
+    """
+    # 获取原始数据（与 get_device_info_data 共享同一次拉取，结果只读）
+    raw_data = await async_get_outage_data(outage_number)
+
+    # 初始化infos变量
+    infos = []
+
+    # 如果请求成功且有数据
+    if "data" in raw_data:
+        infos = raw_data.get("data", [])
+
+        # 确保infos是列表类型
+        if isinstance(infos, list):
+            # 复制每条记录再补充字段，先收集需要查询地貌的坐标，再统一并发查询
+            pending: List[tuple[Dict[str, Any], str]] = []
+            with span("get_work_address_info", records=len(infos)):
+                infos = [
+                    {**info, "landform": "未知", "workAddress": get_work_address_info(info)}  # 地貌默认值
+                    if isinstance(info, dict) else info
+                    for info in infos
+                ]
+            for info in infos:
+                if isinstance(info, dict):
+                    # 获取地理位置
+                    geo_position = info.get("geoPosition")
+                    if geo_position and isinstance(geo_position, str) and geo_position.strip():
+                        pending.append((info, geo_position.strip()))
+
+            # 调用地貌接口
+            landforms = await async_get_landforms([position for _, position in pending])
+            for info, position in pending:
+                info["landform"] = _display_landform(landforms.get(position, "未知"))
+
+    # 返回处理后的数据
+    return {
+        "code": 10000,
+        "success": True,
+        "data": infos,
+        "msg": "操作成功",
+    }
+
+
+def enrich_environment_offline(raw_data: Dict[str, Any]) -> Dict[str, Any]:
+    """离线补充地貌和市政施工地址，结果结构同 async_get_environment_raw_data
+
+    用于回放只归档了 /outage-data/test/agent 原始响应的停电事件：市政施工地址由
+    get_work_address_info 根据记录本身计算；地貌只查询地貌缓存（配置 landform_cache_path
+    时包括持久化缓存），未命中记为"未知"，不访问地貌服务。已有的 landform、workAddress 字段保持不变。
+    """
+    infos = raw_data.get("data", [])
+    if not isinstance(infos, list):
+        return raw_data
+
+    cache = get_landform_cache()
+    enriched = []
+    for info in infos:
+        if not isinstance(info, dict):
+            enriched.append(info)
+            continue
+        info = dict(info)
+        if "workAddress" not in info:
+            info["workAddress"] = get_work_address_info(info)
+        if "landform" not in info:
+            geo_position = info.get("geoPosition")
+            landform = None
+            if cache is not None and isinstance(geo_position, str) and geo_position.strip():
+                landform = cache.get(geo_position.strip())
+            info["landform"] = _display_landform(landform) if landform is not None else "未知"
+        enriched.append(info)
+    return {**raw_data, "data": enriched}
+
+
+@traced
 def process_environment_data(environment: Dict[str, Any], outage_date: date) -> Dict[str, Any]:
     """处理环境信息"""
     if not isinstance(environment, dict):
@@ -142,6 +489,11 @@ __all__ = [
     "is_in_spring_and_summer_range",
     "get_work_address_info",
     "get_landform",
+    "async_get_landform",
+    "get_landforms",
+    "async_get_landforms",
+    "async_get_environment_raw_data",
+    "enrich_environment_offline",
     "process_environment_data",
 ]
 
@@ -0,0 +1,76 @@
+"""数据句柄存储模块 - 原始数据保存在服务端，工具之间只传递短句柄
+
+获取数据的工具可以返回句柄代替原始数据，处理工具收到句柄后从存储中取回原始数据，
+避免大模型把整段原始 JSON 作为参数回传。句柄按 TTL 过期，超出容量时按 LRU 淘汰。
+"""
+import secrets
+import threading
+from typing import Any, Dict, Optional
+
+from ..utils import MISSING, TTLCache, config
+
+HANDLE_PREFIX = "handle:"
+
+_handle_store: Optional[TTLCache] = None
+_handle_store_lock = threading.Lock()
+
+
+def _get_store() -> TTLCache:
+    global _handle_store
+    if _handle_store is None:
+        with _handle_store_lock:
+            if _handle_store is None:
+                _handle_store = TTLCache(maxsize=config.handle_store_maxsize, ttl=config.handle_store_ttl)
+    return _handle_store
+
+
+def is_handle(value: Any) -> bool:
+    """是否为数据句柄"""
+    return isinstance(value, str) and value.startswith(HANDLE_PREFIX)
+
+
+def put_handle(data: Any) -> str:
+    """保存原始数据并返回句柄"""
+    handle = f"{HANDLE_PREFIX}{secrets.token_urlsafe(12)}"
+    _get_store().set(handle, data)
+    return handle
+
+
+def resolve_handle(value: Any) -> Any:
+    """句柄换回原始数据，非句柄原样返回
+
+    句柄不存在或已过期时抛出 ValueError。
+    """
+    if not is_handle(value):
+        return value
+    data = _get_store().get(value)
+    if data is MISSING:
+        raise ValueError(f"数据句柄不存在或已过期，请重新获取数据: {value}")
+    return data
+
+
+def to_handle_response(data: Any) -> Any:
+    """将获取到的原始数据替换为句柄响应，业务失败的响应原样返回"""
+    if isinstance(data, dict) and data.get("success") is False:
+        return data
+    return {
+        "code": 10000,
+        "success": True,
+        "data": {"handle": put_handle(data), "expires_in": config.handle_store_ttl},
+        "msg": "原始数据已保存在服务端，请将 handle 传给对应的处理工具",
+    }
+
+
+def get_handle_store_stats() -> Dict[str, Any]:
+    """获取句柄存储统计信息"""
+    return _get_store().stats()
+
+
+__all__ = [
+    "HANDLE_PREFIX",
+    "is_handle",
+    "put_handle",
+    "resolve_handle",
+    "to_handle_response",
+    "get_handle_store_stats",
+]
@@ -0,0 +1,118 @@
+"""健康检查服务 - 探测上游数据服务和地貌服务是否可达，探测结果缓存一段时间
+
+/readyz 被频繁调用时只有缓存过期后的第一次调用会真正发起探测，并发调用等待同一次探测。
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..utils import config
+from .http_client import get_async_http_client
+
+
+class ReadinessProbe:
+    """上游可达性探测
+
+    能收到 5xx 以外的任意响应（包括 404）即视为可达。
+
+    参数:
+        targets: 上游名称 -> 探测地址
+        required: 决定就绪状态的上游，其余只报告状态
+        ttl: 探测结果缓存时长（秒）
+        timeout: 单个上游的探测超时（秒）
+    """
+
+    def __init__(self, targets: Dict[str, str], required: List[str], ttl: float, timeout: float):
+        self.targets = targets
+        self.required = [name for name in required if name in targets]
+        self.ttl = ttl
+        self.timeout = timeout
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.probes = 0
+
+    def _cached(self) -> Optional[Dict[str, Any]]:
+        if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+            return {**self._result, "cached": True}
+        return None
+
+    async def _probe(self, url: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            response = await get_async_http_client().get(url, timeout=self.timeout)
+        except httpx.HTTPError as e:
+            return {
+                "ok": False,
+                "error": f"{type(e).__name__}: {e}" if str(e) else type(e).__name__,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            }
+        return {
+            "ok": response.status_code < 500,
+            "status": response.status_code,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    async def check(self) -> Dict[str, Any]:
+        """返回就绪状态和各上游的探测结果，缓存未过期时直接返回缓存"""
+        cached = self._cached()
+        if cached is not None:
+            return cached
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            cached = self._cached()
+            if cached is not None:
+                return cached
+            names = list(self.targets)
+            results = await asyncio.gather(*(self._probe(self.targets[name]) for name in names))
+            checks = dict(zip(names, results))
+            self._result = {
+                "ready": all(checks[name]["ok"] for name in self.required),
+                "checks": checks,
+                "checked_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._checked_at = time.monotonic()
+            self.probes += 1
+            return {**self._result, "cached": False}
+
+    def stats(self) -> Dict[str, Any]:
+        ready = self._result["ready"] if self._result is not None else False
+        return {"probes": self.probes, "ready": ready}
+
+
+_probe: Optional[ReadinessProbe] = None
+
+
+def get_readiness_probe() -> ReadinessProbe:
+    """获取全局上游可达性探测"""
+    global _probe
+    if _probe is None:
+        _probe = ReadinessProbe(
+            targets={"data_service": config.normalized_base_url, "landform": config.landform_url},
+            required=config.readiness_required,
+            ttl=config.readiness_cache_ttl,
+            timeout=config.readiness_timeout,
+        )
+    return _probe
+
+
+async def async_check_readiness() -> Dict[str, Any]:
+    """检查服务是否就绪（决定就绪状态的上游均可达）"""
+    return await get_readiness_probe().check()
+
+
+def get_readiness_stats() -> Dict[str, Any]:
+    """获取就绪探测统计信息"""
+    return get_readiness_probe().stats()
+
+
+__all__ = [
+    "ReadinessProbe",
+    "get_readiness_probe",
+    "async_check_readiness",
+    "get_readiness_stats",
+]
@@ -0,0 +1,156 @@
+"""HTTP 连接池客户端模块"""
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..utils import config, logger
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+# 挂载前缀 -> 连接池适配器，用于统计连接池指标
+_adapters: Dict[str, HTTPAdapter] = {}
+
+# 异步客户端绑定在创建它的事件循环上
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _normalize_prefix(url: str) -> str:
+    """将主机地址转换为 Session 挂载前缀（scheme://netloc/）"""
+    parts = urlsplit(url.strip())
+    if not parts.scheme or not parts.netloc:
+        raise ValueError(f"无效的主机地址: {url}")
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+def _build_adapter(pool_maxsize: int) -> HTTPAdapter:
+    return HTTPAdapter(
+        pool_connections=config.http_pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=config.http_pool_block,
+    )
+
+
+def _create_session() -> requests.Session:
+    """创建带连接池的共享 Session"""
+    session = requests.Session()
+    session.headers.update({"Connection": "keep-alive"})
+
+    default_adapter = _build_adapter(config.http_pool_maxsize)
+    for scheme in ("http://", "https://"):
+        session.mount(scheme, default_adapter)
+        _adapters[scheme] = default_adapter
+
+    # 按主机挂载独立的连接池，Session 会优先匹配最长前缀
+    for host, maxsize in config.http_pool_host_maxsize.items():
+        prefix = _normalize_prefix(host)
+        adapter = _build_adapter(maxsize)
+        session.mount(prefix, adapter)
+        _adapters[prefix] = adapter
+
+    logger.info(
+        f"HTTP 连接池已初始化: 默认每主机 {config.http_pool_maxsize} 个连接, "
+        f"独立配置主机 {len(config.http_pool_host_maxsize)} 个"
+    )
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """获取进程内共享的 keep-alive Session"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+
+def get_pool_stats() -> List[Dict[str, Any]]:
+    """获取各主机连接池的统计信息
+
+    返回的每一项包含:
+        host: 目标主机
+        mount: 所属挂载前缀
+        maxsize: 连接池最大连接数
+        connections_created: 已建立的连接总数（即握手次数）
+        requests: 经该连接池发出的请求总数
+        idle: 当前空闲可复用的连接数
+    """
+    stats: List[Dict[str, Any]] = []
+    seen: set[int] = set()
+    for prefix, adapter in list(_adapters.items()):
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            stats.append({
+                "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                "mount": prefix,
+                "maxsize": pool.pool.maxsize if pool.pool else 0,
+                "connections_created": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle": idle,
+            })
+    return stats
+
+
+def close_http_session() -> None:
+    """关闭共享 Session 并释放所有连接"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        _adapters.clear()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """获取当前事件循环共享的异步 HTTP 客户端
+
+    httpx 的连接池不能跨事件循环复用，事件循环变化时会重新创建客户端。
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.async_http_max_connections,
+                max_keepalive_connections=config.async_http_max_keepalive,
+                keepalive_expiry=config.async_http_keepalive_expiry,
+            ),
+            timeout=config.timeout,
+        )
+        _async_client_loop = loop
+        logger.info(
+            f"异步 HTTP 客户端已初始化: 最大连接 {config.async_http_max_connections}, "
+            f"保活连接 {config.async_http_max_keepalive}"
+        )
+    return _async_client
+
+
+async def close_async_http_client() -> None:
+    """关闭当前共享的异步 HTTP 客户端"""
+    global _async_client, _async_client_loop
+    client, _async_client, _async_client_loop = _async_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+__all__ = [
+    "get_http_session",
+    "get_pool_stats",
+    "close_http_session",
+    "get_async_http_client",
+    "close_async_http_client",
+]
@@ -0,0 +1,245 @@
+"""地貌缓存模块 - 经纬度量化 + 内存 LRU + 可选 SQLite 持久化"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..utils import MISSING, TTLCache, config, logger
+
+
+def quantize_position(geo_position: str, resolution: float) -> Optional[str]:
+    """将 "lon,lat" 量化到网格，返回网格键；格式错误时返回 None"""
+    split_pos = geo_position.split(",")
+    if len(split_pos) < 2:
+        return None
+    try:
+        lon = float(split_pos[0].strip())
+        lat = float(split_pos[1].strip())
+    except ValueError:
+        return None
+    return f"{round(lon / resolution)}:{round(lat / resolution)}"
+
+
+class LandformCache:
+    """地貌查询结果缓存
+
+    相邻杆塔的地貌基本一致，按网格量化后共享同一条缓存；
+    配置 path 时命中结果同时写入 SQLite，服务重启后仍可复用。
+    持久化文件记录量化网格大小，与当前 resolution 不一致时清空已有条目。
+    异步路径使用 async_* 方法，SQLite 读写在线程中执行，不阻塞事件循环。
+    """
+
+    def __init__(
+            self,
+            resolution: float,
+            maxsize: int,
+            ttl: Optional[float],
+            path: Optional[str] = None,
+    ):
+        if resolution <= 0:
+            raise ValueError("resolution 必须大于 0。")
+        self.resolution = resolution
+        self.ttl = ttl
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.disk_hits = 0
+        if path:
+            self._db = self._open_db(path, resolution)
+
+    @staticmethod
+    def _open_db(path: str, resolution: float) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS landform ("
+            " grid_key TEXT PRIMARY KEY,"
+            " landform TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS landform_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+        # 网格键按 resolution 量化，网格大小变化后旧条目对应的位置不同，全部清除
+        row = conn.execute("SELECT value FROM landform_meta WHERE name = 'resolution'").fetchone()
+        if row is None or float(row[0]) != resolution:
+            purged = conn.execute("DELETE FROM landform").rowcount
+            if purged:
+                logger.warning(f"地貌持久化缓存的网格大小 {row[0] if row else '未知'} 与当前 {resolution} 不一致，已清除 {purged} 条")
+            conn.execute(
+                "INSERT OR REPLACE INTO landform_meta (name, value) VALUES ('resolution', ?)", (repr(resolution),)
+            )
+        conn.commit()
+        logger.info(f"地貌持久化缓存已加载: {path}")
+        return conn
+
+    def key_for(self, geo_position: str) -> Optional[str]:
+        return quantize_position(geo_position, self.resolution)
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        """从 SQLite 读取，命中后写入内存缓存"""
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT landform, updated_at FROM landform WHERE grid_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            landform, updated_at = row
+            if self.ttl is not None and updated_at + self.ttl < time.time():
+                return None
+            self.disk_hits += 1
+        self._memory.set(key, landform)
+        return landform
+
+    def _disk_set(self, rows: List[Tuple[str, str]]) -> None:
+        """在一个事务中写入 (网格键, 地貌)"""
+        now = time.time()
+        with self._db_lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO landform (grid_key, landform, updated_at) VALUES (?, ?, ?)",
+                [(key, landform, now) for key, landform in rows],
+            )
+            self._db.commit()
+
+    def _memory_lookup(self, geo_positions: Iterable[str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """查询内存缓存，返回 (坐标 -> 地貌, 未命中坐标 -> 网格键)；格式错误的坐标两者都不含"""
+        hits: Dict[str, str] = {}
+        misses: Dict[str, str] = {}
+        for geo_position in geo_positions:
+            key = self.key_for(geo_position)
+            if key is None:
+                continue
+            value = self._memory.get(key)
+            if value is not MISSING:
+                hits[geo_position] = value
+            elif self._db is not None:
+                misses[geo_position] = key
+        return hits, misses
+
+    def _disk_get_many(self, misses: Dict[str, str]) -> Dict[str, str]:
+        results: Dict[str, str] = {}
+        for geo_position, key in misses.items():
+            landform = self._disk_get(key)
+            if landform is not None:
+                results[geo_position] = landform
+        return results
+
+    def _memory_set(self, items: Dict[str, str]) -> List[Tuple[str, str]]:
+        rows = []
+        for geo_position, landform in items.items():
+            key = self.key_for(geo_position)
+            if key is not None:
+                self._memory.set(key, landform)
+                rows.append((key, landform))
+        return rows
+
+    def get(self, geo_position: str) -> Optional[str]:
+        """读取缓存的地貌，未命中时返回 None"""
+        return self.get_many([geo_position]).get(geo_position)
+
+    def get_many(self, geo_positions: Iterable[str]) -> Dict[str, str]:
+        """批量读取缓存的地貌，返回命中的 坐标 -> 地貌"""
+        hits, misses = self._memory_lookup(geo_positions)
+        if misses:
+            hits.update(self._disk_get_many(misses))
+        return hits
+
+    async def async_get(self, geo_position: str) -> Optional[str]:
+        """异步读取缓存的地貌，未命中时返回 None"""
+        return (await self.async_get_many([geo_position])).get(geo_position)
+
+    async def async_get_many(self, geo_positions: Iterable[str]) -> Dict[str, str]:
+        """批量异步读取，内存未命中的坐标在线程中一次性查询 SQLite"""
+        hits, misses = self._memory_lookup(geo_positions)
+        if misses:
+            hits.update(await asyncio.to_thread(self._disk_get_many, misses))
+        return hits
+
+    def set(self, geo_position: str, landform: str) -> None:
+        """写入地貌缓存"""
+        self.set_many({geo_position: landform})
+
+    def set_many(self, items: Dict[str, str]) -> None:
+        """批量写入地貌缓存，持久化时在一个事务中提交"""
+        rows = self._memory_set(items)
+        if rows and self._db is not None:
+            self._disk_set(rows)
+
+    async def async_set(self, geo_position: str, landform: str) -> None:
+        """异步写入地貌缓存"""
+        await self.async_set_many({geo_position: landform})
+
+    async def async_set_many(self, items: Dict[str, str]) -> None:
+        """批量异步写入，SQLite 写入和提交在线程中执行"""
+        rows = self._memory_set(items)
+        if rows and self._db is not None:
+            await asyncio.to_thread(self._disk_set, rows)
+
+    def clear(self) -> None:
+        """清空内存和持久化缓存"""
+        self._memory.clear()
+        self.disk_hits = 0
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM landform")
+                self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        """返回缓存命中统计，hits 包含内存和持久化命中"""
+        memory = self._memory.stats()
+        return {
+            "size": memory["size"],
+            "maxsize": memory["maxsize"],
+            "hits": memory["hits"] + self.disk_hits,
+            "misses": memory["misses"] - self.disk_hits,
+            "disk_hits": self.disk_hits,
+            "evictions": memory["evictions"],
+            "persistent": self._db is not None,
+        }
+
+
+_landform_cache: Optional[LandformCache] = None
+_landform_cache_lock = threading.Lock()
+
+
+def get_landform_cache() -> Optional[LandformCache]:
+    """获取全局地貌缓存，未启用时返回 None"""
+    global _landform_cache
+    if not config.landform_cache_enabled:
+        return None
+    if _landform_cache is None:
+        with _landform_cache_lock:
+            if _landform_cache is None:
+                _landform_cache = LandformCache(
+                    resolution=config.landform_cache_resolution,
+                    maxsize=config.landform_cache_maxsize,
+                    ttl=config.landform_cache_ttl,
+                    path=config.landform_cache_path,
+                )
+    return _landform_cache
+
+
+def get_landform_cache_stats() -> Dict[str, Any]:
+    """获取地貌缓存统计信息"""
+    cache = get_landform_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+__all__ = [
+    "quantize_position",
+    "LandformCache",
+    "get_landform_cache",
+    "get_landform_cache_stats",
+]
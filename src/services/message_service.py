@@ -2,7 +2,7 @@
 import json
 from typing import Any, Dict, List
 
-from ..utils import logger
+from ..utils import log_payload, logger, traced
 
 
 def get_condition(wave_obj: Dict[str, Any]) -> str:
@@ -52,10 +52,11 @@ def clean_result(result: str) -> str:
     return "".join(cleaned_parts)
 
 
+@traced
 def process_message_data(res: str, wave_data_str: str) -> Dict[str, Any]:
     """处理报文和录波数据"""
-    logger.info(f"报文数据: {res}")
-    logger.info(f"录波数据: {wave_data_str}")
+    log_payload("process_message_data", "报文数据", res)
+    log_payload("process_message_data", "录波数据", wave_data_str)
 
     try:
         # 解析JSON数据
@@ -0,0 +1,114 @@
+"""停电事件原始数据共享拉取 - 设备信息和环境数据工具共用 `/outage-data/test/agent` 的一次请求
+
+该接口响应是最大的上游响应，同一停电事件在共享时间窗口内只拉取、解析一次，
+并发的相同请求合并到同一次上游调用。返回的对象由多个工具共享，调用方不得修改。
+"""
+import asyncio
+import threading
+from typing import Any, Dict, Optional
+
+from ..utils import MISSING, TTLCache, config, traced
+from .data_service import async_post_to_data_service
+
+OUTAGE_DATA_PATH = "/outage-data/test/agent"
+
+_outage_data_cache: Optional[TTLCache] = None
+_outage_data_lock = threading.Lock()
+_inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+_counters = {"fetches": 0, "shared": 0, "coalesced": 0}
+
+
+def _get_cache() -> TTLCache:
+    global _outage_data_cache
+    if _outage_data_cache is None:
+        with _outage_data_lock:
+            if _outage_data_cache is None:
+                _outage_data_cache = TTLCache(
+                    maxsize=config.outage_data_cache_maxsize,
+                    ttl=config.outage_data_window,
+                )
+    return _outage_data_cache
+
+
+async def _fetch(outage_number: str) -> Dict[str, Any]:
+    with _outage_data_lock:
+        _counters["fetches"] += 1
+    return await async_post_to_data_service(OUTAGE_DATA_PATH, {"outageNumber": outage_number})
+
+
+@traced
+async def async_get_outage_data(outage_number: str) -> Dict[str, Any]:
+    """获取停电事件原始数据（设备、环境），共享时间窗口内复用同一次拉取结果
+
+    参数:
+        outage_number: 停电事件编号
+    """
+    if config.outage_data_window <= 0:
+        return await _fetch(outage_number)
+
+    cache = _get_cache()
+    cached = cache.get(outage_number)
+    if cached is not MISSING:
+        with _outage_data_lock:
+            _counters["shared"] += 1
+        return cached
+
+    loop = asyncio.get_running_loop()
+    inflight = _inflight.get(outage_number)
+    if inflight is not None and inflight.get_loop() is loop:
+        with _outage_data_lock:
+            _counters["coalesced"] += 1
+        try:
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            # 发起请求的任务被取消时，由当前任务自行请求
+            if not inflight.cancelled():
+                raise
+            return await async_get_outage_data(outage_number)
+
+    future: "asyncio.Future[Dict[str, Any]]" = loop.create_future()
+    _inflight[outage_number] = future
+    try:
+        data = await _fetch(outage_number)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        # 没有等待者时避免 "exception was never retrieved" 警告
+        future.exception()
+        raise
+    else:
+        future.set_result(data)
+        if not (isinstance(data, dict) and data.get("success") is False):
+            cache.set(outage_number, data)
+        return data
+    finally:
+        if _inflight.get(outage_number) is future:
+            del _inflight[outage_number]
+
+
+def clear_outage_data() -> None:
+    """清空共享数据和统计"""
+    if _outage_data_cache is not None:
+        _outage_data_cache.clear()
+    with _outage_data_lock:
+        for name in _counters:
+            _counters[name] = 0
+
+
+def get_outage_data_stats() -> Dict[str, Any]:
+    """获取共享拉取统计：上游拉取次数、窗口内复用次数、并发合并次数"""
+    with _outage_data_lock:
+        stats: Dict[str, Any] = dict(_counters)
+    stats["window"] = config.outage_data_window
+    stats["size"] = len(_outage_data_cache) if _outage_data_cache is not None else 0
+    return stats
+
+
+__all__ = [
+    "OUTAGE_DATA_PATH",
+    "async_get_outage_data",
+    "clear_outage_data",
+    "get_outage_data_stats",
+]
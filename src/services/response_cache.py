@@ -0,0 +1,194 @@
+"""数据服务响应缓存模块 - 按请求缓存响应体，并合并并发的相同请求（single-flight）"""
+import asyncio
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..utils import MISSING, TTLCache, config, logger, span
+
+# 缓存键：(HTTP 方法, 接口路径, 规范化后的参数)
+ResponseKey = Tuple[str, str, str]
+
+
+def decode_response(content: bytes) -> Any:
+    """解析响应体 JSON"""
+    with span("json.decode", **{"body.size": len(content)}):
+        try:
+            return json.loads(content)
+        except ValueError as exc:
+            raise RuntimeError("数据服务返回的不是有效的 JSON。") from exc
+
+
+class ResponseCache:
+    """数据服务响应缓存
+
+    缓存的是原始响应体，每次命中都重新解析，调用方拿到的是独立对象，可以放心修改。
+    只缓存 JSON 有效、success 不为 False 且不超过大小上限的响应。
+
+    参数:
+        maxsize: 最大缓存条目数
+        ttls: 接口路径 -> 缓存有效期（秒），未列出的接口不缓存
+        max_entry_bytes: 单条响应体大小上限
+    """
+
+    def __init__(self, maxsize: int, ttls: Dict[str, float], max_entry_bytes: int):
+        self._cache = TTLCache(maxsize=maxsize)
+        self._ttls = {"/" + path.lstrip("/"): ttl for path, ttl in ttls.items()}
+        self.max_entry_bytes = max_entry_bytes
+        self._inflight: Dict[ResponseKey, "asyncio.Future[bytes]"] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.bypassed = 0
+        self.oversized = 0
+
+    def ttl_for(self, path: str) -> float:
+        """接口缓存有效期，0 表示不缓存"""
+        return self._ttls.get("/" + path.lstrip("/"), 0)
+
+    @staticmethod
+    def make_key(method: str, path: str, payload: Any) -> ResponseKey:
+        """生成缓存键，参数按键排序后序列化，字段顺序不同的相同请求命中同一条目"""
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+        return method.upper(), "/" + path.lstrip("/"), canonical
+
+    def get(self, key: ResponseKey) -> Any:
+        """读取并解析缓存的响应，未命中时返回 MISSING"""
+        content = self._cache.get(key)
+        if content is MISSING:
+            return MISSING
+        return decode_response(content)
+
+    def store(self, key: ResponseKey, content: bytes, data: Any, ttl: float) -> None:
+        """写入响应体（data 为已解析的响应，用于判断业务是否成功）"""
+        if len(content) > self.max_entry_bytes:
+            with self._lock:
+                self.oversized += 1
+            return
+        if isinstance(data, dict) and data.get("success") is False:
+            return
+        self._cache.set(key, content, ttl)
+
+    def fetch(self, method: str, path: str, payload: Any, fetch: Callable[[], bytes]) -> Any:
+        """同步读取缓存，未命中时调用 fetch 获取响应体并写入缓存"""
+        ttl = self.ttl_for(path)
+        if ttl <= 0:
+            with self._lock:
+                self.bypassed += 1
+            return decode_response(fetch())
+
+        key = self.make_key(method, path, payload)
+        cached = self.get(key)
+        if cached is not MISSING:
+            return cached
+
+        content = fetch()
+        data = decode_response(content)
+        self.store(key, content, data, ttl)
+        return data
+
+    async def async_fetch(
+            self,
+            method: str,
+            path: str,
+            payload: Any,
+            fetch: Callable[[], Awaitable[bytes]],
+    ) -> Any:
+        """异步读取缓存，未命中时调用 fetch；同一事件循环内并发的相同请求共享一次上游调用"""
+        ttl = self.ttl_for(path)
+        if ttl <= 0:
+            with self._lock:
+                self.bypassed += 1
+            return decode_response(await fetch())
+
+        key = self.make_key(method, path, payload)
+        cached = self.get(key)
+        if cached is not MISSING:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is loop:
+            with self._lock:
+                self.coalesced += 1
+            try:
+                return decode_response(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                # 发起请求的任务被取消时，由当前任务自行请求
+                if not inflight.cancelled():
+                    raise
+                return await self.async_fetch(method, path, payload, fetch)
+
+        future: "asyncio.Future[bytes]" = loop.create_future()
+        self._inflight[key] = future
+        try:
+            content = await fetch()
+            data = decode_response(content)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # 没有等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(content)
+            self.store(key, content, data, ttl)
+            return data
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def clear(self) -> None:
+        """清空缓存和统计"""
+        self._cache.clear()
+        with self._lock:
+            self.coalesced = self.bypassed = self.oversized = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中、未命中、合并、跳过缓存次数和当前大小"""
+        return {
+            **self._cache.stats(),
+            "coalesced": self.coalesced,
+            "bypassed": self.bypassed,
+            "oversized": self.oversized,
+            "inflight": len(self._inflight),
+        }
+
+
+# 全局响应缓存
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取全局响应缓存，未启用时返回 None"""
+    global _response_cache
+    if not config.response_cache_enabled:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    maxsize=config.response_cache_maxsize,
+                    ttls=config.response_cache_ttls,
+                    max_entry_bytes=config.response_cache_max_entry_bytes,
+                )
+                logger.info(f"数据服务响应缓存已启用，缓存接口数: {len(config.response_cache_ttls)}")
+    return _response_cache
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """获取响应缓存统计信息"""
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+__all__ = [
+    "decode_response",
+    "ResponseCache",
+    "get_response_cache",
+    "get_response_cache_stats",
+]
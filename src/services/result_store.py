@@ -0,0 +1,214 @@
+"""事后分析结果持久化存储 - 已结束停电事件的数据不再变化，首次获取后永久复用
+
+按请求内容（方法、路径、规范化参数）的 SHA-256 寻址，响应体保存在 SQLite 中，
+总大小超过上限时按最近访问时间淘汰。多个服务进程（mcp_workers > 1）可共用同一文件，
+每次写入都在 SQLite 写事务内重新统计条数和总大小，淘汰以数据库中的实际数据为准。
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from ..utils import config, logger
+from .response_cache import ResponseCache, decode_response
+
+# 事后分析的 analysisType 取值
+POST_EVENT_ANALYSIS_TYPE = 2
+
+
+class ResultStore:
+    """事后分析结果存储
+
+    参数:
+        path: SQLite 文件路径
+        max_bytes: 响应体总大小上限，超出时淘汰最久未访问的结果
+        paths: 允许持久化的接口路径
+    """
+
+    def __init__(self, path: str, max_bytes: int, paths: Iterable[str]):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes 必须大于 0。")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.paths = {"/" + p.lstrip("/") for p in paths}
+        self._db = self._open_db(path)
+        self._lock = threading.Lock()
+        self._refresh_totals()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _open_db(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " digest TEXT PRIMARY KEY,"
+            " method TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+        conn.commit()
+        logger.info(f"事后分析结果存储已加载: {path}")
+        return conn
+
+    def accepts(self, path: str, data: Any) -> bool:
+        """是否为可持久化的事后分析请求"""
+        if "/" + path.lstrip("/") not in self.paths or not isinstance(data, dict):
+            return False
+        return str(data.get("analysisType")) == str(POST_EVENT_ANALYSIS_TYPE)
+
+    @staticmethod
+    def digest(method: str, path: str, data: Any) -> str:
+        """请求内容的 SHA-256"""
+        key = ResponseCache.make_key(method, path, data)
+        return hashlib.sha256("\n".join(key).encode("utf-8")).hexdigest()
+
+    def get(self, method: str, path: str, data: Any) -> Optional[bytes]:
+        """读取已保存的响应体，未保存时返回 None"""
+        digest = self.digest(method, path, data)
+        with self._lock:
+            row = self._db.execute("SELECT body FROM results WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE results SET accessed_at = ? WHERE digest = ?", (time.time(), digest))
+            self._db.commit()
+            self.hits += 1
+        return row[0]
+
+    def put(self, method: str, path: str, data: Any, content: bytes) -> bool:
+        """保存响应体，响应无效、业务失败或超过总大小上限时不保存"""
+        if len(content) > self.max_bytes:
+            return False
+        try:
+            body = decode_response(content)
+        except RuntimeError:
+            return False
+        if isinstance(body, dict) and body.get("success") is False:
+            return False
+
+        key = ResponseCache.make_key(method, path, data)
+        digest = self.digest(method, path, data)
+        now = time.time()
+        with self._lock:
+            # 立即获取写锁，其他进程的写入在本事务提交前等待，统计与淘汰基于一致的数据
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results"
+                    " (digest, method, path, payload, body, size, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (digest, key[0], key[1], key[2], content, len(content), now, now),
+                )
+                self._refresh_totals()
+                self._evict()
+                self._db.commit()
+            except sqlite3.Error:
+                self._db.rollback()
+                raise
+            self.writes += 1
+        return True
+
+    def _refresh_totals(self) -> None:
+        """从数据库重新统计条数和总大小，包含其他进程写入的结果（调用方持有锁）"""
+        self.count, self.total_bytes = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+
+    def _evict(self) -> None:
+        """按最近访问时间淘汰，直到总大小不超过上限（调用方持有锁并已开启写事务）"""
+        while self.total_bytes > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT digest, size FROM results ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self.count = self.total_bytes = 0
+                return
+            for digest, size in rows:
+                if self.total_bytes <= self.max_bytes:
+                    return
+                self._db.execute("DELETE FROM results WHERE digest = ?", (digest,))
+                self.total_bytes -= size
+                self.count -= 1
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        """清空存储和统计"""
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+            self._db.commit()
+            self.count = self.total_bytes = 0
+            self.hits = self.misses = self.writes = self.evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中、写入、淘汰次数和占用大小
+
+        均为内存计数，不查询数据库；条数和总大小为本进程最近一次写入时的统计，
+        多进程共用存储时可能不含其他进程之后的写入。
+        """
+        return {
+            "size": len(self),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+# 全局结果存储
+_result_store: Optional[ResultStore] = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store() -> Optional[ResultStore]:
+    """获取全局事后分析结果存储，未配置 result_store_path 时返回 None"""
+    global _result_store
+    if not config.result_store_path:
+        return None
+    if _result_store is None:
+        with _result_store_lock:
+            if _result_store is None:
+                _result_store = ResultStore(
+                    path=config.result_store_path,
+                    max_bytes=config.result_store_max_bytes,
+                    paths=config.result_store_paths,
+                )
+    return _result_store
+
+
+def get_result_store_stats() -> Dict[str, Any]:
+    """获取事后分析结果存储统计信息"""
+    store = get_result_store()
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **store.stats()}
+
+
+__all__ = [
+    "POST_EVENT_ANALYSIS_TYPE",
+    "ResultStore",
+    "get_result_store",
+    "get_result_store_stats",
+]
@@ -3,6 +3,7 @@ from collections import defaultdict
 from typing import Any, Dict, List
 
 from ..repository import PSR_TYPE_TO_DEVICE_TYPE, WEATHER_FAULT_RISKS
+from ..utils import traced
 from .device_service import safe_to_int, normalize_psr_type
 
 
@@ -91,6 +92,7 @@ def match_weather_fault_risks(weather_desc: Any) -> List[str]:
     return deduped
 
 
+@traced
 def process_weather_data(weather_data: Dict[str, Any]) -> Dict[str, Any]:
     """处理天气数据并生成汇总信息"""
     if not isinstance(weather_data, dict):
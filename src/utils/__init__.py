@@ -1,7 +1,14 @@
 from .logger import logger
 from .config import config
-
-__all__ = ["logger", "config"]
+from .cache import TTLCache, MISSING
+from .metrics import metrics_registry, track_upstream
+from .tracing import bind_context, span, traced
+from .payload_log import log_payload
+
+__all__ = [
+    "logger", "config", "TTLCache", "MISSING", "metrics_registry", "track_upstream",
+    "span", "traced", "bind_context", "log_payload",
+]
 
 
 
@@ -1,5 +1,7 @@
-"""配置模块 - 硬编码默认值"""
-from typing import Dict
+"""配置模块 - 硬编码默认值，可通过环境变量覆盖"""
+import json
+import os
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, computed_field
 
@@ -15,10 +17,96 @@ class DataServiceConfig(BaseModel):
     
     # 地貌服务配置
     landform_url: str = "http://192.168.11.145:38000"
-    
+    landform_concurrency: int = 16  # 地貌查询的最大并发数
+    landform_batch_path: Optional[str] = None  # 地貌批量查询接口路径，为空时并发逐个查询
+    landform_batch_size: int = 50  # 批量查询每组坐标数
+
+    # 地貌缓存配置（经纬度按网格量化后作为缓存键）
+    landform_cache_enabled: bool = True
+    landform_cache_resolution: float = 0.001  # 量化网格大小（度），约 100 米
+    landform_cache_maxsize: int = 100_000  # 内存缓存最大条目数
+    landform_cache_ttl: float = 30 * 24 * 3600  # 缓存有效期（秒）
+    landform_cache_path: Optional[str] = None  # SQLite 持久化文件路径，为空时仅使用内存缓存；网格大小变化时清空已有条目
+
+    # 设备数据处理配置
+    device_columnar_enabled: bool = False  # 安装 numpy 时启用列式统计；列式表由设备信息字典构建，实测不比逐设备累计快，默认关闭
+    device_columnar_threshold: int = 5000  # 设备数达到该值时使用列式统计
+
+    # HTTP 连接池配置
+    http_pool_connections: int = 10  # 缓存的主机连接池数量
+    http_pool_maxsize: int = 20  # 每个主机连接池的默认最大连接数
+    http_pool_host_maxsize: Dict[str, int] = {}  # 按主机覆盖连接池大小，如 {"http://25.91.83.60:18081": 50}
+    http_pool_block: bool = False  # 连接池耗尽时是否阻塞等待空闲连接
+
+    # 异步 HTTP 客户端配置
+    async_http_max_connections: int = 200  # 最大并发连接数
+    async_http_max_keepalive: int = 50  # 最大保活连接数
+    async_http_keepalive_expiry: float = 30.0  # 空闲连接保活时长（秒）
+
+    # 数据服务响应缓存配置（按 方法+路径+规范化参数 缓存，并发的相同请求合并为一次上游调用）
+    response_cache_enabled: bool = True
+    response_cache_maxsize: int = 1024  # 最大缓存条目数
+    response_cache_max_entry_bytes: int = 5 * 1024 * 1024  # 响应体超过此大小时不缓存
+    response_cache_ttls: Dict[str, float] = {
+        "/outage/event/query": 300,
+        "/api/weather/data/portrait": 300,
+        "/appeal/appealListByOutageNumber": 60,
+        "/outage-data/outage/event/realMeasCenter/event/commonQuery/query": 60,
+        "/outage-data/outage/event/luboAnalyse": 300,
+    }  # 按接口路径设置缓存有效期（秒），未列出或为 0 的接口不缓存
+
+    # 事后分析（analysisType=2）结果持久化存储配置
+    result_store_path: Optional[str] = None  # SQLite 文件路径，为空时不启用
+    result_store_max_bytes: int = 1024 * 1024 * 1024  # 响应体总大小上限，超出时淘汰最久未访问的结果
+    result_store_paths: List[str] = [
+        "/api/weather/data/portrait",
+        "/appeal/appealListByOutageNumber",
+        "/outage-data/outage/event/realMeasCenter/event/commonQuery/query",
+        "/outage-data/outage/event/luboAnalyse",
+    ]  # 允许持久化的接口路径
+
+    # 停电事件原始数据（/outage-data/test/agent）共享拉取配置，设备信息和环境数据工具共用
+    outage_data_window: float = 120.0  # 同一停电事件复用拉取结果的时长（秒），0 表示不共享
+    outage_data_cache_maxsize: int = 32  # 最多保留的停电事件数（响应较大，不宜过多）
+
+    # 数据句柄配置（获取数据的工具返回句柄，处理工具凭句柄取回服务端保存的原始数据）
+    handle_store_maxsize: int = 256  # 最多保留的句柄数，超出时淘汰最久未使用的
+    handle_store_ttl: float = 600.0  # 句柄有效期（秒）
+
+    # 批量处理配置
+    batch_concurrency: int = 8  # 同时处理的停电事件数
+    batch_max_outages: int = 1000  # 单次批量调用最多处理的停电事件数
+    batch_process_workers: Optional[int] = None  # 处理进程数，为空时使用 CPU 核数，为 0 时改用线程
+
+    # 上游请求录制配置（录制的磁带可由 benchmarks/stub_server.py 离线回放）
+    cassette_path: Optional[str] = None  # 磁带文件路径（JSONL），为空时不录制
+
+    # 指标配置（Prometheus 文本格式）
+    metrics_enabled: bool = True
+    metrics_path: str = "/metrics"  # 指标抓取路径
+
+    # 链路追踪配置（span 按 OTLP JSON 格式逐行导出）
+    tracing_enabled: bool = False
+    tracing_export: Optional[str] = None  # 导出文件路径，为空或 "-" 时输出到标准输出
+
+    # 原始报文日志配置（INFO 级别只记录长度和摘要，DEBUG 级别按采样率记录截断后的内容）
+    payload_log_max_chars: int = 2048  # DEBUG 日志中报文内容的最大字符数
+    payload_log_sample_rate: float = 0.01  # 记录报文内容的默认采样率
+    payload_log_sample_rates: Dict[str, float] = {}  # 调用来源 -> 采样率，覆盖默认采样率
+
+    # 健康检查配置（/healthz 只表示进程存活，/readyz 探测上游是否可达）
+    readiness_cache_ttl: float = 15.0  # 上游探测结果缓存时长（秒）
+    readiness_timeout: float = 2.0  # 单个上游的探测超时（秒）
+    readiness_required: List[str] = ["data_service"]  # 决定就绪状态的上游，地貌服务不可达时工具仍可降级运行
+
     # MCP服务器配置
     mcp_host: str = "0.0.0.0"
     mcp_port: int = 9090
+    mcp_transport: Literal["sse", "streamable-http"] = "sse"  # 传输方式
+    mcp_stateless_http: bool = True  # streamable-http 不保存会话状态，每个请求可由任意进程处理
+    mcp_workers: int = 1  # 服务进程数，大于 1 时共用同一端口，需使用 streamable-http
+    mcp_worker_concurrency: Optional[int] = None  # 每个进程同时处理的最大连接和请求数，超出时返回 503，为空时不限制
+    mcp_graceful_shutdown_timeout: Optional[float] = None  # 收到停止信号后等待进行中请求结束的最长时间（秒），为空时一直等待（uvicorn 默认）
 
     @computed_field
     @property
@@ -31,7 +119,42 @@ class DataServiceConfig(BaseModel):
         return {"Outage-Token": self.outage_token}
 
 
+# docker-compose.yml 中使用的环境变量名
+ENV_ALIASES: Dict[str, str] = {
+    "MCP_HOST": "mcp_host",
+    "MCP_PORT": "mcp_port",
+    "MCP_TRANSPORT": "mcp_transport",
+    "MCP_WORKERS": "mcp_workers",
+    "DATA_SERVICE_BASE_URL": "base_url",
+    "DATA_SERVICE_TIMEOUT": "timeout",
+    "LANDFORM_URL": "landform_url",
+}
+
+# 其余字段使用 API2MCP_<字段名大写> 覆盖，如 API2MCP_LANDFORM_CONCURRENCY=32
+ENV_PREFIX = "API2MCP_"
+
+
+def load_config() -> DataServiceConfig:
+    """加载配置，环境变量优先于硬编码默认值"""
+    overrides: Dict[str, Any] = {}
+    for field in DataServiceConfig.model_fields:
+        value = os.environ.get(f"{ENV_PREFIX}{field.upper()}")
+        if value is not None:
+            overrides[field] = value
+    for env_name, field in ENV_ALIASES.items():
+        value = os.environ.get(env_name)
+        if value is not None:
+            overrides[field] = value
+
+    # 字典、列表类型的字段以 JSON 形式传入
+    for field, value in overrides.items():
+        if isinstance(value, str) and value.strip()[:1] in ("{", "["):
+            overrides[field] = json.loads(value)
+
+    return DataServiceConfig(**overrides)
+
+
 # 全局配置实例
-config = DataServiceConfig()
+config = load_config()
 
-__all__ = ["config", "DataServiceConfig"]
+__all__ = ["config", "DataServiceConfig", "load_config"]
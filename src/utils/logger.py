@@ -2,9 +2,14 @@
 import sys
 from loguru import logger
 
+from .tracing import current_trace_id
+
 # 移除默认处理器
 logger.remove()
 
+# 日志记录附带当前链路 ID（extra["trace_id"]），不在链路内时为 "-"
+logger.configure(patcher=lambda record: record["extra"].update(trace_id=current_trace_id() or "-"))
+
 # 添加控制台输出
 logger.add(
     sys.stderr,
@@ -19,7 +24,7 @@ logger.add(
     rotation="00:00",  # 每天轮转
     retention="7 days",  # 保留7天
     compression="zip",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+    format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {extra[trace_id]} | {name}:{function}:{line} - {message}",
     level="DEBUG",
     enqueue=True,
 )
@@ -0,0 +1,278 @@
+"""指标模块 - 进程内计数器、仪表和直方图，按 Prometheus 文本格式输出
+
+不依赖 prometheus_client；指标值只在内存中累加，抓取时一次性渲染，开销与指标数量成正比。
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .config import config
+from .tracing import SPAN_KIND_CLIENT, span
+
+# 标签值组合 -> 指标值
+LabelValues = Tuple[str, ...]
+
+# 延迟直方图的默认分桶（秒）
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 数据大小直方图的默认分桶（字节），1KB 到 64MB
+SIZE_BUCKETS: Tuple[float, ...] = tuple(float(1024 * 4 ** i) for i in range(9))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """指标基类，按标签值组合分别记录"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"指标 {self.name} 的标签应为 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """只增计数器"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    """可增可减的仪表"""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """累积分桶直方图"""
+
+    type_name = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 标签值组合 -> (各桶计数（非累积）, 总和, 总数)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表，渲染时追加各组件的统计信息"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标已注册: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_stats(self, component: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """注册组件统计函数，渲染时其中的数值字段输出为 api2mcp_component_stat 仪表"""
+        with self._lock:
+            self._collectors[component] = collect
+
+    def render(self) -> str:
+        """渲染为 Prometheus 文本格式"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        if collectors:
+            lines.append("# HELP api2mcp_component_stat 各组件（缓存、存储、连接池等）的统计值")
+            lines.append("# TYPE api2mcp_component_stat gauge")
+            for component, collect in collectors:
+                try:
+                    stats = collect()
+                except Exception:
+                    continue
+                for stat, value in stats.items():
+                    if isinstance(value, (bool, int, float)):
+                        labels = _format_labels(("component", "stat"), (component, stat))
+                        lines.append(f"api2mcp_component_stat{labels} {_format_value(float(value))}")
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+TOOL_CALLS = metrics_registry.register(Counter(
+    "api2mcp_tool_calls_total", "MCP 工具调用次数", ("tool", "status")))
+TOOL_LATENCY = metrics_registry.register(Histogram(
+    "api2mcp_tool_latency_seconds", "MCP 工具调用耗时（秒）", ("tool",)))
+TOOL_IN_FLIGHT = metrics_registry.register(Gauge(
+    "api2mcp_tool_in_flight", "正在执行的 MCP 工具调用数", ("tool",)))
+TOOL_RESPONSE_BYTES = metrics_registry.register(Histogram(
+    "api2mcp_tool_response_bytes", "MCP 工具返回内容大小（字节）", ("tool",), SIZE_BUCKETS))
+
+UPSTREAM_REQUESTS = metrics_registry.register(Counter(
+    "api2mcp_upstream_requests_total", "上游请求次数", ("service", "path", "status")))
+UPSTREAM_LATENCY = metrics_registry.register(Histogram(
+    "api2mcp_upstream_latency_seconds", "上游请求耗时（秒）", ("service", "path")))
+UPSTREAM_IN_FLIGHT = metrics_registry.register(Gauge(
+    "api2mcp_upstream_in_flight", "正在进行的上游请求数", ("service",)))
+UPSTREAM_RESPONSE_BYTES = metrics_registry.register(Histogram(
+    "api2mcp_upstream_response_bytes", "上游响应大小（字节）", ("service", "path"), SIZE_BUCKETS))
+
+
+class UpstreamCall:
+    """一次上游请求的结果，由调用方在收到响应后填写状态码和响应大小"""
+
+    __slots__ = ("status", "size")
+
+    def __init__(self) -> None:
+        self.status: Optional[int] = None
+        self.size: Optional[int] = None
+
+
+@contextmanager
+def track_upstream(service: str, path: str) -> Iterator[UpstreamCall]:
+    """记录一次上游请求的耗时、状态和响应大小，开启追踪时同时记录为 span
+
+    未拿到响应的请求按异常类型记为 timeout 或 error。
+    """
+    path = "/" + path.lstrip("/")
+    with span(f"{service} {path}", SPAN_KIND_CLIENT, **{"upstream.service": service, "url.path": path}) as current:
+        call = UpstreamCall()
+        try:
+            if not config.metrics_enabled:
+                yield call
+            else:
+                with _observe_upstream(service, path, call):
+                    yield call
+        finally:
+            current.set_attribute("http.response.status_code", call.status)
+            current.set_attribute("http.response.body.size", call.size)
+
+
+@contextmanager
+def _observe_upstream(service: str, path: str, call: UpstreamCall) -> Iterator[None]:
+    UPSTREAM_IN_FLIGHT.inc(service=service)
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+    except Exception as e:
+        if call.status is None and "timeout" in type(e).__name__.lower():
+            status = "timeout"
+        raise
+    finally:
+        UPSTREAM_IN_FLIGHT.dec(service=service)
+        if call.status is not None:
+            status = str(call.status)
+        UPSTREAM_REQUESTS.inc(service=service, path=path, status=status)
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, service=service, path=path)
+        if call.size is not None:
+            UPSTREAM_RESPONSE_BYTES.observe(call.size, service=service, path=path)
+
+
+__all__ = [
+    "LATENCY_BUCKETS",
+    "SIZE_BUCKETS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "metrics_registry",
+    "TOOL_CALLS",
+    "TOOL_LATENCY",
+    "TOOL_IN_FLIGHT",
+    "TOOL_RESPONSE_BYTES",
+    "UPSTREAM_REQUESTS",
+    "UPSTREAM_LATENCY",
+    "UPSTREAM_IN_FLIGHT",
+    "UPSTREAM_RESPONSE_BYTES",
+    "UpstreamCall",
+    "track_upstream",
+]
@@ -0,0 +1,64 @@
+"""原始报文日志模块 - 按级别、大小和采样率控制大段上游数据写入日志
+
+INFO 级别只记录长度和摘要，可用来比对两次调用拿到的数据是否相同；
+DEBUG 级别按调用来源的采样率记录截断后的内容。日志内容均延迟生成，
+没有处理器接收对应级别时不计算摘要、不复制报文。
+"""
+import hashlib
+import random
+from typing import Union
+
+from .config import config
+from .logger import logger
+
+Payload = Union[str, bytes]
+
+
+def payload_digest(payload: Payload) -> str:
+    """报文长度和 blake2b 摘要，如 "152340 字符, blake2b:1f3a..." """
+    if isinstance(payload, str):
+        size = f"{len(payload)} 字符"
+        payload = payload.encode("utf-8", errors="surrogatepass")
+    else:
+        size = f"{len(payload)} 字节"
+    return f"{size}, blake2b:{hashlib.blake2b(payload, digest_size=8).hexdigest()}"
+
+
+def truncate_payload(payload: Payload, limit: int) -> str:
+    """截断到 limit 个字符，超出时在末尾注明原始长度"""
+    if isinstance(payload, bytes):
+        text = payload[:limit * 4].decode("utf-8", errors="replace")
+        if len(payload) <= limit * 4 and len(text) <= limit:
+            return text
+        return f"{text[:limit]}...[已截断，共 {len(payload)} 字节]"
+    if len(payload) <= limit:
+        return payload
+    return f"{payload[:limit]}...[已截断，共 {len(payload)} 字符]"
+
+
+def should_sample(source: str) -> bool:
+    """按调用来源的采样率决定本次是否记录报文内容"""
+    rate = config.payload_log_sample_rates.get(source, config.payload_log_sample_rate)
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+def log_payload(source: str, label: str, payload: Payload) -> None:
+    """记录一段原始报文：INFO 级别记录摘要，被采样时 DEBUG 级别记录截断后的内容
+
+    参数:
+        source: 调用来源（工具或处理函数名），用于查找采样率
+        label: 日志中的报文名称，如 "报文数据"
+        payload: 报文原文
+    """
+    log = logger.opt(depth=1, lazy=True)
+    log.info(f"{label}: {{}}", lambda: payload_digest(payload))
+    if should_sample(source):
+        log.debug(f"{label}: {{}}", lambda: truncate_payload(payload, config.payload_log_max_chars))
+
+
+__all__ = [
+    "payload_digest",
+    "truncate_payload",
+    "should_sample",
+    "log_payload",
+]
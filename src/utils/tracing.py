@@ -0,0 +1,292 @@
+"""链路追踪模块 - 基于 contextvars 的轻量 span，按 OTLP JSON 格式逐行导出
+
+一次工具调用内的上游请求、JSON 解析和处理函数自动成为同一条链路上的嵌套 span，
+asyncio 任务和 asyncio.to_thread 会继承当前 span；普通线程池需用 bind_context 包装。
+结束的 span 由后台线程写出，被追踪的调用不等待磁盘或管道写入。
+未开启 tracing_enabled 时 span 为空操作。
+
+导出格式与 OpenTelemetry Collector 的 otlpjsonfile 接收器一致，每行一个
+ExportTraceServiceRequest，只含一个 span:
+    {"resourceSpans": [{"resource": {...}, "scopeSpans": [{"scope": {...}, "spans": [{...}]}]}]}
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, TypeVar
+
+from .config import config
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# OTLP span 类型
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP 状态码
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SERVICE_NAME = "api2mcp"
+
+
+class Span:
+    """一个计时区间，结束时交给导出器"""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes",
+                 "start_ns", "end_ns", "status", "message")
+
+    def __init__(self, name: str, parent: Optional["Span"], kind: int, attributes: Dict[str, Any]):
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = STATUS_OK
+        self.message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.message = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.message} if self.message else {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """未开启追踪时使用，所有操作为空"""
+
+    trace_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("api2mcp_span", default=None)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class JsonLinesSpanExporter:
+    """将结束的 span 逐行写入文件或标准输出，多线程安全
+
+    export 只序列化 span 并放入队列，写入和刷新由后台线程完成，不阻塞事件循环；
+    后台线程在队列取空时才刷新，进程退出时写完队列中剩余的 span。
+
+    参数:
+        path: 导出文件路径，为空或 "-" 时写入标准输出
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path and path != "-" else None
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file: TextIO = open(self.path, "a", encoding="utf-8")
+        else:
+            self._file = sys.stdout
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._closed = False
+        self._resource = {"attributes": _otlp_attributes({
+            "service.name": SERVICE_NAME,
+            "process.pid": os.getpid(),
+        })}
+        self.exported = 0
+        self.dropped = 0
+        self._writer = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def export(self, span: Span) -> None:
+        """序列化失败或导出器已关闭时只计数，不影响被追踪的调用"""
+        if self._closed:
+            self.dropped += 1
+            return
+        try:
+            line = json.dumps({"resourceSpans": [{
+                "resource": self._resource,
+                "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [span.to_otlp()]}],
+            }]}, ensure_ascii=False, default=str)
+        except Exception:
+            self.dropped += 1
+            return
+        self._queue.put(line)
+
+    def _run(self) -> None:
+        while True:
+            line = self._queue.get()
+            try:
+                if line is None:
+                    return
+                self._file.write(line + "\n")
+                self.exported += 1
+                if self._queue.empty():
+                    self._file.flush()
+            except Exception:
+                self.dropped += 1
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """等待队列中的 span 全部写出"""
+        if not self._closed:
+            self._queue.join()
+
+    def close(self) -> None:
+        """写完队列中剩余的 span 后关闭文件"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        if self._file is sys.stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+        atexit.unregister(self.close)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"exported": self.exported, "dropped": self.dropped, "pending": self._queue.qsize()}
+
+
+_exporter: Optional[JsonLinesSpanExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_span_exporter() -> Optional[JsonLinesSpanExporter]:
+    """获取全局 span 导出器，未开启追踪时返回 None"""
+    global _exporter
+    if not config.tracing_enabled:
+        return None
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = JsonLinesSpanExporter(config.tracing_export)
+    return _exporter
+
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Any]:
+    """在当前 span 下开启子 span，没有当前 span 时开启新链路
+
+    with 块内抛出的异常记录到 span 状态后原样抛出。
+    """
+    exporter = get_span_exporter()
+    if exporter is None:
+        yield NOOP_SPAN
+        return
+
+    current = Span(name, _current_span.get(), kind, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+        exporter.export(current)
+
+
+def traced(func: F) -> F:
+    """装饰器：每次调用记录为一个以函数名命名的 span，支持协程函数"""
+    name = func.__name__
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return await func(*args, **kwargs)
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with span(name):
+            return func(*args, **kwargs)
+    return wrapper  # type: ignore[return-value]
+
+
+def bind_context(func: F) -> F:
+    """绑定当前上下文，使函数在线程池中执行时仍挂在当前 span 下
+
+    每次调用使用上下文的独立副本，可被多个线程同时执行。
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper  # type: ignore[return-value]
+
+
+def current_trace_id() -> Optional[str]:
+    """当前链路 ID，不在 span 内时返回 None"""
+    current = _current_span.get()
+    return current.trace_id if current is not None else None
+
+
+def get_tracing_stats() -> Dict[str, Any]:
+    """获取 span 导出统计信息"""
+    exporter = get_span_exporter()
+    if exporter is None:
+        return {"enabled": False}
+    return {"enabled": True, **exporter.stats()}
+
+
+__all__ = [
+    "SPAN_KIND_INTERNAL",
+    "SPAN_KIND_SERVER",
+    "SPAN_KIND_CLIENT",
+    "Span",
+    "JsonLinesSpanExporter",
+    "get_span_exporter",
+    "span",
+    "traced",
+    "bind_context",
+    "current_trace_id",
+    "get_tracing_stats",
+]